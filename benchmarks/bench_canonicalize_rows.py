@@ -0,0 +1,47 @@
+"""
+Cost of sorting the cells within each row, as done by TupleConstraint and ExecutionAccuracy.
+
+Compares the per-row `sort_with_different_types` with the batched `canonicalize_rows` on numeric,
+string and mixed results.
+
+Usage:
+    python benchmarks/bench_canonicalize_rows.py --rows 100000 --cols 10
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import timeit
+
+from qatch.evaluate_dataset.metrics_evaluators.utils import canonicalize_rows, sort_with_different_types
+
+
+def _make_rows(kind: str, num_rows: int, num_cols: int, rng: random.Random) -> list[list]:
+    if kind == 'numeric':
+        cell = lambda: rng.randint(0, 1000) if rng.random() < 0.5 else rng.random()
+    elif kind == 'string':
+        cell = lambda: f'value_{rng.randint(0, 1000)}'
+    else:
+        cell = lambda: rng.choice([None, rng.randint(0, 1000), f'value_{rng.randint(0, 1000)}'])
+    return [[cell() for _ in range(num_cols)] for _ in range(num_rows)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--cols', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f'{"result":>8} {"per-row (s)":>12} {"batched (s)":>12} {"speedup":>8}')
+    for kind in ['numeric', 'string', 'mixed']:
+        rows = _make_rows(kind, args.rows, args.cols, rng)
+        per_row = min(timeit.repeat(lambda: [tuple(sort_with_different_types(row)) for row in rows],
+                                    number=1, repeat=args.repeat))
+        batched = min(timeit.repeat(lambda: canonicalize_rows(rows), number=1, repeat=args.repeat))
+        print(f'{kind:>8} {per_row:>12.3f} {batched:>12.3f} {per_row / batched:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
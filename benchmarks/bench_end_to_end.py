@@ -0,0 +1,159 @@
+"""
+End-to-end benchmark of test generation and evaluation on synthetic databases.
+
+For each scale factor, a synthetic SQLite database is built (see `synthetic_database.py`), the tests are
+generated with `OrchestratorGenerator.generate_dataset` and evaluated with `OrchestratorEvaluator.evaluate_df`
+against synthetic predictions. The throughput, the latency percentiles and the peak memory of each phase are
+written to a JSON file, to be compared across commits.
+
+The peak memory is the high-water mark of the process resident set size, hence it never decreases
+between phases. With `--trace-memory`, also the peak of the Python allocations of each phase is measured
+with `tracemalloc`, which slows down the run.
+
+Usage:
+    python benchmarks/bench_end_to_end.py --scale-factors 1 10 --rows 1000 --output benchmark.json
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from qatch.evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+from qatch.evaluate_dataset.result_store import EvaluationResultStore
+from qatch.generate_dataset.orchestrator_generator import OrchestratorGenerator
+from synthetic_database import SyntheticScale, build_synthetic_database, make_synthetic_predictions
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on Linux
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def _latency_percentiles(latencies: list[float]) -> dict:
+    if not latencies:
+        return {}
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    return {'p50_ms': p50 * 1e3, 'p90_ms': p90 * 1e3, 'p99_ms': p99 * 1e3, 'max_ms': max(latencies) * 1e3}
+
+
+def _run_phase(phase, trace_memory: bool) -> tuple:
+    if trace_memory:
+        tracemalloc.start()
+    start_time = time.perf_counter()
+    try:
+        output = phase()
+        seconds = time.perf_counter() - start_time
+        peak_traced = tracemalloc.get_traced_memory()[1] / 2 ** 20 if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return output, seconds, {'peak_rss_mb': _peak_rss_mb(), 'peak_traced_mb': peak_traced}
+
+
+def benchmark_scale(scale: SyntheticScale, max_tests: int | None, trace_memory: bool) -> dict:
+    with tempfile.TemporaryDirectory() as db_dir:
+        start_time = time.perf_counter()
+        connector = build_synthetic_database(db_dir, scale)
+        build_seconds = time.perf_counter() - start_time
+
+        (tests, generator_stats), generation_seconds, generation_memory = _run_phase(
+            lambda: OrchestratorGenerator().generate_dataset(connector, return_stats=True), trace_memory
+        )
+        if max_tests is not None and len(tests) > max_tests:
+            tests = tests.sample(max_tests, random_state=scale.seed)
+        tests = tests.reset_index(drop=True)
+        tests['prediction'] = make_synthetic_predictions(tests['query'].tolist(), seed=scale.seed)
+
+        evaluator = OrchestratorEvaluator()
+        with EvaluationResultStore(':memory:') as store:
+            _, evaluation_seconds, evaluation_memory = _run_phase(
+                lambda: evaluator.evaluate_df(tests, 'query', 'prediction', 'db_path', result_store=store),
+                trace_memory
+            )
+            latencies = store.load()['elapsed_seconds'].dropna().tolist()
+        connector.engine.dispose()
+
+    generator_seconds = generator_stats.groupby('generator')[
+        ['generation_time', 'validation_time']].sum().sum(axis=1)
+    return {
+        'scale': dataclasses.asdict(scale),
+        'build_seconds': build_seconds,
+        'generation': {
+            'seconds': generation_seconds,
+            'tests': int(generator_stats['kept'].sum()),
+            'candidates': int(generator_stats['candidates'].sum()),
+            'tests_per_second': generator_stats['kept'].sum() / generation_seconds,
+            'generator_seconds': generator_seconds.to_dict(),
+            **generation_memory,
+        },
+        'evaluation': {
+            'seconds': evaluation_seconds,
+            'tests': len(tests),
+            'tests_per_second': len(tests) / evaluation_seconds if evaluation_seconds else None,
+            'latency': _latency_percentiles(latencies),
+            **evaluation_memory,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale-factors', type=float, nargs='+', default=[1, 10])
+    parser.add_argument('--rows', type=int, default=1000, help='rows of each table at scale factor 1')
+    parser.add_argument('--columns', type=int, default=6)
+    parser.add_argument('--tables', type=int, default=3)
+    parser.add_argument('--fk-density', type=float, default=0.5)
+    parser.add_argument('--null-rate', type=float, default=0.05)
+    parser.add_argument('--duplicate-rate', type=float, default=0.1)
+    parser.add_argument('--max-tests', type=int, default=500, help='evaluated tests for each scale factor')
+    parser.add_argument('--seed', type=int, default=2023)
+    parser.add_argument('--trace-memory', action='store_true')
+    parser.add_argument('--output', default='benchmark_end_to_end.json')
+    args = parser.parse_args()
+
+    base_scale = SyntheticScale(rows=args.rows, columns=args.columns, tables=args.tables,
+                                fk_density=args.fk_density, null_rate=args.null_rate,
+                                duplicate_rate=args.duplicate_rate, seed=args.seed)
+    results = []
+    print(f'{"scale":>6} {"rows":>8} {"gen (s)":>8} {"tests":>6} {"eval (s)":>9} {"tests/s":>8} '
+          f'{"p50 (ms)":>9} {"p99 (ms)":>9} {"rss (MB)":>9}')
+    for factor in args.scale_factors:
+        result = benchmark_scale(base_scale.scaled(factor), args.max_tests, args.trace_memory)
+        result['scale_factor'] = factor
+        results.append(result)
+        generation, evaluation = result['generation'], result['evaluation']
+        print(f'{factor:>6g} {result["scale"]["rows"]:>8} {generation["seconds"]:>8.2f} {evaluation["tests"]:>6} '
+              f'{evaluation["seconds"]:>9.2f} {evaluation["tests_per_second"]:>8.1f} '
+              f'{evaluation["latency"].get("p50_ms", float("nan")):>9.1f} '
+              f'{evaluation["latency"].get("p99_ms", float("nan")):>9.1f} {evaluation["peak_rss_mb"] or 0:>9.0f}')
+
+    report = {
+        'benchmark': 'end_to_end',
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2, default=float)
+    print(f'Results written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
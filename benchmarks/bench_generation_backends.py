@@ -0,0 +1,49 @@
+"""
+Generation time of `OrchestratorGenerator` with each execution backend (LangGraph, thread pool, process pool).
+
+The tests are generated from a synthetic database (see `synthetic_database.py`). The time of each backend
+is the median of `--repeat` runs of `generate_dataset`, after a warm-up run.
+
+Usage:
+    python benchmarks/bench_generation_backends.py --rows 10000 --tables 5 --max-workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+
+from qatch.generate_dataset.orchestrator_generator import OrchestratorGenerator
+from synthetic_database import SyntheticScale, build_synthetic_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backends', nargs='+', default=['langgraph', 'thread', 'process'])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--columns', type=int, default=6)
+    parser.add_argument('--tables', type=int, default=3)
+    parser.add_argument('--max-workers', type=int, default=None)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        connector = build_synthetic_database(
+            db_dir, SyntheticScale(rows=args.rows, columns=args.columns, tables=args.tables)
+        )
+        print(f'{"backend":>10} {"median (s)":>11} {"min (s)":>8} {"tests":>6}')
+        for backend in args.backends:
+            orchestrator = OrchestratorGenerator(backend=backend, max_workers=args.max_workers)
+            orchestrator.generate_dataset(connector)
+            times, num_tests = [], 0
+            for _ in range(args.repeat):
+                start_time = time.perf_counter()
+                num_tests = len(orchestrator.generate_dataset(connector))
+                times.append(time.perf_counter() - start_time)
+            print(f'{backend:>10} {statistics.median(times):>11.3f} {min(times):>8.3f} {num_tests:>6}')
+        connector.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
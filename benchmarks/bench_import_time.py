@@ -0,0 +1,62 @@
+"""
+Cold import time of the qatch modules, each imported in a new interpreter.
+
+The time is the median of `--repeat` runs and excludes the interpreter startup (measured by running an empty
+program). With `--max-seconds`, the script exits with status 1 if a module takes longer to import,
+e.g. because a heavy dependency became an eager import again. `python -X importtime -c "import <module>"`
+shows which imports are responsible.
+
+Usage:
+    python benchmarks/bench_import_time.py --max-seconds 0.5
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+MODULES = [
+    'qatch',
+    'qatch.connectors',
+    'qatch.evaluate_dataset',
+    'qatch.evaluate_dataset.metrics_evaluators',
+    'qatch.generate_dataset',
+    'qatch.evaluate_dataset.orchestrator_evaluator',
+    'qatch.generate_dataset.orchestrator_generator',
+]
+
+
+def _run_seconds(code: str, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True, capture_output=True)
+        times.append(time.perf_counter() - start_time)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modules', nargs='+', default=MODULES)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float,
+                        help='maximum import time of the modules, except the orchestrators')
+    args = parser.parse_args()
+
+    startup = _run_seconds('pass', args.repeat)
+    failures = []
+    print(f'{"module":>48} {"import (s)":>11}')
+    for module in args.modules:
+        seconds = max(0.0, _run_seconds(f'import {module}', args.repeat) - startup)
+        print(f'{module:>48} {seconds:>11.3f}')
+        if args.max_seconds is not None and 'orchestrator' not in module and seconds > args.max_seconds:
+            failures.append(module)
+    if failures:
+        print(f'Import time above {args.max_seconds}s: {failures}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
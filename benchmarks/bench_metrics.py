@@ -0,0 +1,143 @@
+"""
+Micro-benchmark of the `run_metric` of every metric evaluator, with regression thresholds.
+
+Each evaluator of `name2evaluator`, `name2approximate_evaluator` (prefix `approx_`) and
+`name2streaming_evaluator` (prefix `streaming_`) is timed on synthetic target/prediction pairs for every
+combination of rows, columns, duplicate ratio and type mix. The throughput is measured in result cells
+(target plus prediction) per second, taking the best of `--repeat` runs.
+
+With `--save-baseline` the throughputs are stored in a JSON file. With `--baseline` they are compared with
+a stored baseline and the script exits with status 1 if the throughput of any metric and shape drops by more
+than its tolerance: `--tolerance` for all metrics, overridden by `--metric-tolerance name=value`.
+Baselines are only comparable on the same machine.
+
+VES is excluded, as it executes the queries on the database instead of comparing the results.
+
+Usage:
+    python benchmarks/bench_metrics.py --save-baseline metrics_baseline.json
+    python benchmarks/bench_metrics.py --baseline metrics_baseline.json --tolerance 0.2
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import random
+import sys
+import timeit
+
+from qatch.evaluate_dataset.orchestrator_evaluator import (
+    name2evaluator,
+    name2approximate_evaluator,
+    name2streaming_evaluator,
+)
+
+
+def _evaluators() -> dict:
+    evaluators = {name: cls() for name, cls in name2evaluator.items() if name != 'VES'}
+    evaluators.update({f'approx_{name}': cls() for name, cls in name2approximate_evaluator.items()})
+    evaluators.update({f'streaming_{name}': cls() for name, cls in name2streaming_evaluator.items()})
+    return evaluators
+
+
+def _make_pair(num_rows: int, num_cols: int, duplicate_ratio: float, types: str,
+               rng: random.Random) -> tuple[list[list], list[list]]:
+    """Returns a target and a prediction sharing most of their rows, in a different order"""
+    if types == 'numeric':
+        cell = lambda: rng.randint(0, 10 * num_rows) if rng.random() < 0.5 else round(rng.random() * num_rows, 2)
+    elif types == 'string':
+        cell = lambda: f'value_{rng.randint(0, 10 * num_rows)}'
+    else:
+        cell = lambda: rng.choice([None, rng.randint(0, 10 * num_rows), f'value_{rng.randint(0, 10 * num_rows)}'])
+    target = [[cell() for _ in range(num_cols)] for _ in range(num_rows)]
+    for i in rng.sample(range(num_rows), int(num_rows * duplicate_ratio)):
+        target[i] = list(rng.choice(target))
+    prediction = [list(row) for row in target]
+    rng.shuffle(prediction)
+    # about 10% of the predicted cells differ from the target
+    for _ in range(num_rows * num_cols // 10):
+        prediction[rng.randrange(num_rows)][rng.randrange(num_cols)] = cell()
+    return target, prediction
+
+
+def _shape_key(num_rows: int, num_cols: int, duplicate_ratio: float, types: str) -> str:
+    return f'rows={num_rows},cols={num_cols},dup={duplicate_ratio:g},types={types}'
+
+
+def run_benchmark(rows: list[int], cols: list[int], duplicates: list[float], types: list[str],
+                  repeat: int, seed: int) -> dict[str, dict[str, float]]:
+    """Returns the throughput in cells per second of each metric for each result shape"""
+    evaluators = _evaluators()
+    metric2throughput = {name: dict() for name in evaluators}
+    for num_rows, num_cols, duplicate_ratio, type_mix in itertools.product(rows, cols, duplicates, types):
+        key = _shape_key(num_rows, num_cols, duplicate_ratio, type_mix)
+        # each shape has its own generator, hence the results do not depend on the other shapes
+        rng = random.Random(f'{seed}-{key}')
+        target, prediction = _make_pair(num_rows, num_cols, duplicate_ratio, type_mix, rng)
+        num_cells = 2 * num_rows * num_cols
+        for name, evaluator in evaluators.items():
+            seconds = min(timeit.repeat(lambda: evaluator.run_metric(target, prediction), number=1, repeat=repeat))
+            metric2throughput[name][key] = num_cells / seconds
+            print(f'{name:>28} {key:>42} {num_cells / seconds:>14,.0f} cells/s')
+    return metric2throughput
+
+
+def find_regressions(current: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]],
+                     tolerance: float, metric2tolerance: dict[str, float]) -> list[dict]:
+    """Returns the metrics and shapes whose throughput is lower than the baseline by more than the tolerance"""
+    regressions = []
+    for name, key2throughput in current.items():
+        metric_tolerance = metric2tolerance.get(name, tolerance)
+        for key, throughput in key2throughput.items():
+            baseline_throughput = baseline.get(name, {}).get(key)
+            if baseline_throughput is None:
+                continue
+            ratio = throughput / baseline_throughput
+            if ratio < 1 - metric_tolerance:
+                regressions.append({'metric': name, 'shape': key, 'ratio': ratio, 'tolerance': metric_tolerance})
+    return regressions
+
+
+def _parse_metric_tolerance(value: str) -> tuple[str, float]:
+    name, _, tolerance = value.partition('=')
+    return name, float(tolerance)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 10_000])
+    parser.add_argument('--cols', type=int, nargs='+', default=[2, 8])
+    parser.add_argument('--duplicates', type=float, nargs='+', default=[0.0, 0.5])
+    parser.add_argument('--types', nargs='+', default=['numeric', 'string', 'mixed'],
+                        choices=['numeric', 'string', 'mixed'])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=2023)
+    parser.add_argument('--save-baseline', help='path of the JSON file where the throughputs are stored')
+    parser.add_argument('--baseline', help='path of the JSON file with the baseline throughputs')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='maximum relative drop of throughput with respect to the baseline')
+    parser.add_argument('--metric-tolerance', type=_parse_metric_tolerance, action='append', default=[],
+                        help='tolerance of a single metric, e.g. tuple_order=0.3')
+    args = parser.parse_args()
+
+    current = run_benchmark(args.rows, args.cols, args.duplicates, args.types, args.repeat, args.seed)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as file:
+            json.dump({'unit': 'cells_per_second', 'metrics': current}, file, indent=2)
+        print(f'Baseline written to {args.save_baseline}')
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['metrics']
+        regressions = find_regressions(current, baseline, args.tolerance, dict(args.metric_tolerance))
+        for regression in regressions:
+            print(f'REGRESSION {regression["metric"]} {regression["shape"]}: '
+                  f'{regression["ratio"]:.2f}x the baseline throughput (tolerance {regression["tolerance"]:.0%})')
+        if regressions:
+            sys.exit(1)
+        print('No regressions with respect to the baseline')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+Per-test overhead of building the `PredictedTest` passed to the evaluation graph.
+
+Compares the validated constructor with `PredictedTest.from_results` on results of increasing size.
+
+Usage:
+    python benchmarks/bench_predicted_test.py --rows 100000 --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import timeit
+
+from qatch.evaluate_dataset.state_orchestrator_evaluator import PredictedTest
+
+
+def _make_result(num_rows: int, num_cols: int, seed: int) -> list[list]:
+    rng = random.Random(seed)
+    return [[rng.randint(0, 1000), f'value_{rng.randint(0, 1000)}', rng.random()][:num_cols]
+            for _ in range(num_rows)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--cols', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'{"rows":>10} {"validated (ms)":>16} {"from_results (ms)":>18} {"speedup":>8}')
+    for num_rows in args.rows:
+        target = _make_result(num_rows, args.cols, seed=0)
+        prediction = _make_result(num_rows, args.cols, seed=1)
+        kwargs = dict(target_query='', target_values=target, predicted_query='', predicted_values=prediction)
+        validated = min(timeit.repeat(lambda: PredictedTest(**kwargs), number=1, repeat=args.repeat))
+        constructed = min(timeit.repeat(lambda: PredictedTest.from_results(**kwargs), number=1, repeat=args.repeat))
+        print(f'{num_rows:>10} {validated * 1e3:>16.3f} {constructed * 1e3:>18.3f} {validated / constructed:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
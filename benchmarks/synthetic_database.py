@@ -0,0 +1,129 @@
+"""
+Synthetic SQLite databases and predictions for the benchmarks.
+
+The databases are built at a configurable scale: number of tables, rows and columns, density of the
+foreign keys among the tables, rate of NULL cells and rate of duplicated rows. The same scale and seed
+always build the same database.
+"""
+from __future__ import annotations
+
+import dataclasses
+import os
+import random
+
+import numpy as np
+import pandas as pd
+
+from qatch.connectors import SqliteConnector
+
+
+@dataclasses.dataclass
+class SyntheticScale:
+    """
+    The shape of a synthetic database.
+
+    Attributes:
+        rows (int): The number of rows of each table.
+        columns (int): The number of columns of each table, besides the primary and foreign keys.
+            Categorical (TEXT) and numerical (INTEGER and REAL) columns alternate.
+        tables (int): The number of tables.
+        fk_density (float): The probability that a table references each of the previous tables.
+        null_rate (float): The fraction of NULL cells in the TEXT and REAL columns.
+        duplicate_rate (float): The fraction of rows that repeat the values of another row (keys excluded).
+        distinct_values (int): The number of distinct values of the categorical columns.
+        seed (int): The seed of the random generator.
+    """
+    rows: int = 1000
+    columns: int = 6
+    tables: int = 3
+    fk_density: float = 0.5
+    null_rate: float = 0.05
+    duplicate_rate: float = 0.1
+    distinct_values: int = 50
+    seed: int = 2023
+
+    def scaled(self, factor: float) -> SyntheticScale:
+        """Returns the scale with `factor` times the rows and the distinct values"""
+        return dataclasses.replace(self, rows=max(1, round(self.rows * factor)),
+                                   distinct_values=max(1, round(self.distinct_values * factor)))
+
+
+def _make_table(name: str, scale: SyntheticScale, parents: list[str], rng: np.random.Generator) -> pd.DataFrame:
+    columns = {f'{name}_id': np.arange(1, scale.rows + 1)}
+    for parent in parents:
+        # `<parent>_id` has the name of the primary key of the parent, hence it becomes a foreign key
+        columns[f'{parent}_id'] = rng.integers(1, scale.rows + 1, size=scale.rows)
+    for i in range(scale.columns):
+        kind = i % 3
+        if kind == 0:
+            values = np.array([f'value_{v}' for v in rng.integers(0, scale.distinct_values, size=scale.rows)],
+                              dtype=object)
+            values[rng.random(scale.rows) < scale.null_rate] = None
+            columns[f'cat_{i}'] = values
+        elif kind == 1:
+            columns[f'int_{i}'] = rng.integers(0, 10 * scale.distinct_values, size=scale.rows)
+        else:
+            values = rng.normal(100.0, 25.0, size=scale.rows).round(2)
+            values[rng.random(scale.rows) < scale.null_rate] = np.nan
+            columns[f'real_{i}'] = values
+    df = pd.DataFrame(columns)
+
+    num_duplicates = int(scale.rows * scale.duplicate_rate)
+    if num_duplicates and scale.rows > 1:
+        target = rng.choice(scale.rows, size=num_duplicates, replace=False)
+        source = rng.integers(0, scale.rows, size=num_duplicates)
+        for col in df.columns:
+            if not col.endswith('_id'):
+                values = df[col].to_numpy(copy=True)
+                values[target] = values[source]
+                df[col] = values
+    return df
+
+
+def build_synthetic_database(db_dir: str, scale: SyntheticScale, db_name: str = 'synthetic') -> SqliteConnector:
+    """
+    Builds a synthetic SQLite database in `db_dir` and returns its connector.
+
+    Table `table_<i>` has primary key `table_<i>_id` and references each previous table `table_<j>`
+    with probability `scale.fk_density` through column `table_<j>_id`.
+
+    Args:
+        db_dir (str): The directory of the database file `<db_name>.sqlite`, which must not exist.
+        scale (SyntheticScale): The shape of the database.
+        db_name (str): The name of the database.
+
+    Returns:
+        SqliteConnector: The connector of the new database.
+    """
+    rng = np.random.default_rng(scale.seed)
+    tables, table2primary_key = dict(), dict()
+    for i in range(scale.tables):
+        name = f'table_{i}'
+        parents = [f'table_{j}' for j in range(i) if rng.random() < scale.fk_density]
+        tables[name] = _make_table(name, scale, parents, rng)
+        table2primary_key[name] = f'{name}_id'
+    os.makedirs(db_dir, exist_ok=True)
+    return SqliteConnector(relative_db_path=db_dir, db_name=db_name, tables=tables,
+                           table2primary_key=table2primary_key)
+
+
+def make_synthetic_predictions(queries: list[str], error_rate: float = 0.05, seed: int = 2023) -> list[str]:
+    """
+    Returns a prediction for each target query: the query itself, a mutation changing its result
+    (DISTINCT, LIMIT, reversed ordering) or, with probability `error_rate`, a failing query.
+    """
+    rng = random.Random(seed)
+    predictions = []
+    for query in queries:
+        draw = rng.random()
+        if draw < error_rate:
+            predictions.append(query.replace('SELECT', 'SELECT not_a_column,', 1))
+        elif draw < 0.4:
+            predictions.append(query)
+        elif draw < 0.6 and 'DISTINCT' not in query:
+            predictions.append(query.replace('SELECT', 'SELECT DISTINCT', 1))
+        elif draw < 0.8 and ' ASC' in query:
+            predictions.append(query.replace(' ASC', ' DESC'))
+        else:
+            predictions.append(f'SELECT * FROM ({query}) LIMIT 3')
+    return predictions
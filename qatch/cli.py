@@ -0,0 +1,229 @@
+"""
+Command-line runner of the test generation and evaluation.
+
+The `qatch` command has two subcommands:
+
+- `generate` generates the tests of one or more SQLite databases (files or directories of databases)
+in a process pool and appends them to a JSON Lines or CSV file, one database at a time.
+- `evaluate` evaluates the predictions stored in a JSON Lines, CSV or Parquet file, reading and writing
+`--chunk-size` tests at a time. With `--workers` greater than 1, the chunks are evaluated in a process pool
+and written in input order.
+
+Usage:
+    qatch generate databases/ --output tests.jsonl --processes 8 --backend thread --workers 4 --timeout 60
+    qatch evaluate predictions.jsonl --output metrics.jsonl --prediction-col prediction --cache-dir .qatch_cache
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+
+RESULT_CACHE_FILE_NAME = 'qatch_results.sqlite'
+
+
+def _generate(args: argparse.Namespace) -> int:
+    from .evaluate_dataset.file_io import ChunkWriter
+    from .generate_dataset.batch_generation import utils_find_databases
+    from .generate_dataset.orchestrator_generator import OrchestratorGenerator
+
+    db_paths = utils_find_databases(args.databases)
+    if not db_paths:
+        raise FileNotFoundError(f'No database found in {args.databases}')
+    generator = OrchestratorGenerator(args.generators, backend=args.backend, max_workers=args.workers)
+
+    failed_db_paths = []
+    stats_writer = ChunkWriter(args.stats_output) if args.stats_output else None
+    try:
+        with ChunkWriter(args.output) as writer:
+            results = generator.iter_generate_datasets(db_paths, tables_to_include=args.tables,
+                                                       num_processes=args.processes, seed=args.seed,
+                                                       query_timeout=args.timeout)
+            for result in results:
+                if result.error is not None:
+                    failed_db_paths.append(result.db_path)
+                    continue
+                writer.write(result.dataset)
+                if stats_writer is not None:
+                    stats_writer.write(result.stats)
+    finally:
+        generator.close()
+        if stats_writer is not None:
+            stats_writer.close()
+    print(f'{writer.num_rows} tests from {len(db_paths) - len(failed_db_paths)} databases written to {args.output}')
+    if failed_db_paths:
+        print(f'Generation failed on {len(failed_db_paths)} databases: {failed_db_paths}', file=sys.stderr)
+        return 1
+    return 0
+
+
+def _evaluator_kwargs(args: argparse.Namespace) -> dict:
+    result_cache = None
+    if args.cache_dir:
+        os.makedirs(args.cache_dir, exist_ok=True)
+        result_cache = os.path.join(args.cache_dir, RESULT_CACHE_FILE_NAME)
+    return {
+        'evaluator_names': args.metrics,
+        'mode': args.mode,
+        'result_cache': result_cache,
+        'compact_results': args.compact_results,
+        'record_timings': args.record_timings,
+        'query_timeout': args.timeout,
+    }
+
+
+# evaluator of the worker processes of `_evaluate_in_pool`, created once per process by `_init_worker`
+_worker_evaluator: OrchestratorEvaluator | None = None
+_worker_evaluate_kwargs: dict = dict()
+
+
+def _init_worker(evaluator_kwargs: dict, evaluate_kwargs: dict):
+    global _worker_evaluator, _worker_evaluate_kwargs
+    from .evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+    _worker_evaluator = OrchestratorEvaluator(**evaluator_kwargs)
+    _worker_evaluate_kwargs = evaluate_kwargs
+
+
+def _evaluate_chunk(chunk: pd.DataFrame, result_store_path: str | None, run_id: str | None) -> pd.DataFrame:
+    from .evaluate_dataset.result_store import EvaluationResultStore
+    if result_store_path is None:
+        return _worker_evaluator.evaluate_df(chunk, **_worker_evaluate_kwargs)
+    # the processes append to the same results database (in WAL mode) with the same run id
+    store = EvaluationResultStore(result_store_path, run_id=run_id)
+    try:
+        return _worker_evaluator.evaluate_df(chunk, result_store=store, **_worker_evaluate_kwargs)
+    finally:
+        store.close()
+
+
+def _evaluate_in_pool(args: argparse.Namespace, evaluate_kwargs: dict) -> int:
+    from .evaluate_dataset.file_io import ChunkWriter, utils_iter_file_chunks
+    from .evaluate_dataset.result_store import EvaluationResultStore
+
+    run_id = None
+    if args.result_store:
+        # creates the tables once, before the processes append to them
+        store = EvaluationResultStore(args.result_store)
+        run_id = store.run_id
+        store.close()
+
+    with ChunkWriter(args.output) as writer, ProcessPoolExecutor(
+            max_workers=args.workers, mp_context=multiprocessing.get_context('spawn'), initializer=_init_worker,
+            initargs=(_evaluator_kwargs(args), evaluate_kwargs)) as executor:
+        # at most two chunks per worker are in memory, the results are written in input order
+        pending = []
+        for chunk in utils_iter_file_chunks(args.input, args.chunk_size):
+            pending.append(executor.submit(_evaluate_chunk, chunk, args.result_store, run_id))
+            if len(pending) >= 2 * args.workers:
+                writer.write(pending.pop(0).result())
+        for future in pending:
+            writer.write(future.result())
+    return writer.num_rows
+
+
+def _evaluate(args: argparse.Namespace) -> int:
+    evaluate_kwargs = {
+        'target_col_name': args.target_col,
+        'prediction_col_name': args.prediction_col[0] if len(args.prediction_col) == 1 else args.prediction_col,
+        'db_path_name': args.db_path_col,
+        'test_id_col_name': args.test_id_col,
+        'skip_target_errors': args.skip_target_errors,
+    }
+    if args.workers > 1:
+        num_rows = _evaluate_in_pool(args, evaluate_kwargs)
+    else:
+        from .evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+        evaluator = OrchestratorEvaluator(**_evaluator_kwargs(args))
+        num_rows = evaluator.evaluate_file(
+            args.input, args.output, chunk_size=args.chunk_size,
+            checkpoint_path=args.checkpoint, checkpoint_every=args.checkpoint_every,
+            result_store=args.result_store, **evaluate_kwargs,
+        )
+    print(f'{num_rows} evaluated tests written to {args.output}')
+    return 0
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'{value} is not a positive integer')
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Returns the parser of the `qatch` command"""
+    parser = argparse.ArgumentParser(prog='qatch', description='Generates and evaluates QATCH tests.')
+    parser.add_argument('--log-level', default='WARNING', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    generate = subparsers.add_parser('generate', help='generate the tests of SQLite databases')
+    generate.add_argument('databases', nargs='+', help='database files or directories of databases')
+    generate.add_argument('--output', required=True, help='output file of the tests (.jsonl or .csv)')
+    generate.add_argument('--stats-output', help='output file of the generator statistics (.jsonl or .csv)')
+    generate.add_argument('--generators', nargs='+', help='generator names, all the generators by default')
+    generate.add_argument('--tables', nargs='+', help='tables included in the generation, all by default')
+    generate.add_argument('--backend', default='langgraph', choices=['langgraph', 'thread', 'process'],
+                          help='execution backend of the generators')
+    generate.add_argument('--workers', type=_positive_int,
+                          help='generators running in parallel on each database, the backend default if not set')
+    generate.add_argument('--processes', type=_positive_int,
+                          help='databases generated in parallel, the number of CPUs if not set')
+    generate.add_argument('--seed', type=int, default=2023, help='seed of the random sampling of the generators')
+    generate.add_argument('--timeout', type=float, help='timeout of each query in seconds')
+    generate.set_defaults(handler=_generate)
+
+    evaluate = subparsers.add_parser('evaluate', help='evaluate the predictions stored in a file')
+    evaluate.add_argument('input', help='input file of the predictions (.jsonl, .csv or .parquet)')
+    evaluate.add_argument('--output', required=True, help='output file of the metrics (.jsonl or .csv)')
+    evaluate.add_argument('--target-col', default='query', help='column of the target queries')
+    evaluate.add_argument('--prediction-col', nargs='+', default=['prediction'],
+                          help='column(s) of the predicted queries, e.g. one for each model')
+    evaluate.add_argument('--db-path-col', default='db_path', help='column of the database paths')
+    evaluate.add_argument('--test-id-col', help='column of the test identifiers')
+    evaluate.add_argument('--metrics', nargs='+', help='metric names, all the metrics of the mode by default')
+    evaluate.add_argument('--mode', default='python', choices=['python', 'pushdown', 'streaming'])
+    evaluate.add_argument('--compact-results', action='store_true', help='execute the queries with compact results')
+    evaluate.add_argument('--record-timings', action='store_true', help='add the timings of each phase')
+    evaluate.add_argument('--skip-target-errors', action='store_true',
+                          help='record the target errors instead of stopping the evaluation')
+    evaluate.add_argument('--chunk-size', type=_positive_int, default=1000,
+                          help='tests read, evaluated and written at a time')
+    evaluate.add_argument('--workers', type=_positive_int, default=1, help='processes evaluating the chunks')
+    evaluate.add_argument('--cache-dir', help='directory of the query result cache, shared by the workers')
+    evaluate.add_argument('--checkpoint', help='checkpoint file to resume the evaluation, only with one worker')
+    evaluate.add_argument('--checkpoint-every', type=_positive_int, default=100)
+    evaluate.add_argument('--result-store', help='results database where the per-test metrics are appended')
+    evaluate.add_argument('--timeout', type=float, help='timeout of each query in seconds')
+    evaluate.set_defaults(handler=_evaluate)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Entry point of the `qatch` command.
+
+    Args:
+        argv (list[str] | None): The command-line arguments, `sys.argv[1:]` if None.
+
+    Returns:
+        int: The exit status.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'evaluate' and args.checkpoint and args.workers > 1:
+        parser.error('--checkpoint is written by a single process, use it with --workers 1')
+    logging.basicConfig(level=args.log_level)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,2 +1,35 @@
-from .base_connector import BaseConnector, ConnectorTable, ConnectorTableColumn
-from .sqlite_connector import SqliteConnector
+# The connectors are imported on first access (PEP 562), hence `CompactResult` and the profiler
+# can be used without importing pandas, pydantic and SQLAlchemy.
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .base_connector import BaseConnector, ConnectorTable, ConnectorTableColumn
+    from .compact_result import CompactResult
+    from .sqlite_connector import SqliteConnector
+    from .profiler import SqlProfiler, StatementRecord, profiling_caller
+
+_name2module = {
+    'BaseConnector': '.base_connector',
+    'ConnectorTable': '.base_connector',
+    'ConnectorTableColumn': '.base_connector',
+    'CompactResult': '.compact_result',
+    'SqliteConnector': '.sqlite_connector',
+    'SqlProfiler': '.profiler',
+    'StatementRecord': '.profiler',
+    'profiling_caller': '.profiler',
+}
+
+__all__ = list(_name2module)
+
+
+def __getattr__(name: str):
+    if name not in _name2module:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(_name2module[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+import contextlib
 import os
 from abc import ABC, abstractmethod
+from typing import Iterator
 
 import pandas as pd
 from func_timeout import func_set_timeout
 from pydantic import BaseModel, ConfigDict
 from typing_extensions import Literal, TypedDict
 
+from .compact_result import CompactResult
+from .profiler import SqlProfiler, StatementRecord
+
 
 class ConnectorTableColumn(BaseModel):
     column_name: str  # The column name in the table
@@ -61,6 +66,8 @@ class BaseConnector(ABC):
         tables (dict[str, pd.DataFrame]): A dictionary mapping from table names to pandas DataFrame objects.
                                            Each DataFrame represents a table in the database.
         table2primary_key (dict[str, str]): A dictionary mapping from table names to their primary keys.
+        profiler (SqlProfiler | None): The profiler recording the executed statements. The class attribute
+                                       is shared by all the connectors, see `SqlProfiler`.
 
     Args:
         relative_db_path (str): A string representing the relative path to the database.
@@ -72,6 +79,7 @@ class BaseConnector(ABC):
         *args : Variable length argument list.
         **kwargs : Arbitrary keyword arguments.
     """
+    profiler: SqlProfiler | None = None
 
     def __init__(self,
                  relative_db_path: str,
@@ -85,6 +93,19 @@ class BaseConnector(ABC):
         self.tables = tables
         self.table2primary_key = table2primary_key
 
+    def set_profiler(self, profiler: SqlProfiler | None):
+        """Attaches the profiler to this connector only, None restores the profiler shared by all the connectors"""
+        if profiler is None:
+            self.__dict__.pop('profiler', None)
+        else:
+            self.profiler = profiler
+
+    def _profile(self, statement: str) -> contextlib.AbstractContextManager[StatementRecord | None]:
+        """Returns the context in which connectors execute `statement`: it yields the record of the profiler,
+        or None if no profiler is attached"""
+        profiler = self.profiler
+        return profiler.profile(statement) if profiler is not None else contextlib.nullcontext()
+
     @abstractmethod
     def load_tables_from_database(self, *args, **kwargs) -> dict[str, ConnectorTable]:
         """
@@ -120,3 +141,49 @@ class BaseConnector(ABC):
             list[list]: Returns the results of the query as a list of lists.
                        Each inner list represents a row extracted from the result set of the query"""
         raise NotImplementedError
+
+    def run_query_compact(self, query: str) -> CompactResult:
+        """
+        Run the query on the database and return the result as a `CompactResult`.
+
+        The default implementation converts the output of `run_query`, connectors
+        should override it to build the result directly from the cursor.
+
+        Args:
+            query (str): The SQL query to be executed.
+
+        Returns:
+            CompactResult: The rows of the result set of the query, as tuples with interned strings.
+        """
+        return CompactResult(self.run_query(query))
+
+    def get_query_columns(self, query: str) -> list[str]:
+        """
+        Returns the names of the columns projected by the query without fetching its rows.
+
+        Note:
+            - Connectors that do not support this method cannot be used to evaluate metrics inside the database.
+
+        Args:
+            query (str): The SQL query to be inspected.
+
+        Returns:
+            list[str]: The names of the columns returned by the query, in projection order.
+        """
+        raise NotImplementedError
+
+    def iter_query(self, query: str, batch_size: int = 1000) -> Iterator[tuple]:
+        """
+        Run the query on the database and yield its rows one by one.
+
+        The default implementation materializes the result with `run_query`, connectors
+        should override it to fetch the rows incrementally from the cursor.
+
+        Args:
+            query (str): The SQL query to be executed.
+            batch_size (int): The number of rows fetched from the cursor at a time.
+
+        Returns:
+            Iterator[tuple]: The rows of the result set of the query.
+        """
+        yield from self.run_query(query)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import sys
+from itertools import chain
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+
+def _intern(cell):
+    return sys.intern(cell) if type(cell) is str else cell
+
+
+class CompactResult(Sequence):
+    """
+    Immutable, memory-compact result of a query.
+
+    The rows are stored as tuples and the strings are interned, hence repeated values share the same object.
+    The structures derived from the rows (e.g. the distinct cells used by the metrics) are computed on first
+    access and cached, so a result compared with several predictions is processed only once.
+
+    Note:
+        - Iterating the result yields tuples, not lists.
+        - The result is a `Sequence`: it supports `len`, indexing and iteration as a list of rows.
+
+    Attributes:
+        rows (tuple[tuple, ...]): The rows of the result.
+
+    Args:
+        rows (Iterable[Sequence]): The rows of the result, e.g. the cursor of the executed query.
+    """
+    __slots__ = ('rows', '_cache')
+
+    def __init__(self, rows: Iterable[Sequence]):
+        self.rows = tuple(tuple(_intern(cell) for cell in row) for row in rows)
+        self._cache = dict()
+
+    @classmethod
+    def from_rows(cls, rows: CompactResult | Iterable[Sequence]) -> CompactResult:
+        """Returns the rows as a `CompactResult`, without copies if they already are"""
+        return rows if isinstance(rows, cls) else cls(rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+    def __iter__(self) -> Iterator[tuple]:
+        return iter(self.rows)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CompactResult):
+            return self.rows == other.rows
+        if isinstance(other, Sequence):
+            return len(self.rows) == len(other) and all(row == tuple(o) for row, o in zip(self.rows, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'CompactResult({[list(row) for row in self.rows[:5]]}{"..." if len(self.rows) > 5 else ""})'
+
+    def __getstate__(self):
+        return self.rows
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+    def cached(self, key: str, compute: Callable[[CompactResult], Any]) -> Any:
+        """Returns the value cached with `key`, computing it with `compute(self)` on the first call"""
+        if key not in self._cache:
+            self._cache[key] = compute(self)
+        return self._cache[key]
+
+    @property
+    def distinct_cells(self) -> frozenset:
+        """The distinct cells of the result"""
+        return self.cached('distinct_cells', lambda result: frozenset(chain.from_iterable(result.rows)))
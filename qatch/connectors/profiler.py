@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# stack of the names of the components (generators, evaluators, ...) running the current statements
+_caller_stack: contextvars.ContextVar[tuple[str, ...]] = contextvars.ContextVar('qatch_profiling_callers', default=())
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_WHITESPACES = re.compile(r'\s+')
+
+
+@contextlib.contextmanager
+def profiling_caller(name: str) -> Iterator[None]:
+    """
+    Attributes the statements executed inside the context to the component `name`.
+
+    Callers can be nested: the statements are attributed to the whole stack of names, e.g.
+    `('evaluation', 'VES')`. The stack is stored in a context variable, hence it is local to each
+    thread and to each asyncio task.
+
+    Args:
+        name (str): The name of the component, e.g. the generator or the evaluator name.
+    """
+    token = _caller_stack.set(_caller_stack.get() + (name,))
+    try:
+        yield
+    finally:
+        _caller_stack.reset(token)
+
+
+def utils_statement_fingerprint(statement: str) -> str:
+    """Returns the statement with literals replaced by `?` and whitespaces collapsed,
+    so that statements differing only in constants are aggregated together"""
+    statement = _STRING_LITERAL.sub('?', statement)
+    statement = _NUMBER_LITERAL.sub('?', statement)
+    return _WHITESPACES.sub(' ', statement).strip()
+
+
+class StatementRecord:
+    """
+    The profile of an executed statement.
+
+    Attributes:
+        statement (str): The executed statement.
+        callers (tuple[str, ...]): The stack of components that executed the statement, outermost first.
+        duration (float | None): The execution time in seconds, including the fetch of the rows.
+        rows (int | None): The number of returned rows, None if not known.
+        vm_steps (int | None): The number of SQLite virtual machine instructions, approximated to
+            `SqlProfiler.vm_step_interval`. None if not measured by the connector.
+        error (str | None): The name of the exception raised by the statement, if any.
+    """
+    __slots__ = ('statement', 'callers', 'duration', 'rows', 'vm_steps', 'error')
+
+    def __init__(self, statement: str, callers: tuple[str, ...]):
+        self.statement = statement
+        self.callers = callers
+        self.duration = None
+        self.rows = None
+        self.vm_steps = None
+        self.error = None
+
+    def __repr__(self) -> str:
+        return (f'StatementRecord(callers={self.callers}, duration={self.duration}, rows={self.rows}, '
+                f'vm_steps={self.vm_steps}, error={self.error}, statement={self.statement!r})')
+
+
+class SqlProfiler:
+    """
+    Statement-level profiler of the connector traffic.
+
+    Every statement executed by a connector with this profiler is recorded with the stack of its callers
+    (see `profiling_caller`: generators and evaluators set their name), its duration, the number of returned rows
+    and, for SQLite, the number of virtual machine steps. The records can be aggregated in a top-N report
+    or exported as folded stacks, the input format of flamegraph tools (e.g. `flamegraph.pl` or speedscope).
+
+    The profiler can be attached to a single connector with `BaseConnector.set_profiler` or installed for all
+    the connectors, including the ones created internally by the orchestrators, using it as a context manager.
+
+    Note:
+        - VM steps are counted with the SQLite progress handler, called every `vm_step_interval` instructions,
+        hence they are a multiple of `vm_step_interval`. A lower interval is more precise but slower.
+        - Statements executed with `iter_query` include in their duration the time spent by the consumer
+        of the rows.
+
+    Attributes:
+        records (list[StatementRecord]): The profiles of the executed statements, in execution order.
+        vm_step_interval (int): The number of SQLite VM instructions between two progress handler calls.
+
+    Examples:
+        >>> with SqlProfiler() as profiler:
+        ...     evaluator.evaluate_df(df, 'query', 'prediction', 'db_path')
+        >>> profiler.top_n(10)
+        >>> profiler.export_folded('evaluation.folded')
+    """
+
+    def __init__(self, vm_step_interval: int = 100):
+        self.vm_step_interval = vm_step_interval
+        self.records: list[StatementRecord] = []
+        self._lock = threading.Lock()
+        self._previous_profiler = None
+
+    def __enter__(self) -> SqlProfiler:
+        from .base_connector import BaseConnector
+        self._previous_profiler = BaseConnector.profiler
+        BaseConnector.profiler = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        from .base_connector import BaseConnector
+        BaseConnector.profiler = self._previous_profiler
+        self._previous_profiler = None
+
+    @contextlib.contextmanager
+    def profile(self, statement: str) -> Iterator[StatementRecord]:
+        """
+        Records the execution of `statement` inside the context.
+
+        The callers are read when the context is entered, hence the statement can be executed in another thread
+        (e.g. by a timeout wrapper). The connector sets the rows and the VM steps of the yielded record.
+        """
+        record = StatementRecord(statement, _caller_stack.get())
+        start_time = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record.error = type(e).__name__
+            raise
+        finally:
+            record.duration = time.perf_counter() - start_time
+            with self._lock:
+                self.records.append(record)
+
+    @contextlib.contextmanager
+    def count_vm_steps(self, record: StatementRecord | None, dbapi_connection) -> Iterator[None]:
+        """Counts in `record` the SQLite VM steps executed on the connection inside the context.
+        Nothing is counted if `record` is None or the connection does not support progress handlers"""
+        if record is None or not hasattr(dbapi_connection, 'set_progress_handler'):
+            yield
+            return
+        calls = 0
+
+        def progress_handler():
+            nonlocal calls
+            calls += 1
+            return 0
+
+        dbapi_connection.set_progress_handler(progress_handler, self.vm_step_interval)
+        try:
+            yield
+        finally:
+            dbapi_connection.set_progress_handler(None, self.vm_step_interval)
+            record.vm_steps = calls * self.vm_step_interval
+
+    def clear(self):
+        with self._lock:
+            self.records = []
+
+    def to_df(self) -> pd.DataFrame:
+        """
+        Returns the records as a dataframe.
+
+        Returns:
+            pd.DataFrame: The columns `caller` (the caller stack joined by `;`), `statement`, `duration`,
+            `rows`, `vm_steps` and `error`, one row for each executed statement.
+        """
+        import pandas as pd
+
+        columns = ['caller', 'statement', 'duration', 'rows', 'vm_steps', 'error']
+        rows = [(';'.join(record.callers), record.statement, record.duration, record.rows, record.vm_steps,
+                 record.error) for record in self.records]
+        return pd.DataFrame(rows, columns=columns)
+
+    def top_n(self, n: int = 20, by: str = 'total_time') -> pd.DataFrame:
+        """
+        Returns the most expensive statements, aggregated by caller and statement fingerprint
+        (see `utils_statement_fingerprint`).
+
+        Args:
+            n (int): The number of returned statements.
+            by (str): The column used to rank the statements: `total_time`, `mean_time`, `max_time`,
+                `count`, `total_rows` or `total_vm_steps`.
+
+        Returns:
+            pd.DataFrame: The columns `caller`, `statement`, `count`, `total_time`, `mean_time`, `max_time`,
+            `total_rows`, `total_vm_steps` and `errors`, sorted by `by` in descending order.
+        """
+        df = self.to_df()
+        df['statement'] = df['statement'].map(utils_statement_fingerprint)
+        df['failed'] = df['error'].notna()
+        report = df.groupby(['caller', 'statement'], sort=False).agg(
+            count=('duration', 'size'),
+            total_time=('duration', 'sum'),
+            mean_time=('duration', 'mean'),
+            max_time=('duration', 'max'),
+            total_rows=('rows', 'sum'),
+            total_vm_steps=('vm_steps', 'sum'),
+            errors=('failed', 'sum'),
+        ).reset_index()
+        return report.sort_values(by, ascending=False, kind='stable').head(n).reset_index(drop=True)
+
+    def export_folded(self, path: str, weight: str = 'time') -> int:
+        """
+        Writes the records as folded stacks: one line `caller1;caller2;statement value` for each distinct stack.
+
+        The statement fingerprint is the leaf frame, hence the flamegraph shows the cost of each statement
+        below the components that executed it.
+
+        Args:
+            path (str): The path of the output file.
+            weight (str): The value of each stack: `time` (microseconds), `vm_steps`, `rows` or `count`.
+
+        Returns:
+            int: The number of written lines.
+        """
+        if weight not in ('time', 'vm_steps', 'rows', 'count'):
+            raise ValueError(f'Unknown weight `{weight}`, use one of time, vm_steps, rows, count')
+        stack2value = dict()
+        for record in self.records:
+            if weight == 'time':
+                value = round((record.duration or 0.0) * 1e6)
+            elif weight == 'count':
+                value = 1
+            else:
+                value = getattr(record, weight) or 0
+            # `;` separates the frames, the last space separates the value
+            statement = utils_statement_fingerprint(record.statement).replace(';', ',')
+            stack = ';'.join(list(record.callers or ('<unknown>',)) + [statement])
+            stack2value[stack] = stack2value.get(stack, 0) + value
+
+        with open(path, 'w', encoding='utf-8') as file:
+            for stack, value in stack2value.items():
+                file.write(f'{stack} {value}\n')
+        return len(stack2value)
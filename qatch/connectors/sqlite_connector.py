@@ -1,16 +1,26 @@
 from __future__ import annotations
 
 import contextlib
+import time
 from itertools import chain
+from typing import Iterator
 
 import pandas as pd
-from func_timeout import func_set_timeout
+from func_timeout import FunctionTimedOut, func_set_timeout
 from sqlalchemy import create_engine, MetaData, text, Table, String, Numeric, Integer
+from sqlalchemy.exc import OperationalError
 
 from .base_connector import BaseConnector, ConnectorTable, ConnectorTableColumn
+from .compact_result import CompactResult
+from .profiler import StatementRecord
 from .utils import utils_convert_df_in_sql_code
 
 
+def _query_timeout(connector: SqliteConnector, *args, **kwargs) -> float:
+    """The timeout of the queries of the connector, called by `func_set_timeout` for each query"""
+    return connector.query_timeout
+
+
 def _convert_sqlalchemy_type_to_string(type_):
     """Convert the SQLAlchemy type to code specific type string"""
     if isinstance(type_, String):
@@ -34,6 +44,8 @@ class SqliteConnector(BaseConnector):
 
     Note:
         - If a table is named as 'table', the method will replace its name with 'my_table'.
+        - The connector can be pickled (e.g. to send it to another process): the engine is recreated
+        from `db_path` when it is unpickled.
 
     Args:
         relative_db_path (str): A string representing the relative path to the SQLite database.
@@ -42,17 +54,23 @@ class SqliteConnector(BaseConnector):
          are pandas DataFrames, or None.
         table2primary_key (dict[str, pd.DataFrame] | None): An optional dictionary where keys are strings representing table names
          and values are strings representing primary keys, or None.
+        query_timeout (float | None): The maximum number of seconds of each query, after which `FunctionTimedOut`
+         is raised. If None, the class attribute `query_timeout` (500 seconds) is used.
         *args: Additional positional arguments.
         **kwargs: Additional keyword arguments.
     """
+    query_timeout: float = 500
 
     def __init__(self,
                  relative_db_path: str,
                  db_name: str,
                  tables: dict[str, pd.DataFrame] | None = None,
                  table2primary_key: dict[str, str] | None = None,
+                 query_timeout: float | None = None,
                  *args, **kwargs):
         super().__init__(relative_db_path, db_name, *args, **kwargs)
+        if query_timeout is not None:
+            self.query_timeout = query_timeout
         # Create the engine
         self.engine = create_engine(f"sqlite:///{self.db_path}")
         self.metadata = MetaData()
@@ -66,6 +84,20 @@ class SqliteConnector(BaseConnector):
             self._set_tables_in_db(tables, table2primary_key)
             self.metadata.reflect(self.engine)
 
+    def __getstate__(self):
+        # the engine and the reflected metadata are bound to this process, they are rebuilt when unpickled.
+        # The profiler holds a lock and its records would not be shared, hence it is not pickled either.
+        state = dict(self.__dict__)
+        for name in ('engine', 'metadata', 'profiler'):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.engine = create_engine(f"sqlite:///{self.db_path}")
+        self.metadata = MetaData()
+        self.metadata.reflect(self.engine)
+
     @contextlib.contextmanager
     def connection(self):
         with self.engine.connect() as con:
@@ -88,7 +120,6 @@ class SqliteConnector(BaseConnector):
         tbl_name2table = self._update_foreign_key(tbl_name2table)
         return tbl_name2table
 
-    @func_set_timeout(500)
     def run_query(self, query: str) -> list[list]:
         """
         Executes a query on SQLite database and returns the result as a list of lists.
@@ -100,7 +131,9 @@ class SqliteConnector(BaseConnector):
             Hence, the user does not need to explicitly close the connection.
             - This function should not be used with queries that don't return a table of results,
             such as UPDATE or DELETE statements, it is designed for SELECT queries only.
-            - If the query execution requires more than 30 seconds, the function will raise FunctionTimedOut
+            - If the query execution requires more than `query_timeout` seconds, the function will raise FunctionTimedOut
+            - If a profiler is attached (see `SqlProfiler`), the statement is recorded with its duration,
+            number of rows and VM steps.
 
         Args:
             query (str): SQL query string to be executed on the SQLite database.
@@ -109,11 +142,131 @@ class SqliteConnector(BaseConnector):
             list[list]: Returns result of the query in form of list of lists where each member list represents
             a row from the result.
         """
-        with self.connection() as con:
+        with self._profile(query) as record:
+            result = self._run_query(query, record)
+            if record is not None:
+                record.rows = len(result)
+        return result
+
+    @func_set_timeout(_query_timeout)
+    def _run_query(self, query: str, record: StatementRecord | None = None) -> list[list]:
+        with self.connection() as con, self._count_vm_steps(con, record):
             result = con.execute(text(query))
             result = [list(row) for row in result]
         return result
 
+    def run_query_compact(self, query: str) -> CompactResult:
+        """
+        Executes a query on SQLite database and returns the result as a `CompactResult`.
+
+        Differently from `run_query`, the rows are not copied in lists: they are stored as tuples
+        with interned strings, which reduces the memory of results with repeated values.
+
+        Args:
+            query (str): SQL query string to be executed on the SQLite database.
+
+        Returns:
+            CompactResult: The rows of the result set of the query.
+        """
+        with self._profile(query) as record:
+            result = self._run_query_compact(query, record)
+            if record is not None:
+                record.rows = len(result)
+        return result
+
+    @func_set_timeout(_query_timeout)
+    def _run_query_compact(self, query: str, record: StatementRecord | None = None) -> CompactResult:
+        with self.connection() as con, self._count_vm_steps(con, record):
+            result = CompactResult(con.execute(text(query)))
+        return result
+
+    def iter_query(self, query: str, batch_size: int = 1000) -> Iterator[tuple]:
+        """
+        Executes a query on SQLite database and yields the rows fetching `batch_size` rows at a time.
+
+        Note:
+            - Differently from `run_query`, the rows are never materialized all together:
+            use this method when only aggregated statistics of the result are needed.
+            - The query is executed when the first row is requested, hence errors are raised by the
+            first `next` call on the iterator.
+            - The connection is released when the iterator is exhausted or closed.
+            - The query is interrupted if the iteration lasts more than `query_timeout` seconds, including the time
+            spent by the consumer of the rows, and `FunctionTimedOut` is raised. Differently from `run_query`,
+            the query is stopped inside SQLite instead of being abandoned in a thread.
+
+        Args:
+            query (str): SQL query string to be executed on the SQLite database.
+            batch_size (int): The number of rows fetched from the cursor at a time.
+
+        Returns:
+            Iterator[tuple]: The rows of the result set of the query.
+        """
+        with self._profile(query) as record, self.connection() as con, self._interrupt_after_timeout(con, record):
+            result = con.execution_options(stream_results=True).execute(text(query))
+            num_rows = 0
+            for partition in result.partitions(batch_size):
+                num_rows += len(partition)
+                for row in partition:
+                    yield tuple(row)
+            if record is not None:
+                record.rows = num_rows
+
+    @func_set_timeout(_query_timeout)
+    def get_query_columns(self, query: str) -> list[str]:
+        """
+        Returns the names of the columns projected by the query without fetching its rows.
+
+        The query is wrapped in a `LIMIT 0` statement, hence SQLite only prepares it.
+
+        Args:
+            query (str): SQL query string to be inspected.
+
+        Returns:
+            list[str]: The names of the columns returned by the query, in projection order.
+        """
+        # the newlines end a trailing `--` comment of the query before the closing parenthesis
+        statement = f'SELECT * FROM (\n{query}\n) LIMIT 0'
+        with self._profile(statement) as record, self.connection() as con, self._count_vm_steps(con, record):
+            result = con.execute(text(statement))
+            columns = list(result.keys())
+            if record is not None:
+                record.rows = 0
+        return columns
+
+    @contextlib.contextmanager
+    def _interrupt_after_timeout(self, con, record: StatementRecord | None) -> Iterator[None]:
+        """Interrupts the statements executed on `con` inside the context after `query_timeout` seconds, raising
+        `FunctionTimedOut`. The VM steps are also counted in `record`, as SQLite allows a single progress handler"""
+        dbapi_connection = con.connection.dbapi_connection
+        interval = self.profiler.vm_step_interval if record is not None else 1000
+        deadline = time.monotonic() + self.query_timeout
+        calls = 0
+
+        def progress_handler():
+            nonlocal calls
+            calls += 1
+            # a non-zero value interrupts the statement
+            return time.monotonic() > deadline
+
+        dbapi_connection.set_progress_handler(progress_handler, interval)
+        try:
+            yield
+        except OperationalError as e:
+            if time.monotonic() > deadline and 'interrupted' in str(e.orig):
+                raise FunctionTimedOut(f'Query interrupted after {self.query_timeout} seconds',
+                                       self.query_timeout) from e
+            raise
+        finally:
+            dbapi_connection.set_progress_handler(None, interval)
+            if record is not None:
+                record.vm_steps = calls * interval
+
+    def _count_vm_steps(self, con, record: StatementRecord | None):
+        """Context counting in `record` the VM steps executed on the SQLite connection underlying `con`"""
+        if record is None:
+            return contextlib.nullcontext()
+        return self.profiler.count_vm_steps(record, con.connection.dbapi_connection)
+
     def _sample_data_from_col(self, col_name, type_, tbl_name):
         """
         Fetches and returns a sample of data from the specified database column.
@@ -1 +1,15 @@
-from .orchestrator_evaluator import OrchestratorEvaluator
+# The orchestrator (and with it LangGraph, pandas and SQLAlchemy) is imported on first access (PEP 562),
+# hence the metric evaluators can be imported with only the standard library and NumPy.
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .orchestrator_evaluator import OrchestratorEvaluator
+
+__all__ = ['OrchestratorEvaluator']
+
+
+def __getattr__(name: str):
+    if name == 'OrchestratorEvaluator':
+        from .orchestrator_evaluator import OrchestratorEvaluator
+        return OrchestratorEvaluator
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
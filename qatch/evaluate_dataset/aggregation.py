@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from collections.abc import Hashable
+from typing import Callable
+
+import pandas as pd
+
+
+class RunningStatistics:
+    """
+    Count, mean and variance of a stream of values, updated in constant memory with the Welford algorithm.
+
+    Attributes:
+        count (int): The number of values.
+        mean (float): The mean of the values, 0 if there are no values.
+        min (float): The smallest value, infinite if there are no values.
+        max (float): The largest value, minus infinite if there are no values.
+    """
+    __slots__ = ('count', 'mean', 'min', 'max', '_m2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._m2 = 0.0
+
+    def update(self, value: float):
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def merge(self, other: RunningStatistics):
+        """Adds the values of `other` to these statistics (parallel Welford algorithm)"""
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        """The sample variance of the values, NaN with less than two values"""
+        return self._m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def __repr__(self) -> str:
+        return f'RunningStatistics(count={self.count}, mean={self.mean:.4f}, variance={self.variance:.4f})'
+
+
+class MetricsAggregator:
+    """
+    Running aggregates of the metrics while the tests are evaluated, overall and for each group.
+
+    For each column in `group_by` (e.g. `test_category`, `sql_tag` or `tbl_name`) and each of its values,
+    the aggregator keeps the count, mean and variance of each metric. The aggregates over all the tests
+    are reported with group column `all`. None metric values (e.g. tuple order without ORDER BY) are skipped.
+
+    Note:
+        - The memory is proportional to the number of groups and metrics, not to the number of tests.
+        - Tests without a `group_by` column are counted only in the overall aggregates.
+
+    Attributes:
+        group_by (list[str]): The columns of the tests defining the groups.
+        callback (Callable[[MetricsAggregator], None] | None): Called every `callback_every` tests.
+        callback_every (int): The number of updates between two callback calls.
+        num_tests (int): The number of aggregated tests.
+
+    Args:
+        group_by (list[str] | None): The columns of the tests defining the groups.
+        callback (Callable[[MetricsAggregator], None] | None): Function called with the aggregator every
+            `callback_every` tests, e.g. to log the running means.
+        callback_every (int): The number of updates between two callback calls.
+
+    Examples:
+        >>> aggregator = MetricsAggregator(['test_category'], callback=lambda agg: print(agg.means()))
+        >>> evaluator.evaluate_df(df, 'query', 'prediction', 'db_path', aggregator=aggregator)
+        >>> aggregator.summary()
+    """
+
+    def __init__(self,
+                 group_by: list[str] | None = None,
+                 callback: Callable[[MetricsAggregator], None] | None = None,
+                 callback_every: int = 100):
+        self.group_by = group_by or []
+        self.callback = callback
+        self.callback_every = callback_every
+        self.num_tests = 0
+        # (group column, group value) -> metric -> statistics
+        self._statistics: dict[tuple, dict[str, RunningStatistics]] = defaultdict(
+            lambda: defaultdict(RunningStatistics)
+        )
+
+    def update(self, test: dict, metrics: dict):
+        """Adds the metrics of an evaluated test to the aggregates of its groups"""
+        groups = [('all', None)]
+        for column in self.group_by:
+            value = test.get(column)
+            if value is None or (isinstance(value, float) and math.isnan(value)):
+                continue
+            groups.append((column, value if isinstance(value, Hashable) else str(value)))
+
+        for metric, value in metrics.items():
+            if value is None or (isinstance(value, float) and math.isnan(value)):
+                continue
+            for group in groups:
+                self._statistics[group][metric].update(float(value))
+
+        self.num_tests += 1
+        if self.callback is not None and self.num_tests % self.callback_every == 0:
+            self.callback(self)
+
+    def statistics(self, group_column: str = 'all', group_value=None) -> dict[str, RunningStatistics]:
+        """Returns the statistics of each metric in the group"""
+        return dict(self._statistics.get((group_column, group_value), {}))
+
+    def means(self, group_column: str = 'all', group_value=None) -> dict[str, float]:
+        """Returns the running mean of each metric in the group"""
+        return {metric: stats.mean for metric, stats in self.statistics(group_column, group_value).items()}
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Returns the aggregates as a dataframe.
+
+        Returns:
+            pd.DataFrame: The columns `group_by`, `group`, `metric`, `count`, `mean`, `variance` and `std`.
+        """
+        rows = [
+            {'group_by': column, 'group': value, 'metric': metric, 'count': stats.count,
+             'mean': stats.mean, 'variance': stats.variance, 'std': stats.std}
+            for (column, value), metric2stats in self._statistics.items()
+            for metric, stats in metric2stats.items()
+        ]
+        return pd.DataFrame(rows, columns=['group_by', 'group', 'metric', 'count', 'mean', 'variance', 'std'])
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+
+
+def utils_test_id(*fields) -> str:
+    """
+    Returns a stable identifier for a test, computed as the SHA-1 of its JSON-serialized fields.
+
+    Differently from the built-in `hash`, the identifier is the same across processes and runs.
+
+    Args:
+        *fields: The fields identifying the test, e.g. the database path, the target and the prediction.
+
+    Returns:
+        str: The hexadecimal digest identifying the test.
+    """
+    serialized = json.dumps(fields, default=str, ensure_ascii=False)
+    return hashlib.sha1(serialized.encode('utf-8')).hexdigest()
+
+
+class EvaluationCheckpoint:
+    """
+    Append-only JSON Lines file holding the metrics of the already evaluated tests.
+
+    Each line contains a record `{"test_id": str, "metrics": dict, "error": str | None}`. The records are
+    buffered in memory and appended to the file every `flush_every` tests, hence a crash loses at most
+    `flush_every` evaluations. Records truncated by a crash are skipped when the file is loaded.
+
+    The first line of a new checkpoint is the header `{"config": dict}` with the configuration of the evaluator
+    (e.g. metrics, mode and SQL normalization). A checkpoint written with a different configuration is refused,
+    as its records are not comparable with the new ones.
+
+    Note:
+        - Use the class as a context manager to flush the remaining records on exit, also in case of exceptions.
+        - When the same test id is recorded more than once, the last record wins.
+        - Checkpoints without header (e.g. written by older versions) are resumed with a warning.
+
+    Attributes:
+        path (str): The path of the checkpoint file.
+        flush_every (int): The number of buffered records that triggers a write on disk.
+        completed (dict[str, dict]): The records loaded from the file and added afterward, keyed by test id.
+        config (dict | None): The configuration of the evaluator writing the records.
+
+    Args:
+        path (str): The path of the checkpoint file. It is created if it does not exist.
+        flush_every (int): The number of buffered records that triggers a write on disk.
+        config (dict | None): The JSON-serializable configuration of the evaluator writing the records,
+            checked against the header of an existing checkpoint. None to skip the check.
+
+    Raises:
+        ValueError: If the checkpoint was written with a configuration different from `config`.
+    """
+
+    def __init__(self, path: str, flush_every: int = 100, config: dict | None = None):
+        self.path = path
+        self.flush_every = flush_every
+        self.config = config
+        self._missing_newline = False  # the last line was truncated by a crash
+        self._header: dict | None = None
+        self.completed: dict[str, dict] = self._load()
+        self._buffer: list[dict] = []
+        self._check_config()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.flush()
+
+    def __contains__(self, test_id: str) -> bool:
+        return test_id in self.completed
+
+    def get(self, test_id: str) -> dict | None:
+        return self.completed.get(test_id)
+
+    def add(self, test_id: str, metrics: dict, error: str | None = None):
+        """Records the metrics (or the error) of a completed test"""
+        record = {'test_id': test_id, 'metrics': metrics, 'error': error}
+        self.completed[test_id] = record
+        self._buffer.append(record)
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Appends the buffered records to the file"""
+        if not self._buffer:
+            return
+        with open(self.path, 'a', encoding='utf-8') as f:
+            if self._missing_newline:
+                f.write('\n')
+                self._missing_newline = False
+            for record in self._buffer:
+                f.write(json.dumps(record, default=float, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._buffer = []
+
+    def _load(self) -> dict[str, dict]:
+        completed = dict()
+        if not os.path.exists(self.path):
+            return completed
+        with open(self.path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                self._missing_newline = not line.endswith('\n')
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f'Skipping corrupted line {line_number} in checkpoint {self.path}')
+                    continue
+                if 'test_id' not in record:
+                    self._header = record
+                    continue
+                completed[record['test_id']] = record
+        return completed
+
+    def _check_config(self):
+        if self.config is None:
+            return
+        if self._header is not None:
+            if self._header.get('config') != self.config:
+                raise ValueError(f'Checkpoint {self.path} was written with configuration {self._header.get("config")}, '
+                                 f'which differs from {self.config}: use another checkpoint path')
+            return
+        if self.completed:
+            logging.warning(f'Checkpoint {self.path} has no configuration header, '
+                            f'it cannot be checked against {self.config}')
+            return
+        self._header = {'config': self.config}
+        self._buffer.append(self._header)
+        self.flush()
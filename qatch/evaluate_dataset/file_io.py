@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import os
+from typing import Iterator
+
+import pandas as pd
+
+SUPPORTED_INPUT_FORMATS = ('.jsonl', '.csv', '.parquet')
+SUPPORTED_OUTPUT_FORMATS = ('.jsonl', '.csv')
+
+
+def _file_format(path: str, supported: tuple[str, ...]) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in supported:
+        raise ValueError(f'File `{path}` must have one of the extensions {list(supported)}')
+    return extension
+
+
+def utils_iter_file_chunks(path: str, chunk_size: int = 1000) -> Iterator[pd.DataFrame]:
+    """
+    Reads a JSON Lines, CSV or Parquet file lazily, `chunk_size` rows at a time.
+
+    Note:
+        - Reading Parquet files requires `pyarrow`, which is imported only for this format.
+        - JSON values are not converted, e.g. dates are kept as strings.
+
+    Args:
+        path (str): The path of the file, whose extension selects the format.
+        chunk_size (int): The maximum number of rows of each chunk.
+
+    Returns:
+        Iterator[pd.DataFrame]: The chunks of the file, in order.
+
+    Raises:
+        ValueError: If the file extension is not supported.
+        ImportError: If the file is a Parquet file and `pyarrow` is not installed.
+    """
+    extension = _file_format(path, SUPPORTED_INPUT_FORMATS)
+    if extension == '.jsonl':
+        with pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False, convert_dates=False) as reader:
+            yield from reader
+    elif extension == '.csv':
+        with pd.read_csv(path, chunksize=chunk_size) as reader:
+            yield from reader
+    else:
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError('Reading Parquet files requires `pyarrow`, install it with `pip install pyarrow`') from e
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+
+
+class ChunkWriter:
+    """
+    Writes dataframes to a JSON Lines or CSV file, appending one chunk at a time.
+
+    The file is truncated when the writer is created. For CSV files, the header is written with the first chunk
+    and the columns of the following chunks are aligned to it.
+
+    Attributes:
+        path (str): The path of the output file.
+        num_rows (int): The number of rows written so far.
+
+    Args:
+        path (str): The path of the output file, whose extension selects the format.
+
+    Raises:
+        ValueError: If the file extension is not supported.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.num_rows = 0
+        self._format = _file_format(path, SUPPORTED_OUTPUT_FORMATS)
+        self._columns = None
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        if self._format == '.jsonl':
+            # each line ends with a newline, hence chunks can be appended
+            df.to_json(self._file, orient='records', lines=True, force_ascii=False)
+        else:
+            if self._columns is None:
+                self._columns = list(df.columns)
+            df.reindex(columns=self._columns).to_csv(self._file, header=self.num_rows == 0, index=False)
+        self._file.flush()
+        self.num_rows += len(df)
+
+    def close(self):
+        self._file.close()
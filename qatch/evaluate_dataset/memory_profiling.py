@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import contextlib
+import math
+import tracemalloc
+from typing import Iterator
+
+import pandas as pd
+
+
+@contextlib.contextmanager
+def utils_trace_memory() -> Iterator[None]:
+    """
+    Traces the Python allocations with `tracemalloc` inside the context.
+
+    If the allocations are already traced, the context does nothing, hence it can be nested.
+    Otherwise, tracing is stopped on exit, which releases the memory used by the traces.
+    """
+    if tracemalloc.is_tracing():
+        yield
+        return
+    tracemalloc.start()
+    try:
+        yield
+    finally:
+        tracemalloc.stop()
+
+
+def utils_memory_report(df: pd.DataFrame, n: int = 10, peak_col_name: str = 'peak_memory') -> pd.DataFrame:
+    """
+    Returns the tests with the highest peak memory, evaluated with `OrchestratorEvaluator(record_memory=True)`.
+
+    Args:
+        df (pd.DataFrame): The evaluated tests.
+        n (int): The number of returned tests.
+        peak_col_name (str): The column with the peak memory of each test, e.g. `<prediction column>_peak_memory`
+            when several predictions are evaluated.
+
+    Returns:
+        pd.DataFrame: The `n` tests with the highest peak memory, in descending order, with the additional
+        column `peak_memory_mb`.
+    """
+    report = df.dropna(subset=[peak_col_name]).nlargest(n, peak_col_name).copy()
+    report['peak_memory_mb'] = report[peak_col_name] / 2 ** 20
+    return report
+
+
+def utils_memory_budget(df: pd.DataFrame,
+                        memory_limit: int,
+                        quantile: float = 0.99,
+                        peak_col_name: str = 'peak_memory',
+                        target_rows_col_name: str = 'target_rows',
+                        predicted_rows_col_name: str = 'predicted_rows') -> dict:
+    """
+    Derives the row and parallelism budget of an evaluation worker from the peak memory of evaluated tests.
+
+    The memory of a test is modelled as proportional to the rows of the target and predicted results:
+    the bytes per row are the `quantile` of the peak memory divided by the rows, over the evaluated tests.
+
+    Args:
+        df (pd.DataFrame): The tests evaluated with `OrchestratorEvaluator(record_memory=True)`.
+        memory_limit (int): The memory available to the worker, in bytes.
+        quantile (float): The quantile of the per-test values used for the budget, e.g. 0.99.
+        peak_col_name (str): The column with the peak memory of each test.
+        target_rows_col_name (str): The column with the rows of the target result.
+        predicted_rows_col_name (str): The column with the rows of the predicted result.
+
+    Returns:
+        dict: `peak_memory` (bytes, the `quantile` of the per-test peak), `bytes_per_row`, `max_result_rows`
+        (the target plus predicted rows of a single test that fit in `memory_limit`) and `max_parallel_tests`
+        (the tests that can be evaluated at the same time within `memory_limit`).
+    """
+    df = df.dropna(subset=[peak_col_name, target_rows_col_name, predicted_rows_col_name])
+    if df.empty:
+        raise ValueError('No test with peak memory and rows, evaluate them with `record_memory=True`')
+    rows = df[target_rows_col_name] + df[predicted_rows_col_name]
+    peak_memory = float(df[peak_col_name].quantile(quantile))
+    bytes_per_row = float((df[peak_col_name] / rows.clip(lower=1)).quantile(quantile))
+    return {
+        'peak_memory': peak_memory,
+        'bytes_per_row': bytes_per_row,
+        'max_result_rows': int(memory_limit / bytes_per_row) if bytes_per_row > 0 else math.inf,
+        'max_parallel_tests': max(1, int(memory_limit / peak_memory)) if peak_memory > 0 else math.inf,
+    }
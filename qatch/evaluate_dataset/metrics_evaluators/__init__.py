@@ -5,3 +5,11 @@ from .tuple_cardinality import TupleCardinality
 from .tuple_constraint import TupleConstraint
 from .tuple_order import TupleOrder
 from .valid_efficiency_score import ValidEfficiencyScore
+from .approximate_metrics import ApproxCellPrecision, ApproxCellRecall, ApproxTupleConstraint, SketchStatistics
+from .streaming import (
+    ResultStatistics,
+    StreamingCellPrecision,
+    StreamingCellRecall,
+    StreamingTupleCardinality,
+    StreamingTupleConstraint,
+)
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+from abc import abstractmethod
+from collections import deque
+from itertools import chain
+from typing import Iterable, Iterator, Literal
+
+from .base_evaluator import BaseEvaluator, EvaluatedTest
+from .sketches import BottomKSketch, hash64, proportion_error_bound
+from .utils import sort_with_different_types
+
+
+def _empty_results_metric(target_len: int, prediction_len: int) -> tuple[float, float] | None:
+    """Edge cases shared with the exact metrics: empty target and/or prediction"""
+    if target_len == prediction_len == 0:
+        return 1.0, 0.0
+    if target_len == 0 or prediction_len == 0:
+        return 0.0, 0.0
+    return None
+
+
+class SketchStatistics:
+    """
+    Bottom-k sketches of a query result, built consuming its rows only once.
+
+    The bounded-memory counterpart of `ResultStatistics`: the approximate evaluators accept it in place of the
+    rows, hence the results of `mode="streaming"` are never materialized.
+
+    Attributes:
+        num_rows (int): The number of rows in the result.
+        cell_sketch (BottomKSketch | None): The sketch of the cells, None if not requested.
+        tuple_sketch (BottomKSketch | None): The sketch of the tuples, whose cells are sorted with
+            `sort_with_different_types`. None if not requested or if `tuple_hashes` is provided.
+        tuple_counts (dict[int, int] | None): The occurrences of the tuples with hash in `tuple_hashes`,
+            None if `tuple_hashes` is not provided.
+
+    Args:
+        rows (Iterable | None): The rows of the result. If None, the statistics are updated by `observe`.
+        sketch_size (int): The number of hashes kept in each sketch.
+        with_cells (bool): Whether to sketch the cells.
+        with_tuples (bool): Whether to sketch (or count) the tuples.
+        tuple_hashes (Iterable[int] | None): If provided, only the occurrences of these tuple hashes are counted,
+            e.g. the `tuple_sketch.counts` of the target when the statistics are of the prediction.
+    """
+    __slots__ = ('num_rows', 'cell_sketch', 'tuple_sketch', 'tuple_counts')
+
+    def __init__(self, rows: Iterable | None = None, sketch_size: int = 4096, with_cells: bool = True,
+                 with_tuples: bool = True, tuple_hashes: Iterable[int] | None = None):
+        self.num_rows = 0
+        self.cell_sketch = BottomKSketch(sketch_size) if with_cells else None
+        self.tuple_sketch = BottomKSketch(sketch_size) if with_tuples and tuple_hashes is None else None
+        self.tuple_counts = dict.fromkeys(tuple_hashes, 0) if with_tuples and tuple_hashes is not None else None
+        if rows is not None:
+            deque(self.observe(rows), maxlen=0)
+
+    def observe(self, rows: Iterable) -> Iterator:
+        """Yields the rows updating the statistics, so that other statistics can consume them in the same pass"""
+        for row in rows:
+            self.num_rows += 1
+            if self.cell_sketch is not None:
+                self.cell_sketch.update(row)
+            if self.tuple_sketch is not None:
+                self.tuple_sketch.add(tuple(sort_with_different_types(row)))
+            elif self.tuple_counts is not None:
+                h = hash64(tuple(sort_with_different_types(row)))
+                if h in self.tuple_counts:
+                    self.tuple_counts[h] += 1
+            yield row
+
+
+def _num_rows(result: SketchStatistics | list[list]) -> int:
+    return result.num_rows if isinstance(result, SketchStatistics) else len(result)
+
+
+class BaseApproximateEvaluator(BaseEvaluator):
+    """
+    Base class for the evaluators that estimate a metric with bounded memory.
+
+    The estimates are computed on bottom-k sketches of the cell/tuple hashes: memory is bounded by
+    `sketch_size` and the estimate is exact when the results contain less than `sketch_size` distinct elements.
+    Each approximate evaluator reports the estimate with the name of the exact metric, and the half-width
+    of its confidence interval in the `error_name` column.
+    The target and the prediction are either the rows of the results or their `SketchStatistics`.
+
+    Attributes:
+        sketch_size (int): The number of hashes kept in each sketch.
+        confidence (float): The confidence level of the reported error bound.
+    """
+
+    def __init__(self, sketch_size: int = 4096, confidence: float = 0.95, seed=2023):
+        super().__init__(seed)
+        self.sketch_size = sketch_size
+        self.confidence = confidence
+
+    @property
+    def error_name(self):
+        """This name represent the column of the error bound in the output"""
+        return f'{self.metric_name}_error_bound'
+
+    def graph_call(self, state) -> dict[Literal['evaluated_tests']: EvaluatedTest]:
+        """
+        Same as `BaseEvaluator.graph_call`, but returns both the estimate and its error bound.
+        """
+        predicted_test = state['predicted_test']
+        estimate, error_bound = self.run_metric_with_error(
+            target=predicted_test.target_values,
+            prediction=predicted_test.predicted_values,
+        )
+        return {'evaluated_tests': [EvaluatedTest(metric_name=self.metric_name, metric_value=estimate),
+                                    EvaluatedTest(metric_name=self.error_name, metric_value=error_bound)]}
+
+    def run_metric(self, target: list[list], prediction: list[list], *args, **kwargs) -> float | int:
+        """Returns only the estimate of the metric. See `run_metric_with_error`."""
+        return self.run_metric_with_error(target, prediction)[0]
+
+    @abstractmethod
+    def run_metric_with_error(self, target: SketchStatistics | list[list],
+                              prediction: SketchStatistics | list[list]) -> tuple[float, float]:
+        """
+        Estimates the metric and its error bound.
+
+        Args:
+            target (SketchStatistics | list[list]): Target table to be compared with the prediction table.
+            prediction (SketchStatistics | list[list]): Prediction table to be compared with the target table.
+
+        Returns:
+            tuple[float, float]: The estimate of the metric and the half-width of its confidence interval.
+                The error bound is 0 when the estimate is exact.
+        """
+        raise NotImplementedError
+
+    def _cell_sketch(self, result: SketchStatistics | list[list]) -> BottomKSketch:
+        if isinstance(result, SketchStatistics):
+            return result.cell_sketch
+        return BottomKSketch(self.sketch_size, chain.from_iterable(result))
+
+    def _estimate_cell_coverage(self, sampled: SketchStatistics | list[list],
+                                reference: SketchStatistics | list[list]) -> tuple[float, float]:
+        """Estimates the ratio of distinct cells in `sampled` that are also in `reference`"""
+        sampled_sketch = self._cell_sketch(sampled)
+        reference_sketch = self._cell_sketch(reference)
+        # below the threshold of both sketches, the membership of a sampled hash is known exactly
+        threshold = min(sampled_sketch.threshold, reference_sketch.threshold)
+        sample = [h for h in sampled_sketch.counts if h <= threshold]
+        matched = sum(h in reference_sketch.counts for h in sample)
+        if not sample:
+            return 0.0, 1.0
+        error_bound = 0.0
+        if sampled_sketch.saturated or reference_sketch.saturated:
+            error_bound = proportion_error_bound(matched, len(sample), sampled_sketch.cardinality(), self.confidence)
+        return round(matched / len(sample), 3), round(error_bound, 3)
+
+
+class ApproxCellPrecision(BaseApproximateEvaluator):
+    @property
+    def metric_name(self):
+        return 'cell_precision'
+
+    def run_metric_with_error(self, target: SketchStatistics | list[list],
+                              prediction: SketchStatistics | list[list]) -> tuple[float, float]:
+        """
+        Estimates the ratio of predicted cells that are in the target, see `CellPrecision`.
+
+        A uniform sample of the distinct predicted cells is drawn with a bottom-k sketch and each
+        sampled cell is looked up in the bottom-k sketch of the target.
+
+        Args:
+            target (SketchStatistics | list[list]): Target table to be compared with the prediction table.
+            prediction (SketchStatistics | list[list]): Prediction table to be compared with the target table.
+
+        Returns:
+            tuple[float, float]: The estimated precision in [0, 1] and its error bound.
+
+        Examples:
+            >>> evaluator = ApproxCellPrecision(sketch_size=1024)
+            >>> target = [['a', 'b'], ['c', 'd']]
+            >>> prediction = [['a', 'b'], ['c', 'e']]
+            >>> evaluator.run_metric_with_error(target, prediction)
+            (0.75, 0.0)  # exact, the results are smaller than the sketch
+        """
+        edge_case = _empty_results_metric(_num_rows(target), _num_rows(prediction))
+        if edge_case is not None:
+            return edge_case
+        return self._estimate_cell_coverage(prediction, target)
+
+
+class ApproxCellRecall(BaseApproximateEvaluator):
+    @property
+    def metric_name(self):
+        return 'cell_recall'
+
+    def run_metric_with_error(self, target: SketchStatistics | list[list],
+                              prediction: SketchStatistics | list[list]) -> tuple[float, float]:
+        """
+        Estimates the ratio of target cells that are in the prediction, see `CellRecall`.
+
+        A uniform sample of the distinct target cells is drawn with a bottom-k sketch and each
+        sampled cell is looked up in the bottom-k sketch of the prediction.
+
+        Args:
+            target (SketchStatistics | list[list]): Target table to be compared with the prediction table.
+            prediction (SketchStatistics | list[list]): Prediction table to be compared with the target table.
+
+        Returns:
+            tuple[float, float]: The estimated recall in [0, 1] and its error bound.
+        """
+        edge_case = _empty_results_metric(_num_rows(target), _num_rows(prediction))
+        if edge_case is not None:
+            return edge_case
+        return self._estimate_cell_coverage(target, prediction)
+
+
+class ApproxTupleConstraint(BaseApproximateEvaluator):
+    @property
+    def metric_name(self):
+        return 'tuple_constraint'
+
+    def run_metric_with_error(self, target: SketchStatistics | list[list],
+                              prediction: SketchStatistics | list[list]) -> tuple[float, float]:
+        """
+        Estimates the ratio of target tuples with the same cardinality in the prediction, see `TupleConstraint`.
+
+        A uniform sample of the distinct target tuples is drawn with a bottom-k sketch, which also holds
+        their exact cardinality. The prediction is then scanned counting only the sampled tuples: if it is given
+        as `SketchStatistics`, they are its `tuple_counts` or, without them, the sample is restricted to the
+        hashes below the threshold of its tuple sketch.
+
+        Args:
+            target (SketchStatistics | list[list]): Target table to be compared with the prediction table.
+            prediction (SketchStatistics | list[list]): Prediction table to be compared with the target table.
+
+        Returns:
+            tuple[float, float]: The estimated tuple constraint in [0, 1] and its error bound.
+        """
+        edge_case = _empty_results_metric(_num_rows(target), _num_rows(prediction))
+        if edge_case is not None:
+            return edge_case
+
+        # When comparing tuples, the projection orders do not matter (Name, Surname) = (Surname, Name)
+        if isinstance(target, SketchStatistics):
+            target_sketch = target.tuple_sketch
+        else:
+            target_sketch = BottomKSketch(self.sketch_size,
+                                          (tuple(sort_with_different_types(row)) for row in target))
+        sample = target_sketch.counts
+        if isinstance(prediction, SketchStatistics) and prediction.tuple_counts is not None:
+            prediction_counts = prediction.tuple_counts
+        elif isinstance(prediction, SketchStatistics):
+            # the occurrences in the prediction are known only below the threshold of its sketch
+            threshold = prediction.tuple_sketch.threshold
+            sample = {h: count for h, count in sample.items() if h <= threshold}
+            prediction_counts = prediction.tuple_sketch.counts
+        else:
+            prediction_counts = dict.fromkeys(sample, 0)
+            for row in prediction:
+                h = hash64(tuple(sort_with_different_types(row)))
+                if h in prediction_counts:
+                    prediction_counts[h] += 1
+        if not sample:
+            return 0.0, 1.0
+
+        matched = sum(prediction_counts.get(h, 0) == count for h, count in sample.items())
+        sample_size = len(sample)
+        error_bound = 0.0
+        if target_sketch.saturated or len(sample) < len(target_sketch.counts):
+            error_bound = proportion_error_bound(matched, sample_size, target_sketch.cardinality(), self.confidence)
+        return round(matched / sample_size, 3), round(error_bound, 3)
@@ -2,11 +2,13 @@ from __future__ import annotations
 
 import random
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Literal, TypedDict
 
-from typing_extensions import Literal, TypedDict
+from ...connectors.profiler import profiling_caller
 
-from ..state_orchestrator_evaluator import StateOrchestratorEvaluator
-from ...connectors import BaseConnector
+if TYPE_CHECKING:
+    from ..state_orchestrator_evaluator import StateOrchestratorEvaluator
+    from ...connectors import BaseConnector
 
 
 class EvaluatedTest(TypedDict):
@@ -65,13 +67,14 @@ class BaseEvaluator(ABC):
              `_wrapper_run_metric`.
         """
         predicted_test = state['predicted_test']
-        evaluated_test = self.run_metric(
-            target=predicted_test.target_values,
-            prediction=predicted_test.predicted_values,
-            target_query=predicted_test.target_query,
-            predicted_query=predicted_test.predicted_query,
-            connector=state['connector']
-        )
+        with profiling_caller(self.metric_name):
+            evaluated_test = self.run_metric(
+                target=predicted_test.target_values,
+                prediction=predicted_test.predicted_values,
+                target_query=predicted_test.target_query,
+                predicted_query=predicted_test.predicted_query,
+                connector=state['connector']
+            )
         return {'evaluated_tests': [EvaluatedTest(metric_name=self.metric_name, metric_value=evaluated_test)]}
 
     @abstractmethod
@@ -82,6 +85,7 @@ class BaseEvaluator(ABC):
         Args:
             target (list[list]): The ground truth values to be compared against the predictions.
                                  Each sublist represents a different set of associated target values.
+                                 A `CompactResult` can be passed in place of the list of lists.
 
             prediction (list[list]): The predicted values to be evaluated against the target.
                                      Each sublist represents a different set of associated predicted values.
@@ -1,8 +1,7 @@
 from __future__ import annotations
 
-from itertools import chain
-
 from .base_evaluator import BaseEvaluator
+from .utils import distinct_cells
 
 
 class CellPrecision(BaseEvaluator):
@@ -52,8 +51,8 @@ class CellPrecision(BaseEvaluator):
         if prediction_len != 0 and target_len == 0 or prediction_len == 0 and target_len != 0:
             return 0.0
 
-        target = set(chain.from_iterable(target))
-        prediction = set(chain.from_iterable(prediction))
+        target = distinct_cells(target)
+        prediction = distinct_cells(prediction)
         intersected_cells = target.intersection(prediction)
         sum_cell_match = len(intersected_cells)
         return round(sum_cell_match / len(prediction), 3)
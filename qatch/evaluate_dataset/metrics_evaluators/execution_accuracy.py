@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from .base_evaluator import BaseEvaluator
-from .utils import sort_with_different_types
+from .utils import canonical_rows
 
 
 class ExecutionAccuracy(BaseEvaluator):
@@ -41,11 +41,7 @@ class ExecutionAccuracy(BaseEvaluator):
         if len(target) != len(prediction):
             return 0.0
 
-        gold_row_set = set()
-        pred_row_set = set()
-
-        for gold_row, predicted_row in zip(target, prediction):
-            gold_row_set.add(tuple(sort_with_different_types(gold_row)))
-            pred_row_set.add(tuple(sort_with_different_types(predicted_row)))
+        gold_row_set = set(canonical_rows(target))
+        pred_row_set = set(canonical_rows(prediction))
 
         return int(gold_row_set == pred_row_set)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import heapq
+import math
+import struct
+from statistics import NormalDist
+from typing import Iterable, Hashable
+
+_MASK64 = (1 << 64) - 1
+_FLOAT_TAG = 0x5BD1E9955BD1E995
+_NONE_HASH = 0x27D4EB2F165667C5
+
+
+def _mix64(x: int) -> int:
+    """splitmix64 finalizer: spreads the input bits uniformly over 64 bits"""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+def hash64(value: Hashable) -> int:
+    """
+    Returns a uniformly distributed 64-bit hash of the value.
+
+    Values that are equal in Python have the same hash, as in sets: `1`, `1.0` and `True` collide,
+    while `1` and `'1'` do not. Tuples are hashed element by element.
+
+    Note:
+        - Strings rely on the built-in `hash`, hence their hashes are consistent only within the same process.
+
+    Args:
+        value (Hashable): A cell value or a tuple of cell values.
+
+    Returns:
+        int: The 64-bit hash of the value.
+    """
+    if value is None:
+        return _NONE_HASH
+    if isinstance(value, tuple):
+        h = len(value)
+        for element in value:
+            h = _mix64(h ^ hash64(element))
+        return h
+    if isinstance(value, float):
+        if not value.is_integer():
+            return _mix64(struct.unpack('<Q', struct.pack('<d', value))[0] ^ _FLOAT_TAG)
+        value = int(value)
+    if isinstance(value, int) and -(1 << 63) <= value < (1 << 64):
+        return _mix64(value & _MASK64)
+    return _mix64(hash(value) & _MASK64)
+
+
+class BottomKSketch:
+    """
+    Bottom-k (KMV) sketch of a stream of values.
+
+    The sketch keeps the `k` smallest distinct hashes of the stream together with the number of occurrences
+    of the corresponding values. The memory is bounded by `k` independently of the stream length.
+    When the stream contains at most `k` distinct values, the sketch is exact.
+
+    Note:
+        - The occurrences of the kept hashes are exact: a hash that enters the sketch after being skipped
+          cannot exist, because the admission threshold only decreases.
+
+    Attributes:
+        k (int): The maximum number of hashes kept in the sketch.
+        counts (dict[int, int]): Mapping from the kept hashes to the occurrences of their values.
+        saturated (bool): True if at least one distinct value has been discarded.
+
+    Args:
+        k (int): The maximum number of hashes kept in the sketch.
+        values (Iterable[Hashable] | None): Optional values to add to the sketch.
+    """
+
+    def __init__(self, k: int = 4096, values: Iterable[Hashable] | None = None):
+        if k < 2:
+            raise ValueError('The sketch size must be at least 2')
+        self.k = k
+        self.counts: dict[int, int] = {}
+        self.saturated = False
+        self._heap: list[int] = []  # max-heap on the kept hashes (negated values)
+        if values is not None:
+            self.update(values)
+
+    def add(self, value: Hashable):
+        h = hash64(value)
+        if h in self.counts:
+            self.counts[h] += 1
+        elif len(self.counts) < self.k:
+            self.counts[h] = 1
+            heapq.heappush(self._heap, -h)
+        elif h < -self._heap[0]:
+            self.saturated = True
+            del self.counts[-heapq.heapreplace(self._heap, -h)]
+            self.counts[h] = 1
+        else:
+            self.saturated = True
+
+    def update(self, values: Iterable[Hashable]):
+        for value in values:
+            self.add(value)
+
+    @property
+    def threshold(self) -> int:
+        """The largest hash that is guaranteed to be in the sketch if its value is in the stream"""
+        return -self._heap[0] if self.saturated else _MASK64
+
+    def cardinality(self) -> float:
+        """Estimates the number of distinct values in the stream. The estimate is exact if not saturated"""
+        if not self.saturated:
+            return float(len(self.counts))
+        return (self.k - 1) * _MASK64 / self.threshold
+
+
+def proportion_error_bound(successes: int, trials: int, population: float, confidence: float) -> float:
+    """
+    Returns the half-width of the Wilson score interval of a proportion estimated by sampling.
+
+    The finite population correction is applied, hence the bound is 0 when the sample covers the population.
+
+    Args:
+        successes (int): Number of sampled elements satisfying the property.
+        trials (int): Number of sampled elements.
+        population (float): (Estimated) size of the sampled population.
+        confidence (float): Confidence level of the interval, e.g. 0.95.
+
+    Returns:
+        float: The largest distance between the estimate and the interval bounds.
+    """
+    if trials == 0:
+        return 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    fpc = math.sqrt(max(0.0, 1 - trials / population)) if population > trials else 0.0
+    p = successes / trials
+    denominator = 1 + z ** 2 / trials
+    center = (p + z ** 2 / (2 * trials)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / trials + z ** 2 / (4 * trials ** 2)) / denominator
+    return max(abs(center + half_width - p), abs(p - center + half_width)) * fpc
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Iterable
+
+from .cell_precision import CellPrecision
+from .cell_recall import CellRecall
+from .tuple_cardinality import TupleCardinality
+from .tuple_constraint import TupleConstraint
+from .utils import sort_with_different_types
+
+
+class ResultStatistics:
+    """
+    Set/multiset statistics of a query result, built consuming its rows only once.
+
+    The rows are not stored: only the number of rows, the distinct cells and the cardinality of each
+    (projection-order independent) tuple are kept. Hence, the memory is proportional to the number of
+    distinct values rather than to the size of the result.
+
+    Attributes:
+        num_rows (int): The number of rows in the result.
+        distinct_cells (set | None): The distinct cells of the result, None if not requested.
+        canonical_row_counts (Counter | None): The cardinality of each tuple, whose cells are sorted
+            with `sort_with_different_types`. None if not requested.
+
+    Args:
+        rows (Iterable): The rows of the result, e.g. the cursor returned by `BaseConnector.iter_query`.
+        with_cells (bool): Whether to collect the distinct cells.
+        with_tuples (bool): Whether to collect the cardinality of each tuple.
+    """
+    __slots__ = ('num_rows', 'distinct_cells', 'canonical_row_counts')
+
+    def __init__(self, rows: Iterable, with_cells: bool = True, with_tuples: bool = True):
+        self.num_rows = 0
+        self.distinct_cells = set() if with_cells else None
+        self.canonical_row_counts = Counter() if with_tuples else None
+        for row in rows:
+            self.num_rows += 1
+            if with_cells:
+                self.distinct_cells.update(row)
+            if with_tuples:
+                self.canonical_row_counts[tuple(sort_with_different_types(row))] += 1
+
+
+def _to_statistics(result: ResultStatistics | Iterable, with_cells: bool, with_tuples: bool) -> ResultStatistics:
+    if isinstance(result, ResultStatistics):
+        return result
+    return ResultStatistics(result, with_cells=with_cells, with_tuples=with_tuples)
+
+
+class StreamingCellPrecision(CellPrecision):
+    def run_metric(self, target: ResultStatistics | Iterable, prediction: ResultStatistics | Iterable,
+                   *args, **kwargs) -> float | int:
+        """
+        Same as `CellPrecision.run_metric`, computed on the `ResultStatistics` of target and prediction.
+
+        Args:
+            target (ResultStatistics | Iterable): Statistics or rows of the target table.
+            prediction (ResultStatistics | Iterable): Statistics or rows of the prediction table.
+
+        Returns:
+            float: Precision score between [0, 1].
+        """
+        target = _to_statistics(target, with_cells=True, with_tuples=False)
+        prediction = _to_statistics(prediction, with_cells=True, with_tuples=False)
+        if target.num_rows == prediction.num_rows == 0:
+            return 1.0
+        if target.num_rows == 0 or prediction.num_rows == 0:
+            return 0.0
+        sum_cell_match = len(target.distinct_cells.intersection(prediction.distinct_cells))
+        return round(sum_cell_match / len(prediction.distinct_cells), 3)
+
+
+class StreamingCellRecall(CellRecall):
+    def run_metric(self, target: ResultStatistics | Iterable, prediction: ResultStatistics | Iterable,
+                   *args, **kwargs) -> float | int:
+        """
+        Same as `CellRecall.run_metric`, computed on the `ResultStatistics` of target and prediction.
+
+        Args:
+            target (ResultStatistics | Iterable): Statistics or rows of the target table.
+            prediction (ResultStatistics | Iterable): Statistics or rows of the prediction table.
+
+        Returns:
+            float: Recall score between [0, 1].
+        """
+        target = _to_statistics(target, with_cells=True, with_tuples=False)
+        prediction = _to_statistics(prediction, with_cells=True, with_tuples=False)
+        if target.num_rows == prediction.num_rows == 0:
+            return 1.0
+        if target.num_rows == 0 or prediction.num_rows == 0:
+            return 0.0
+        sum_cell_match = len(target.distinct_cells.intersection(prediction.distinct_cells))
+        return round(sum_cell_match / len(target.distinct_cells), 3)
+
+
+class StreamingTupleCardinality(TupleCardinality):
+    def run_metric(self, target: ResultStatistics | Iterable, prediction: ResultStatistics | Iterable,
+                   *args, **kwargs) -> float | int:
+        """
+        Same as `TupleCardinality.run_metric`, computed on the `ResultStatistics` of target and prediction.
+
+        Args:
+            target (ResultStatistics | Iterable): Statistics or rows of the target table.
+            prediction (ResultStatistics | Iterable): Statistics or rows of the prediction table.
+
+        Returns:
+            float: Score between [0, 1].
+        """
+        target = _to_statistics(target, with_cells=False, with_tuples=False)
+        prediction = _to_statistics(prediction, with_cells=False, with_tuples=False)
+        if target.num_rows == prediction.num_rows == 0:
+            return 1.0
+        return round(min(target.num_rows, prediction.num_rows) / max(target.num_rows, prediction.num_rows), 3)
+
+
+class StreamingTupleConstraint(TupleConstraint):
+    def run_metric(self, target: ResultStatistics | Iterable, prediction: ResultStatistics | Iterable,
+                   *args, **kwargs) -> float | int:
+        """
+        Same as `TupleConstraint.run_metric`, computed on the `ResultStatistics` of target and prediction.
+
+        Args:
+            target (ResultStatistics | Iterable): Statistics or rows of the target table.
+            prediction (ResultStatistics | Iterable): Statistics or rows of the prediction table.
+
+        Returns:
+            float: Score between [0, 1].
+        """
+        target = _to_statistics(target, with_cells=False, with_tuples=True)
+        prediction = _to_statistics(prediction, with_cells=False, with_tuples=True)
+        if target.num_rows == prediction.num_rows == 0:
+            return 1.0
+        if target.num_rows == 0 or prediction.num_rows == 0:
+            return 0.0
+        count_targ_dict = target.canonical_row_counts
+        count_pred_dict = prediction.canonical_row_counts
+        cardinality = [count_pred_dict[key] == count for key, count in count_targ_dict.items()]
+        return round(sum(cardinality) / len(cardinality), 3)
@@ -1,9 +1,7 @@
 from __future__ import annotations
 
-from collections import Counter
-
 from .base_evaluator import BaseEvaluator
-from .utils import sort_with_different_types
+from .utils import canonical_row_counts
 
 
 class TupleConstraint(BaseEvaluator):
@@ -53,11 +51,8 @@ class TupleConstraint(BaseEvaluator):
             return 0.0
 
         # When comparing tuples, the projection orders do not matter (Name, Surname) = (Surname, Name)
-        target = [tuple(sort_with_different_types(row)) for row in target]
-        prediction = [tuple(sort_with_different_types(row)) for row in prediction]
-
-        count_targ_dict = Counter(target)
-        count_pred_dict = Counter(prediction)
+        count_targ_dict = canonical_row_counts(target)
+        count_pred_dict = canonical_row_counts(prediction)
 
         cardinality = [count_pred_dict[key] == count for key, count in count_targ_dict.items()]
 
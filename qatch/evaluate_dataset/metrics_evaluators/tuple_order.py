@@ -53,6 +53,10 @@ class TupleOrder(BaseEvaluator):
         if prediction_len != 0 and target_len == 0 or prediction_len == 0 and target_len != 0:
             return 0.0
 
+        # compare the rows as tuples, the results may be lists of lists or `CompactResult`
+        target = [tuple(row) for row in target]
+        prediction = [tuple(row) for row in prediction]
+
         # take only prediction that are in target without duplicates
         # MAINTAINING the order
         new_pred = []
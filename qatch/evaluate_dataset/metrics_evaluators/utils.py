@@ -1,3 +1,19 @@
+from __future__ import annotations
+
+from collections import Counter
+from itertools import chain
+from typing import Sequence
+
+import numpy as np
+
+from ...connectors.compact_result import CompactResult
+
+_NUMERIC_TYPES = frozenset([int, float, bool])
+# types whose equal values (e.g. 1, 1.0 and True) have equal `sort_key`, so that the keys can be cached by value
+_CACHEABLE_KEY_TYPES = _NUMERIC_TYPES | {str, type(None)}
+_KEY_CACHE_SAMPLE_ROWS = 1000
+
+
 def sort_key(x):
     """Transforms the input value into a tuple for consistent comparison.
 
@@ -30,3 +46,101 @@ def sort_key(x):
 def sort_with_different_types(arr):
     sorted_arr = sorted(arr, key=sort_key)
     return sorted_arr
+
+
+def distinct_cells(result: list[list] | CompactResult) -> set | frozenset:
+    """Returns the distinct cells of the result, cached if the result is a `CompactResult`"""
+    if isinstance(result, CompactResult):
+        return result.distinct_cells
+    return set(chain.from_iterable(result))
+
+
+def canonicalize_rows(rows: Sequence[Sequence]) -> list[tuple]:
+    """
+    Sorts the cells within each row as `sort_with_different_types`, processing the rows in bulk.
+
+    The rows are sorted with the cheapest strategy giving the same order of `sort_key`, chosen from the cell
+    types of the first row, so that results with mixed types (e.g. with NULL values) pay no extra pass:
+
+    - numeric results (int, float and bool cells, without NaN) with rows of the same length are sorted
+      all together with a stable NumPy argsort;
+    - results with only strings are sorted with the built-in `sorted`, without the key function;
+    - the other results are sorted row by row with `sort_key`, computed once for each distinct cell
+      if the cells repeat.
+
+    Args:
+        rows (Sequence[Sequence]): The rows of the result.
+
+    Returns:
+        list[tuple]: The rows with sorted cells, in the same order of the input.
+
+    Examples:
+        >>> canonicalize_rows([[3, 1.5, 2], ['b', 'a'], [None, 'a', 1]])
+        [(1.5, 2, 3), ('a', 'b'), (None, 1, 'a')]
+    """
+    if not rows:
+        return []
+    width = len(rows[0])
+    if width <= 1:
+        return [tuple(row) for row in rows]
+
+    first_row_types = set(map(type, rows[0]))
+    if first_row_types <= _NUMERIC_TYPES:
+        sorted_rows = _canonicalize_numeric_rows(rows, width)
+        if sorted_rows is not None:
+            return sorted_rows
+    elif first_row_types == {str} and all(type(cell) is str for cell in chain.from_iterable(rows)):
+        return [tuple(sorted(row)) for row in rows]
+    return _canonicalize_mixed_rows(rows)
+
+
+def _canonicalize_mixed_rows(rows: Sequence[Sequence]) -> list[tuple]:
+    """Sorts the cells of each row with `sort_key`, computed once for each distinct cell if the cells repeat"""
+    keys = None
+    try:
+        # the cache pays off only if the cells repeat, which is estimated on the first rows
+        sample = rows[:_KEY_CACHE_SAMPLE_ROWS]
+        if len(set(chain.from_iterable(sample))) * 2 <= sum(map(len, sample)):
+            keys = dict.fromkeys(chain.from_iterable(rows))
+    except TypeError:
+        # unhashable cells
+        keys = None
+    if keys is None or not set(map(type, keys)) <= _CACHEABLE_KEY_TYPES:
+        return [tuple(sorted(row, key=sort_key)) for row in rows]
+    for cell in keys:
+        keys[cell] = sort_key(cell)
+    key = keys.__getitem__
+    return [tuple(sorted(row, key=key)) for row in rows]
+
+
+def _canonicalize_numeric_rows(rows: Sequence[Sequence], width: int) -> list[tuple] | None:
+    """Sorts the cells of numeric rows with NumPy, None if the rows are not all numeric with `width` cells"""
+    if not (all(len(row) == width for row in rows)
+            and all(type(cell) in _NUMERIC_TYPES for cell in chain.from_iterable(rows))):
+        return None
+    try:
+        keys = np.array(rows, dtype=np.float64)
+    except OverflowError:
+        return None
+    # NaN cannot be ordered consistently with `sorted`
+    if np.isnan(keys).any():
+        return None
+    order = np.argsort(keys, axis=1, kind='stable')
+    values = np.empty((len(rows), width), dtype=object)
+    values[:] = rows
+    return list(map(tuple, np.take_along_axis(values, order, axis=1).tolist()))
+
+
+def canonical_rows(result: list[list] | CompactResult) -> list[tuple] | tuple[tuple, ...]:
+    """Returns the rows with their cells sorted by `sort_with_different_types`, i.e. independent of the
+    projection order. The rows are cached if the result is a `CompactResult`"""
+    if isinstance(result, CompactResult):
+        return result.cached('canonical_rows', lambda r: tuple(canonicalize_rows(r.rows)))
+    return canonicalize_rows(result)
+
+
+def canonical_row_counts(result: list[list] | CompactResult) -> Counter:
+    """Returns the cardinality of each row in `canonical_rows`, cached if the result is a `CompactResult`"""
+    if isinstance(result, CompactResult):
+        return result.cached('canonical_row_counts', lambda r: Counter(canonical_rows(r)))
+    return Counter(canonical_rows(result))
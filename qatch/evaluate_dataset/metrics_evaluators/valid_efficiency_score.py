@@ -1,14 +1,15 @@
 from __future__ import annotations
 
 import time
+from typing import TYPE_CHECKING
 
 import numpy as np
-from func_timeout import FunctionTimedOut
-import sqlalchemy
 
 from .base_evaluator import BaseEvaluator
 from .execution_accuracy import ExecutionAccuracy
-from ...connectors import BaseConnector
+
+if TYPE_CHECKING:
+    from ...connectors import BaseConnector
 
 
 def _remove_outliers(array: list[float]) -> list[float]:
@@ -56,6 +57,9 @@ class ValidEfficiencyScore(BaseEvaluator):
              It's a product of execution accuracy and efficiency score. it is between 0 and + infinite. larger is better
         """
 
+        # imported here, as the other metrics do not need the database libraries
+        from sqlalchemy.exc import ResourceClosedError
+
         connector = kwargs.get("connector")
         predicted_query = kwargs.get("predicted_query")
         target_query = kwargs.get("target_query")
@@ -65,7 +69,7 @@ class ValidEfficiencyScore(BaseEvaluator):
             relative_efficiency_score = self.relative_execution_efficiency(
                 predicted_query, target_query, connector
             )
-        except sqlalchemy.exc.ResourceClosedError:
+        except ResourceClosedError:
             # error in case the target/prediction does not return any row
             # this is the case when we are working with TQA
             # in this case we set the VES to 0
@@ -85,6 +89,8 @@ class ValidEfficiencyScore(BaseEvaluator):
         return np.sqrt(ratio)
 
     def calculate_expected_execution_time(self, query: str, connector) -> float:
+        from func_timeout import FunctionTimedOut
+
         times = []
         for _ in range(100):
             try:
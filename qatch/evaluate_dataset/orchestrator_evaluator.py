@@ -1,241 +1,1213 @@
-from __future__ import annotations
-
-import logging
-from collections import defaultdict
-
-import pandas as pd
-from func_timeout import FunctionTimedOut
-from langgraph.constants import START, END
-from langgraph.graph import StateGraph
-from sqlalchemy.exc import CompileError, DBAPIError, OperationalError
-from tqdm import tqdm
-
-from .metrics_evaluators import (
-    CellPrecision,
-    CellRecall,
-    TupleCardinality,
-    TupleOrder,
-    TupleConstraint,
-    ExecutionAccuracy,
-    ValidEfficiencyScore,
-)
-from .state_orchestrator_evaluator import StateOrchestratorEvaluator, PredictedTest
-from ..connectors import BaseConnector, SqliteConnector
-
-name2evaluator = {
-    "cell_precision": CellPrecision,
-    "cell_recall": CellRecall,
-    "tuple_cardinality": TupleCardinality,
-    "tuple_order": TupleOrder,
-    "tuple_constraint": TupleConstraint,
-    "execution_accuracy": ExecutionAccuracy,
-    "VES": ValidEfficiencyScore,
-}
-
-
-def _utils_run_query_if_str(
-    query: str | list[list], connector: BaseConnector
-) -> list[list] | None:
-    """
-    This method takes a SQL query or a list of lists and an instance of a BaseConnector.
-    If the query is a string - it attempts to run the query on a supplied connector, handling SQL exceptions and edge cases.
-    If the query is a list - the function simply returns the query.
-
-    Args:
-        query (str|list[list]): Input query or data in the form of string or list of lists.
-        connector (BaseConnector): A BaseConnector object to execute SQL queries on.
-
-    Returns:
-        list[list] | None: Executed query results as a list of lists if query string has been passed.
-                            Passed query if a list of lists has been passed.
-                            None if the query execution resulted in a SQL exception.
-
-    Note:
-        String type queries will have ';' removed before execution for safety reasons.
-
-        This function handles SQL exceptions like CompileError, DBAPIError, FunctionTimedOut and OperationalError.
-        In case of an exception, the function will log a warning and return None.
-    """
-
-    if not isinstance(query, str):
-        return query
-
-    query = query.replace(";", "")
-    try:
-        result = connector.run_query(query)
-        return result
-    except (CompileError, DBAPIError, FunctionTimedOut, OperationalError) as e:
-        logging.warning(e)
-
-
-class OrchestratorEvaluator:
-    """
-    A class that evaluates metrics on test cases using different evaluators.
-
-    This class preprocesses test cases, organizes them in a LangGraph object to execute in parallel the selected metrics
-
-    Note:
-        - The class can accept a predefined list of evaluator names. If no names are provided,
-          it uses all available evaluators.
-        - The evaluation proceeds in parallel for speeding up the execution.
-
-    Attributes:
-        evaluator_names (list[str] | None): A list of evaluator names to use for evaluation, or None to use all.
-        graph (StateGraph[StateOrchestratorEvaluator]): The internal state graph holding the evaluators.
-
-    """
-
-    def __init__(self, evaluator_names: list[str] | None = None):
-        graph = StateGraph(StateOrchestratorEvaluator)
-        self.evaluator_names = evaluator_names or list(name2evaluator.keys())
-        list_node_fun = [
-            (name, name2evaluator[name]().graph_call) for name in self.evaluator_names
-        ]
-
-        for node_name, node_fun in list_node_fun:
-            graph.add_node(node_name, node_fun)
-            graph.add_edge(START, node_name)
-            graph.add_edge(node_name, END)
-
-        self.graph = graph.compile()
-
-    def evaluate_df(
-        self,
-        df: pd.DataFrame,
-        target_col_name: str,
-        prediction_col_name: str,
-        db_path_name: str,
-    ) -> pd.DataFrame:
-        """
-        Evaluates a dataframe with test predictions applying suitable metrics. The function transforms the input
-        dataframe into a dictionary and processes each test case individually. It connects to SQL database and
-        computes metrics for each test case. The computed metrics are added to the dataframe that gets returned.
-
-        Args:
-            df (pd.DataFrame): The input dataframe containing the test predictions.
-            target_col_name (str): The name of the column in the dataframe that contains the target results.
-            prediction_col_name (str): The name of the column in the dataframe that contains the predicted results.
-            db_path_name (str): The name of the field in the dataframe that holds the database path.
-
-        Returns:
-            pd.DataFrame : The input dataframe enriched with the metrics computed for each test case.
-
-        Note:
-            - To speedup execution, the evaluation is performed for each database sequentially
-            in order to not recreate connection.
-        """
-
-        df_dict = df.to_dict("records")
-
-        # create dictionary of db_path to tests. This is used to spedup execution
-        db_path2tests = defaultdict(list)
-        for test in df_dict:
-            db_path2tests[test[db_path_name]].append(test)
-
-        for db_path, tests in db_path2tests.items():
-            # create a connection only once for each test
-            connector = SqliteConnector(relative_db_path=db_path, db_name="_")
-
-            for test in tqdm(
-                tests, desc=f"Evaluating tests for {db_path.split('/')[-1]}"
-            ):
-                metrics = self.evaluate_single_test(
-                    test[target_col_name], test[prediction_col_name], connector
-                )
-
-                for metric, value in metrics.items():
-                    test[metric] = value
-
-        return pd.DataFrame(df_dict)
-
-    def evaluate_single_test(
-        self,
-        target_query: str | list[list],
-        predicted_query: str | list[list],
-        connector: BaseConnector,
-    ) -> dict:
-        """
-        Evaluates a single test/query pair by comparing the predicted results to the expected target.
-
-        The method first checks if the input queries are strings (SQL code) and if the target query contains
-        an 'order by' clause.
-
-        The comparison of the target query with the predicted one is done in a case-insensitive manner.
-        Therefore, if both queries are strings and they are equal, the metrics value is set to 1.0.
-
-        If the input queries are strings, then these queries are run via a database connector.
-        The results of the queries are then passed to `PredictedTest` and `self.graph.invoke`.
-
-        Note:
-            - Tuple Order is computed only if target SQL contains an 'oder by' clause.
-            - Some metrics can be computed only for Text2SQL as VES.
-
-        Args:
-            target_query (str | list[list]): The target SQL query or the expected results in a nested list.
-            predicted_query (str | list[list]): The predicted SQL query or the predicted results in a nested list.
-            connector (BaseConnector): An object of BaseConnector class to communicate with the database.
-
-        Returns:
-            dict: A dictionary comprising the evaluation metrics values for the test.
-
-        Raises:
-            ValueError: If an error is encountered while running the target query.
-        """
-
-        # Check if queries are strings and, if so, whether the target query contains an order by clause
-        is_order = isinstance(target_query, str) and "order by" in target_query.lower()
-
-        # Assume metrics2value to be 0.0 unless proven otherwise
-        metrics2value = {name: 0.0 for name in self.evaluator_names}
-
-        # Check if both queries are strings and equal.
-        if (
-            isinstance(target_query, str)
-            and isinstance(predicted_query, str)
-            and target_query.lower() == predicted_query.lower()
-        ):
-            metrics2value = {name: 1.0 for name in self.evaluator_names}
-        else:
-            # Run queries if they're strings
-            target_values = _utils_run_query_if_str(target_query, connector)
-            predicted_values = _utils_run_query_if_str(predicted_query, connector)
-
-            if target_values is None:
-                raise ValueError(f"Target gets an Error `{target_query}`")
-
-            if isinstance(predicted_query, list):
-                predicted_query = ""
-
-            if isinstance(target_query, list):
-                target_query = ""
-
-            if predicted_values is not None:
-                predicted_test = PredictedTest(
-                    target_query=target_query,
-                    target_values=target_values,
-                    predicted_query=predicted_query,
-                    predicted_values=predicted_values,
-                )
-                state = self.graph.invoke(
-                    {"predicted_test": predicted_test, "connector": connector}
-                )
-                metrics2value = self._parse_graph_output(state)
-
-        metrics2value["tuple_order"] = (
-            metrics2value["tuple_order"] if is_order else None
-        )
-
-        return metrics2value
-
-    def _parse_graph_output(self, state: StateOrchestratorEvaluator) -> dict:
-        """parse function that connects the Graph State with the columns to add in a pd.DataFrame"""
-        evaluated_tests = state["evaluated_tests"]
-        output = dict()
-        for test in evaluated_tests:
-            output[test["metric_name"]] = test["metric_value"]
-        return output
-
-    def _is_target_equal_to_pred(self, target: str, prediction: str):
-        """Check if target is equal to prediction. In future release,
-        this will be substitute with more sophisticated syntactic metrics"""
-        return target.lower() == prediction.lower()
\ No newline at end of file
+from __future__ import annotations
+
+import contextlib
+import logging
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Callable, Iterable
+
+import pandas as pd
+from func_timeout import FunctionTimedOut
+from langgraph.constants import START, END
+from langgraph.graph import StateGraph
+from sqlalchemy.exc import CompileError, DBAPIError, OperationalError
+from tqdm import tqdm
+from typing_extensions import Literal
+
+from .aggregation import MetricsAggregator, RunningStatistics
+from .checkpoint import EvaluationCheckpoint, utils_test_id
+from .file_io import ChunkWriter, utils_iter_file_chunks
+from .memory_profiling import utils_trace_memory
+from .metrics_evaluators import (
+    CellPrecision,
+    CellRecall,
+    TupleCardinality,
+    TupleOrder,
+    TupleConstraint,
+    ExecutionAccuracy,
+    ValidEfficiencyScore,
+    ApproxCellPrecision,
+    ApproxCellRecall,
+    ApproxTupleConstraint,
+    ResultStatistics,
+    SketchStatistics,
+    StreamingCellPrecision,
+    StreamingCellRecall,
+    StreamingTupleCardinality,
+    StreamingTupleConstraint,
+)
+from .result_cache import ResultCache, utils_database_fingerprint
+from .result_store import EvaluationResultStore
+from .sequential import SequentialStoppingRule, utils_mean_half_width
+from .metrics_evaluators.approximate_metrics import BaseApproximateEvaluator
+from .metrics_evaluators.base_evaluator import EvaluatedTest
+from .pushdown_evaluator import PushdownEvaluator, PUSHDOWN_METRICS
+from .sql_normalizer import utils_canonicalize_query
+from .state_orchestrator_evaluator import StateOrchestratorEvaluator, PredictedTest
+from ..connectors import BaseConnector, CompactResult, SqliteConnector, profiling_caller
+
+name2evaluator = {
+    "cell_precision": CellPrecision,
+    "cell_recall": CellRecall,
+    "tuple_cardinality": TupleCardinality,
+    "tuple_order": TupleOrder,
+    "tuple_constraint": TupleConstraint,
+    "execution_accuracy": ExecutionAccuracy,
+    "VES": ValidEfficiencyScore,
+}
+
+# metrics that can be replaced by a bounded-memory estimate
+name2approximate_evaluator = {
+    "cell_precision": ApproxCellPrecision,
+    "cell_recall": ApproxCellRecall,
+    "tuple_constraint": ApproxTupleConstraint,
+}
+
+# metrics that can be computed consuming the results incrementally from the cursor
+name2streaming_evaluator = {
+    "cell_precision": StreamingCellPrecision,
+    "cell_recall": StreamingCellRecall,
+    "tuple_cardinality": StreamingTupleCardinality,
+    "tuple_constraint": StreamingTupleConstraint,
+}
+
+
+def _utils_run_query_if_str(
+    query: str | list[list],
+    connector: BaseConnector,
+    result_cache: ResultCache | None = None,
+    compact: bool = False,
+) -> list[list] | CompactResult | None:
+    """
+    This method takes a SQL query or a list of lists and an instance of a BaseConnector.
+    If the query is a string - it attempts to run the query on a supplied connector, handling SQL exceptions and edge cases.
+    If the query is a list - the function simply returns the query.
+
+    Args:
+        query (str|list[list]): Input query or data in the form of string or list of lists.
+        connector (BaseConnector): A BaseConnector object to execute SQL queries on.
+        result_cache (ResultCache | None): If provided, the results are read from/written to this cache.
+        compact (bool): If True, the executed query results are returned as a `CompactResult`.
+
+    Returns:
+        list[list] | CompactResult | None: Executed query results as a list of lists if query string has been passed.
+                            Passed query if a list of lists has been passed.
+                            None if the query execution resulted in a SQL exception.
+
+    Note:
+        String type queries will have ';' removed before execution for safety reasons.
+
+        This function handles SQL exceptions like CompileError, DBAPIError, FunctionTimedOut and OperationalError.
+        In case of an exception, the function will log a warning and return None.
+    """
+
+    if not isinstance(query, str):
+        return query
+
+    query = query.replace(";", "")
+    db_fingerprint = None
+    if result_cache is not None:
+        db_fingerprint = utils_database_fingerprint(connector.db_path)
+        result = result_cache.get(db_fingerprint, query)
+        if result is not None:
+            return CompactResult.from_rows(result) if compact else result
+    try:
+        result = connector.run_query_compact(query) if compact else connector.run_query(query)
+        if result_cache is not None:
+            result_cache.put(db_fingerprint, query, result)
+        return result
+    except (CompileError, DBAPIError, FunctionTimedOut, OperationalError) as e:
+        logging.warning(e)
+
+
+def _utils_get_query_columns(query: str, connector: BaseConnector) -> list[str] | None:
+    """
+    Returns the columns projected by the query, or None if the query cannot be compiled.
+
+    Args:
+        query (str): Input SQL query.
+        connector (BaseConnector): A BaseConnector object to inspect SQL queries on.
+
+    Returns:
+        list[str] | None: The query columns, or None if the query resulted in a SQL exception.
+    """
+    query = query.replace(";", "")
+    try:
+        return connector.get_query_columns(query)
+    except (CompileError, DBAPIError, FunctionTimedOut, OperationalError) as e:
+        logging.warning(e)
+
+
+def _utils_timed_node(name: str, node_fun: Callable) -> Callable:
+    """Wraps the graph node of an evaluator, adding its execution time as the `time_<name>` evaluated test"""
+
+    def timed_node_fun(state):
+        start_time = time.perf_counter()
+        output = node_fun(state)
+        elapsed = time.perf_counter() - start_time
+        timing = EvaluatedTest(metric_name=f"time_{name}", metric_value=elapsed)
+        return {"evaluated_tests": output["evaluated_tests"] + [timing]}
+
+    return timed_node_fun
+
+
+def _utils_result_key(result: list[list]) -> tuple | None:
+    """Returns a hashable representation of the result rows, or None if the cells are not hashable"""
+    try:
+        key = tuple(tuple(row) for row in result)
+        hash(key)
+        return key
+    except TypeError:
+        return None
+
+
+def utils_pass_at_k(n: int, c: int, k: int) -> float | None:
+    """
+    Unbiased estimator of pass@k: the probability that at least one of k candidates, drawn without
+    replacement from n candidates of which c are correct, is correct.
+
+    Credit to the logic: "Evaluating Large Language Models Trained on Code"
+
+    Args:
+        n (int): The number of candidates.
+        c (int): The number of correct candidates.
+        k (int): The number of drawn candidates.
+
+    Returns:
+        float | None: The pass@k value in [0, 1], None if k is greater than n.
+    """
+    if k > n:
+        return None
+    if n - c < k:
+        return 1.0
+    prob_all_wrong = 1.0
+    for i in range(n - c + 1, n + 1):
+        prob_all_wrong *= 1 - k / i
+    return round(1 - prob_all_wrong, 3)
+
+
+class OrchestratorEvaluator:
+    """
+    A class that evaluates metrics on test cases using different evaluators.
+
+    This class preprocesses test cases, organizes them in a LangGraph object to execute in parallel the selected metrics
+
+    Note:
+        - The class can accept a predefined list of evaluator names. If no names are provided,
+          it uses all available evaluators.
+        - The evaluation proceeds in parallel for speeding up the execution.
+        - With `mode="pushdown"` the metrics of SQL tests are computed inside the database and only the
+          metric values are returned to Python. This mode supports only the metrics in `PUSHDOWN_METRICS`,
+          which are also the default evaluators in this mode.
+        - With `mode="streaming"` the results of SQL tests are consumed row by row from the connector cursor
+          and only the hash structures needed by the metrics are kept in memory. This mode supports only the
+          metrics in `name2streaming_evaluator`, which are also the default evaluators in this mode.
+        - If `result_cache` is provided, the results of the SQL queries are read from/written to a persistent
+          cache shared among runs and processes. The cache is used only with `mode="python"`, and its keys are
+          computed with the `sql_normalization` of the evaluator.
+        - Target and predicted SQL queries with the same canonical form (see `utils_canonicalize_query`)
+          are considered equal without being executed, and predictions with the same canonical form are
+          evaluated only once.
+        - With `compact_results=True` the results of SQL tests are stored as `CompactResult` (row tuples with
+          interned strings), and the structures derived by the metrics are shared among the predictions of a target.
+        - With `record_timings=True` each test reports (in seconds) the time spent executing the target
+          (`time_target_query`) and the predicted query (`time_predicted_query`), in the whole graph
+          (`time_graph_invoke`) and in each metric (`time_<evaluator name>`), together with the number of rows
+          of both results (`target_rows`, `predicted_rows`). The target is executed once for each test, hence its
+          time is reported by the first prediction that needs it. Phases that are not executed (e.g. equal queries,
+          or the pushdown and streaming modes) are None.
+        - With `record_memory=True` each test reports (in bytes) the peak of the Python allocations while executing
+          the target (`peak_memory_target_query`) and the predicted query (`peak_memory_predicted_query`), while
+          computing the metrics (`peak_memory_graph_invoke`) and over the whole evaluation (`peak_memory`),
+          together with the number of rows of both results. The allocations are traced with `tracemalloc`,
+          which slows down the evaluation. See `utils_memory_report` and `utils_memory_budget`.
+        - The metrics in `approximate_metrics` are estimated with bounded-memory sketches
+          (see `name2approximate_evaluator`). For each of them, the output contains also the
+          `<metric>_error_bound` column. With `mode="streaming"` the sketches are built while consuming
+          the results from the cursor (see `SketchStatistics`), hence the results are never materialized.
+
+    Attributes:
+        evaluator_names (list[str] | None): A list of evaluator names to use for evaluation, or None to use all.
+        mode (Literal['python', 'pushdown', 'streaming']): How the metrics of SQL tests are computed.
+        approximate_metrics (list[str]): The evaluator names replaced by their approximate version.
+        result_cache (ResultCache | None): The persistent cache of the query results.
+        sql_normalization (Literal['tokens', 'ast']): How the canonical form of the SQL queries is computed.
+        compact_results (bool): Whether the results of the SQL queries are stored as `CompactResult`.
+        record_timings (bool): Whether the timings of each evaluation phase are added to the metrics.
+        timing_names (list[str]): The names of the timing (and row count) columns, empty if not recorded.
+        record_memory (bool): Whether the peak memory of each evaluation phase is added to the metrics.
+        query_timeout (float | None): The timeout in seconds of the queries on the databases opened by the
+            evaluator, None for the `SqliteConnector` default.
+        profiling_names (list[str]): The names of all the timing, memory and row count columns.
+        graph (StateGraph[StateOrchestratorEvaluator]): The internal state graph holding the evaluators.
+
+    Raises:
+        ValueError: If `mode="pushdown"` and some evaluators cannot be computed in the database.
+        ValueError: If `mode="streaming"` and some evaluators cannot be computed incrementally.
+        ValueError: If an approximate metric is not supported or not selected in `evaluator_names`.
+        ValueError: If `approximate_metrics` is used with `mode="pushdown"`.
+        ValueError: If `result_cache` computes the canonical SQL with another `sql_normalization`.
+    """
+
+    def __init__(self,
+                 evaluator_names: list[str] | None = None,
+                 mode: Literal['python', 'pushdown', 'streaming'] = 'python',
+                 approximate_metrics: list[str] | None = None,
+                 result_cache: ResultCache | str | None = None,
+                 sql_normalization: Literal['tokens', 'ast'] = 'tokens',
+                 compact_results: bool = False,
+                 record_timings: bool = False,
+                 record_memory: bool = False,
+                 query_timeout: float | None = None):
+        graph = StateGraph(StateOrchestratorEvaluator)
+        self.mode = mode
+        self.sql_normalization = sql_normalization
+        self.compact_results = compact_results
+        self.pushdown_evaluator = None
+        self.streaming_evaluators = []
+        if mode == 'pushdown':
+            self.evaluator_names = evaluator_names or list(PUSHDOWN_METRICS)
+            self.pushdown_evaluator = PushdownEvaluator(self.evaluator_names)
+        elif mode == 'streaming':
+            self.evaluator_names = evaluator_names or list(name2streaming_evaluator.keys())
+            not_supported = [name for name in self.evaluator_names if name not in name2streaming_evaluator]
+            if not_supported:
+                raise ValueError(f'Metrics {not_supported} cannot be computed in streaming. '
+                                 f'Supported metrics are {list(name2streaming_evaluator.keys())}')
+        else:
+            self.evaluator_names = evaluator_names or list(name2evaluator.keys())
+
+        if isinstance(result_cache, str):
+            result_cache = ResultCache(result_cache, sql_normalization=sql_normalization)
+        if result_cache is not None and result_cache.sql_normalization != sql_normalization:
+            raise ValueError(f'The result cache uses sql_normalization="{result_cache.sql_normalization}", '
+                             f'while the evaluator uses "{sql_normalization}"')
+        self.result_cache = result_cache
+
+        self.approximate_metrics = approximate_metrics or []
+        if self.approximate_metrics and mode == 'pushdown':
+            raise ValueError('Approximate metrics are only supported with mode="python" and mode="streaming"')
+        for name in self.approximate_metrics:
+            if name not in name2approximate_evaluator or name not in self.evaluator_names:
+                raise ValueError(f'Approximate metric `{name}` must be one of '
+                                 f'{list(name2approximate_evaluator.keys())} and included in the evaluator names')
+        self.error_bound_names = [name2approximate_evaluator[name]().error_name for name in self.approximate_metrics]
+        if mode == 'streaming':
+            # the approximate evaluators consume the `SketchStatistics` of the streamed results
+            self.streaming_evaluators = [
+                name2approximate_evaluator[name]() if name in self.approximate_metrics
+                else name2streaming_evaluator[name]()
+                for name in self.evaluator_names
+            ]
+
+        self.record_timings = record_timings
+        self.timing_names = []
+        if record_timings:
+            self.timing_names = (
+                ["time_target_query", "time_predicted_query", "time_graph_invoke"]
+                + [f"time_{name}" for name in self.evaluator_names]
+                + ["target_rows", "predicted_rows"]
+            )
+        self.record_memory = record_memory
+        self.query_timeout = query_timeout
+        self.profiling_names = list(self.timing_names)
+        if record_memory:
+            self.profiling_names += ["peak_memory_target_query", "peak_memory_predicted_query",
+                                     "peak_memory_graph_invoke", "peak_memory"]
+            if not record_timings:
+                self.profiling_names += ["target_rows", "predicted_rows"]
+
+        list_node_fun = [
+            (name, self._get_evaluator(name).graph_call) for name in self.evaluator_names
+        ]
+        if record_timings:
+            list_node_fun = [(name, _utils_timed_node(name, fun)) for name, fun in list_node_fun]
+
+        for node_name, node_fun in list_node_fun:
+            graph.add_node(node_name, node_fun)
+            graph.add_edge(START, node_name)
+            graph.add_edge(node_name, END)
+
+        self.graph = graph.compile()
+
+    def evaluate_df(
+        self,
+        df: pd.DataFrame,
+        target_col_name: str,
+        prediction_col_name: str | list[str],
+        db_path_name: str,
+        checkpoint_path: str | None = None,
+        checkpoint_every: int = 100,
+        test_id_col_name: str | None = None,
+        skip_target_errors: bool = False,
+        result_store: EvaluationResultStore | str | None = None,
+        aggregator: MetricsAggregator | None = None,
+    ) -> pd.DataFrame:
+        """
+        Evaluates a dataframe with test predictions applying suitable metrics. The function transforms the input
+        dataframe into a dictionary and processes each test case individually. It connects to SQL database and
+        computes metrics for each test case. The computed metrics are added to the dataframe that gets returned.
+
+        Args:
+            df (pd.DataFrame): The input dataframe containing the test predictions.
+            target_col_name (str): The name of the column in the dataframe that contains the target results.
+            prediction_col_name (str | list[str]): The name of the column in the dataframe that contains the
+                predicted results. If a list of columns is provided (e.g. one for each model), the predictions
+                are evaluated together and the metrics are returned in the `<prediction_col_name>_<metric>` columns.
+            db_path_name (str): The name of the field in the dataframe that holds the database path.
+            checkpoint_path (str | None): If provided, the metrics of the completed tests are appended to this
+                JSON Lines file. Restarting the evaluation with the same file skips the completed tests. The file
+                stores the `config` of the evaluator, and it is refused by an evaluator with a different one.
+            checkpoint_every (int): The number of completed tests written to the checkpoint at a time.
+            test_id_col_name (str | None): The column holding a stable identifier for each test. If None,
+                the identifier is computed from the database path, the target and the prediction.
+            skip_target_errors (bool): If True, the tests whose target raises an error are recorded in the
+                `evaluation_error` column (with None metrics) instead of stopping the evaluation.
+            result_store (EvaluationResultStore | str | None): If provided, the metrics and the evaluation time of
+                each evaluated test are appended to this results database (or to the one at this path, with a new
+                run id). The model id is the name of the prediction column.
+            aggregator (MetricsAggregator | None): If provided, it is updated with the metrics of each test while
+                evaluating, e.g. to follow the running means per category through its callback.
+
+        Returns:
+            pd.DataFrame : The input dataframe enriched with the metrics computed for each test case.
+
+        Raises:
+            ValueError: If `skip_target_errors` is False and an error is encountered while running a target query.
+            ValueError: If the checkpoint was written with a different `config`.
+
+        Note:
+            - To speedup execution, the evaluation is performed for each database sequentially
+            in order to not recreate connection.
+            - The checkpoint is flushed also when the evaluation is interrupted by an exception.
+            - With several prediction columns, each target is executed once and identical predictions
+            among the columns are evaluated once.
+        """
+
+        df_dict = df.to_dict("records")
+        checkpoint = EvaluationCheckpoint(
+            checkpoint_path, checkpoint_every, config=self.config
+        ) if checkpoint_path else None
+        store = EvaluationResultStore(result_store) if isinstance(result_store, str) else result_store
+        try:
+            self._evaluate_records(
+                df_dict, target_col_name, prediction_col_name, db_path_name,
+                connectors=dict(), checkpoint=checkpoint,
+                test_id_col_name=test_id_col_name, skip_target_errors=skip_target_errors,
+                result_store=store, aggregator=aggregator,
+            )
+        finally:
+            if checkpoint:
+                checkpoint.flush()
+            if isinstance(result_store, str):
+                store.close()
+            elif store is not None:
+                store.flush()
+
+        if self.result_cache is not None:
+            logging.info(f"Result cache statistics: {self.result_cache.stats()}")
+
+        return pd.DataFrame(df_dict)
+
+    def evaluate_file(
+        self,
+        input_path: str,
+        output_path: str,
+        target_col_name: str,
+        prediction_col_name: str | list[str],
+        db_path_name: str,
+        chunk_size: int = 1000,
+        checkpoint_path: str | None = None,
+        checkpoint_every: int = 100,
+        test_id_col_name: str | None = None,
+        skip_target_errors: bool = False,
+        result_store: EvaluationResultStore | str | None = None,
+        aggregator: MetricsAggregator | None = None,
+    ) -> int:
+        """
+        Evaluates the test predictions stored in a file, keeping in memory only `chunk_size` tests at a time.
+
+        The tests are read lazily from a JSON Lines, CSV or Parquet file and each chunk, enriched with the
+        metrics as in `evaluate_df`, is appended to the JSON Lines or CSV output file.
+
+        Args:
+            input_path (str): The path of the file with the test predictions (.jsonl, .csv or .parquet).
+            output_path (str): The path of the output file (.jsonl or .csv). It is overwritten if it exists.
+            target_col_name (str): The name of the column in the file that contains the target results.
+            prediction_col_name (str | list[str]): The name of the column(s) that contain the predicted results.
+            db_path_name (str): The name of the field in the file that holds the database path.
+            chunk_size (int): The number of tests read, evaluated and written at a time.
+            checkpoint_path (str | None): If provided, the metrics of the completed tests are appended to this
+                JSON Lines file. Restarting the evaluation with the same file skips the completed tests. The file
+                stores the `config` of the evaluator, and it is refused by an evaluator with a different one.
+            checkpoint_every (int): The number of completed tests written to the checkpoint at a time.
+            test_id_col_name (str | None): The column holding a stable identifier for each test.
+            skip_target_errors (bool): If True, the tests whose target raises an error are recorded in the
+                `evaluation_error` column (with None metrics) instead of stopping the evaluation.
+            result_store (EvaluationResultStore | str | None): If provided, the metrics and the evaluation time of
+                each evaluated test are appended to this results database (or to the one at this path, with a new
+                run id). The model id is the name of the prediction column.
+            aggregator (MetricsAggregator | None): If provided, it is updated with the metrics of each test while
+                evaluating, e.g. to follow the running means per category through its callback.
+
+        Returns:
+            int: The number of evaluated tests written to the output file.
+
+        Raises:
+            ValueError: If the input or output format is not supported.
+            ValueError: If `skip_target_errors` is False and an error is encountered while running a target query.
+            ValueError: If the checkpoint was written with a different `config`.
+
+        Note:
+            - The database connections are shared among the chunks.
+            - Reading Parquet files requires `pyarrow`.
+        """
+        connectors = dict()
+        checkpoint = EvaluationCheckpoint(
+            checkpoint_path, checkpoint_every, config=self.config
+        ) if checkpoint_path else None
+        store = EvaluationResultStore(result_store) if isinstance(result_store, str) else result_store
+        try:
+            with ChunkWriter(output_path) as writer:
+                for chunk in utils_iter_file_chunks(input_path, chunk_size):
+                    df_dict = chunk.to_dict("records")
+                    del chunk
+                    self._evaluate_records(
+                        df_dict, target_col_name, prediction_col_name, db_path_name,
+                        connectors=connectors, checkpoint=checkpoint,
+                        test_id_col_name=test_id_col_name, skip_target_errors=skip_target_errors,
+                        result_store=store, aggregator=aggregator,
+                    )
+                    writer.write(pd.DataFrame(df_dict))
+        finally:
+            if checkpoint:
+                checkpoint.flush()
+            if isinstance(result_store, str):
+                store.close()
+            elif store is not None:
+                store.flush()
+
+        if self.result_cache is not None:
+            logging.info(f"Result cache statistics: {self.result_cache.stats()}")
+
+        return writer.num_rows
+
+    def evaluate_df_sequential(
+        self,
+        df: pd.DataFrame,
+        target_col_name: str,
+        prediction_col_name: str,
+        db_path_name: str,
+        stratify_col_name: str = "test_category",
+        metrics: list[str] | None = None,
+        margin: float = 0.02,
+        confidence: float = 0.95,
+        min_tests_per_stratum: int = 30,
+        baseline: dict[str, dict[str, float]] | None = None,
+        seed: int = 2023,
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Evaluates a random sample of the tests in each stratum, stopping when the confidence intervals of the
+        stratum means are tight enough (see `SequentialStoppingRule`).
+
+        The tests of each stratum (e.g. test category) are shuffled and the strata are evaluated in round-robin,
+        one test at a time, until each stratum either meets the stopping rule or is exhausted. A stratum whose
+        monitored metrics are always None is closed after `min_tests_per_stratum` tests with decision `undefined`.
+
+        Args:
+            df (pd.DataFrame): The input dataframe containing the test predictions.
+            target_col_name (str): The name of the column in the dataframe that contains the target results.
+            prediction_col_name (str): The name of the column in the dataframe that contains the predicted results.
+            db_path_name (str): The name of the field in the dataframe that holds the database path.
+            stratify_col_name (str): The column defining the strata.
+            metrics (list[str] | None): The metrics whose intervals are monitored, by default `execution_accuracy`
+                if selected, otherwise all the evaluator metrics.
+            margin (float): The target half-width of the intervals, and the tolerated difference from the baseline.
+            confidence (float): The confidence level of the intervals.
+            min_tests_per_stratum (int): The minimum number of tests evaluated in each stratum.
+            baseline (dict[str, dict[str, float]] | None): For each stratum, the baseline mean of each metric.
+                If provided, a stratum stops as soon as it is known whether it differs from the baseline
+                by more than `margin`.
+            seed (int): The seed of the random order of the tests.
+
+        Returns:
+            tuple[pd.DataFrame, pd.DataFrame]: The evaluated tests enriched with the metrics, and the report with,
+                for each stratum and metric, the number of evaluated and total tests, the mean, the half-width of
+                its confidence interval and the decision of the stopping rule.
+
+        Raises:
+            ValueError: If an error is encountered while running a target query.
+        """
+        metrics = metrics or (
+            ["execution_accuracy"] if "execution_accuracy" in self.evaluator_names else list(self.evaluator_names)
+        )
+        rule = SequentialStoppingRule(metrics, margin, confidence, min_tests_per_stratum, baseline)
+        aggregator = MetricsAggregator([stratify_col_name])
+
+        rng = random.Random(seed)
+        stratum2tests = defaultdict(list)
+        for test in df.to_dict("records"):
+            stratum2tests[test[stratify_col_name]].append(test)
+        for tests in stratum2tests.values():
+            rng.shuffle(tests)
+
+        connectors = dict()
+        stratum2evaluated = defaultdict(list)
+        active_strata = list(stratum2tests.keys())
+        with tqdm(total=len(df), desc="Evaluating tests sequentially") as progress_bar:
+            while active_strata:
+                for stratum in list(active_strata):
+                    test = stratum2tests[stratum][len(stratum2evaluated[stratum])]
+                    db_path = test[db_path_name]
+                    if db_path not in connectors:
+                        connectors[db_path] = SqliteConnector(relative_db_path=db_path, db_name="_", query_timeout=self.query_timeout)
+                    metrics2value = self.evaluate_single_test(
+                        test[target_col_name], test[prediction_col_name], connectors[db_path]
+                    )
+                    test.update(metrics2value)
+                    aggregator.update(test, metrics2value)
+                    stratum2evaluated[stratum].append(test)
+                    progress_bar.update(1)
+
+                    if rule.should_stop(stratum, aggregator.statistics(stratify_col_name, stratum),
+                                        len(stratum2evaluated[stratum]), len(stratum2tests[stratum])):
+                        active_strata.remove(stratum)
+
+        report = []
+        for stratum, tests in stratum2tests.items():
+            metric2stats = aggregator.statistics(stratify_col_name, stratum)
+            for metric in metrics:
+                stats = metric2stats.get(metric, RunningStatistics())
+                report.append({
+                    stratify_col_name: stratum,
+                    "metric": metric,
+                    "num_evaluated": len(stratum2evaluated[stratum]),
+                    "num_tests": len(tests),
+                    "mean": stats.mean if stats.count else None,
+                    "half_width": utils_mean_half_width(stats, len(tests), confidence),
+                    "decision": rule.decision(stratum, metric, stats, len(tests)),
+                })
+        evaluated = [test for tests in stratum2evaluated.values() for test in tests]
+        logging.info(f"Evaluated {len(evaluated)} out of {len(df)} tests")
+        return pd.DataFrame(evaluated), pd.DataFrame(report)
+
+    def evaluate_candidates_df(
+        self,
+        df: pd.DataFrame,
+        target_col_name: str,
+        candidates_col_name: str,
+        db_path_name: str,
+        k_values: tuple[int, ...] = (1,),
+        correctness_metric: str = "execution_accuracy",
+    ) -> pd.DataFrame:
+        """
+        Evaluates a dataframe where each test holds a list of candidate predictions (e.g. the n-best of a parser).
+
+        For each test, the metrics of every candidate are stored in the `candidates_metrics` column, together with
+        the aggregates returned by `evaluate_candidates`: the `best_<metric>` and the `pass@<k>` columns.
+
+        Args:
+            df (pd.DataFrame): The input dataframe containing the test candidates.
+            target_col_name (str): The name of the column in the dataframe that contains the target results.
+            candidates_col_name (str): The name of the column in the dataframe that contains the list of candidates.
+            db_path_name (str): The name of the field in the dataframe that holds the database path.
+            k_values (tuple[int, ...]): The values of k for which pass@k is computed.
+            correctness_metric (str): The metric deciding whether a candidate is correct (value equal to 1).
+
+        Returns:
+            pd.DataFrame : The input dataframe enriched with the candidate metrics and their aggregates.
+
+        Raises:
+            ValueError: If an error is encountered while running a target query.
+        """
+        df_dict = df.to_dict("records")
+
+        db_path2tests = defaultdict(list)
+        for test in df_dict:
+            db_path2tests[test[db_path_name]].append(test)
+
+        for db_path, tests in db_path2tests.items():
+            # create a connection only once for each test
+            connector = SqliteConnector(relative_db_path=db_path, db_name="_", query_timeout=self.query_timeout)
+            for test in tqdm(tests, desc=f"Evaluating candidates for {db_path.split('/')[-1]}"):
+                test.update(
+                    self.evaluate_candidates(
+                        test[target_col_name], list(test[candidates_col_name]), connector,
+                        k_values=k_values, correctness_metric=correctness_metric,
+                    )
+                )
+
+        return pd.DataFrame(df_dict)
+
+    def evaluate_candidates(
+        self,
+        target_query: str | list[list],
+        candidates: list[str | list[list]],
+        connector: BaseConnector,
+        k_values: tuple[int, ...] = (1,),
+        correctness_metric: str = "execution_accuracy",
+    ) -> dict:
+        """
+        Evaluates the candidate predictions of a single test and aggregates their metrics.
+
+        The candidates are evaluated with `evaluate_multiple_predictions`, hence the target is executed once,
+        duplicated candidates are executed once and candidates returning the same rows share their metrics.
+
+        Note:
+            - pass@k is computed with the unbiased estimator (see `utils_pass_at_k`) and it is None when
+              k is greater than the number of candidates.
+            - The best value of a metric ignores the candidates where the metric is None.
+
+        Args:
+            target_query (str | list[list]): The target SQL query or the expected results in a nested list.
+            candidates (list[str | list[list]]): The candidate SQL queries or the candidate results.
+            connector (BaseConnector): An object of BaseConnector class to communicate with the database.
+            k_values (tuple[int, ...]): The values of k for which pass@k is computed.
+            correctness_metric (str): The metric deciding whether a candidate is correct (value equal to 1).
+
+        Returns:
+            dict: The `candidates_metrics` list (one dictionary for each candidate), the `best_<metric>`
+                values and the `pass@<k>` values.
+
+        Raises:
+            ValueError: If `correctness_metric` is not one of the evaluator names.
+            ValueError: If an error is encountered while running the target query.
+
+        Examples:
+            >>> evaluator = OrchestratorEvaluator(evaluator_names=["execution_accuracy"])
+            >>> evaluator.evaluate_candidates([[1]], [[[2]], [[1]]], connector, k_values=(1, 2))
+            {'candidates_metrics': [{'execution_accuracy': 0}, {'execution_accuracy': 1}],
+             'best_execution_accuracy': 1, 'pass@1': 0.5, 'pass@2': 1.0}
+        """
+        if correctness_metric not in self.evaluator_names:
+            raise ValueError(f"Correctness metric `{correctness_metric}` must be one of {self.evaluator_names}")
+
+        candidates_metrics = (
+            self.evaluate_multiple_predictions(target_query, candidates, connector) if candidates else []
+        )
+        output = {"candidates_metrics": candidates_metrics}
+        for metric in self.evaluator_names:
+            values = [metrics[metric] for metrics in candidates_metrics if metrics.get(metric) is not None]
+            output[f"best_{metric}"] = max(values) if values else None
+
+        num_correct = sum(metrics[correctness_metric] == 1 for metrics in candidates_metrics)
+        for k in k_values:
+            output[f"pass@{k}"] = utils_pass_at_k(len(candidates_metrics), num_correct, k)
+        return output
+
+    def _evaluate_records(
+        self,
+        df_dict: list[dict],
+        target_col_name: str,
+        prediction_col_name: str | list[str],
+        db_path_name: str,
+        connectors: dict[str, BaseConnector],
+        checkpoint: EvaluationCheckpoint | None,
+        test_id_col_name: str | None,
+        skip_target_errors: bool,
+        result_store: EvaluationResultStore | None = None,
+        aggregator: MetricsAggregator | None = None,
+    ):
+        """Adds in place the metrics to each test record, see `evaluate_df`. The connectors are created once
+        for each database and stored in `connectors`"""
+        prediction_col_names = (
+            prediction_col_name if isinstance(prediction_col_name, list) else [prediction_col_name]
+        )
+
+        # create dictionary of db_path to tests. This is used to spedup execution
+        db_path2tests = defaultdict(list)
+        for test in df_dict:
+            db_path2tests[test[db_path_name]].append(test)
+
+        for db_path, tests in db_path2tests.items():
+            pending_tests = []
+            for test in tests:
+                test_id = (
+                    str(test[test_id_col_name])
+                    if test_id_col_name
+                    else utils_test_id(db_path, test[target_col_name], *[test[c] for c in prediction_col_names])
+                )
+                record = checkpoint.get(test_id) if checkpoint else None
+                if record is not None:
+                    self._add_metrics_to_test(test, record["metrics"], record["error"], skip_target_errors)
+                    if aggregator is not None:
+                        aggregator.update(test, record["metrics"])
+                else:
+                    pending_tests.append((test_id, test))
+
+            if not pending_tests:
+                continue
+
+            # create a connection only once for each test
+            if db_path not in connectors:
+                connectors[db_path] = SqliteConnector(relative_db_path=db_path, db_name="_", query_timeout=self.query_timeout)
+            connector = connectors[db_path]
+
+            for test_id, test in tqdm(
+                pending_tests, desc=f"Evaluating tests for {db_path.split('/')[-1]}"
+            ):
+                error = None
+                start_time = time.perf_counter()
+                try:
+                    predictions_metrics = self.evaluate_multiple_predictions(
+                        test[target_col_name], [test[c] for c in prediction_col_names], connector
+                    )
+                except ValueError as e:
+                    if not skip_target_errors:
+                        raise
+                    logging.warning(e)
+                    predictions_metrics = [self._constant_metrics(None)] * len(prediction_col_names)
+                    error = str(e)
+                elapsed_seconds = time.perf_counter() - start_time
+
+                if isinstance(prediction_col_name, list):
+                    metrics = {
+                        f"{col}_{metric}": value
+                        for col, col_metrics in zip(prediction_col_names, predictions_metrics)
+                        for metric, value in col_metrics.items()
+                    }
+                else:
+                    metrics = predictions_metrics[0]
+
+                self._add_metrics_to_test(test, metrics, error, skip_target_errors)
+                if checkpoint:
+                    checkpoint.add(test_id, metrics, error)
+                if aggregator is not None:
+                    aggregator.update(test, metrics)
+                if result_store is not None:
+                    for col, col_metrics in zip(prediction_col_names, predictions_metrics):
+                        result_store.add(test_id, col_metrics, model_id=col, db_path=db_path,
+                                         elapsed_seconds=elapsed_seconds, error=error)
+
+    @staticmethod
+    def _add_metrics_to_test(test: dict, metrics: dict, error: str | None, skip_target_errors: bool):
+        for metric, value in metrics.items():
+            test[metric] = value
+        if skip_target_errors:
+            test["evaluation_error"] = error
+
+    def evaluate_single_test(
+        self,
+        target_query: str | list[list],
+        predicted_query: str | list[list],
+        connector: BaseConnector,
+    ) -> dict:
+        """
+        Evaluates a single test/query pair by comparing the predicted results to the expected target.
+
+        The method first checks if the input queries are strings (SQL code) and if the target query contains
+        an 'order by' clause.
+
+        The comparison of the target query with the predicted one is done on their canonical form, which ignores
+        formatting, keyword/identifier case, identifier quotes and table alias names.
+        Therefore, if both queries are strings and they are equal, the metrics value is set to 1.0.
+
+        If the input queries are strings, then these queries are run via a database connector.
+        The results of the queries are then passed (without copies) to `PredictedTest` and `self.graph.invoke`.
+
+        Note:
+            - Tuple Order is computed only if target SQL contains an 'oder by' clause.
+            - Some metrics can be computed only for Text2SQL as VES.
+
+        Args:
+            target_query (str | list[list]): The target SQL query or the expected results in a nested list.
+            predicted_query (str | list[list]): The predicted SQL query or the predicted results in a nested list.
+            connector (BaseConnector): An object of BaseConnector class to communicate with the database.
+
+        Returns:
+            dict: A dictionary comprising the evaluation metrics values for the test.
+
+        Raises:
+            ValueError: If an error is encountered while running the target query.
+        """
+
+        return self.evaluate_multiple_predictions(target_query, [predicted_query], connector)[0]
+
+    def evaluate_multiple_predictions(
+        self,
+        target_query: str | list[list],
+        predicted_queries: list[str | list[list]],
+        connector: BaseConnector,
+    ) -> list[dict]:
+        """
+        Evaluates several predictions (e.g. of different models) against the same target.
+
+        The target query is executed at most once in the python and streaming modes, while in the pushdown mode
+        it is part of the statement of each distinct prediction. Identical SQL predictions (after canonicalization,
+        see `utils_canonicalize_query`) are evaluated only once. Moreover, when several distinct predictions remain,
+        the metrics of predictions returning the same rows are computed only once (unless VES, which depends on
+        the query, is selected).
+        See `evaluate_single_test` for the evaluation of each prediction.
+
+        Args:
+            target_query (str | list[list]): The target SQL query or the expected results in a nested list.
+            predicted_queries (list[str | list[list]]): The predicted SQL queries or the predicted results.
+            connector (BaseConnector): An object of BaseConnector class to communicate with the database.
+
+        Returns:
+            list[dict]: For each prediction, in the same order, the dictionary of the evaluation metrics values.
+
+        Raises:
+            ValueError: If an error is encountered while running the target query.
+        """
+
+        # Check if queries are strings and, if so, whether the target query contains an order by clause
+        is_order = isinstance(target_query, str) and "order by" in self._canonicalize(target_query)
+
+        # the target is executed only if a prediction needs its values
+        target_values = None
+
+        def get_target_values():
+            nonlocal target_values
+            if target_values is None:
+                with profiling_caller("target_query"):
+                    target_values = _utils_run_query_if_str(
+                        target_query, connector, self.result_cache, self.compact_results
+                    )
+                if target_values is None:
+                    raise ValueError(f"Target gets an Error `{target_query}`")
+            return target_values
+
+        # in streaming mode, the target is consumed from the cursor once as well
+        target_statistics = None
+
+        def get_target_statistics():
+            nonlocal target_statistics
+            if target_statistics is None:
+                try:
+                    with profiling_caller("target_query"):
+                        target_statistics = self._streaming_statistics(target_query, connector)
+                except (CompileError, DBAPIError, FunctionTimedOut, OperationalError) as e:
+                    logging.warning(e)
+                    raise ValueError(f"Target gets an Error `{target_query}`")
+            return target_statistics
+
+        keys = [
+            self._canonicalize(predicted_query) if isinstance(predicted_query, str) else None
+            for predicted_query in predicted_queries
+        ]
+        num_distinct = len({key for key in keys if key is not None}) + keys.count(None)
+        # the result keys copy the predicted rows, hence they are built only if some results can be shared
+        result2metrics = dict() if "VES" not in self.evaluator_names and num_distinct > 1 else None
+
+        query2metrics = dict()
+        outputs = []
+        for predicted_query, key in zip(predicted_queries, keys):
+            if key is None or key not in query2metrics:
+                with profiling_caller("evaluation"), self._memory_tracing():
+                    metrics2value = self._evaluate_prediction(
+                        target_query, predicted_query, connector, get_target_values, result2metrics,
+                        get_target_statistics,
+                    )
+                if "tuple_order" in metrics2value:
+                    metrics2value["tuple_order"] = (
+                        metrics2value["tuple_order"] if is_order else None
+                    )
+                if key is None:
+                    outputs.append(metrics2value)
+                    continue
+                query2metrics[key] = metrics2value
+            outputs.append(dict(query2metrics[key]))
+        return outputs
+
+    def _evaluate_prediction(
+        self,
+        target_query: str | list[list],
+        predicted_query: str | list[list],
+        connector: BaseConnector,
+        get_target_values: Callable[[], list[list]],
+        result2metrics: dict | None = None,
+        get_target_statistics: Callable[[], tuple[ResultStatistics, SketchStatistics | None]] | None = None,
+    ) -> dict:
+        """Evaluates a single prediction, the target values are obtained through `get_target_values` (and its
+        streaming statistics through `get_target_statistics`, see `_streaming_statistics`).
+        If `result2metrics` is provided, it is used to reuse the metrics of predictions with the same rows"""
+        # Assume metrics2value to be 0.0 unless proven otherwise
+        metrics2value = self._constant_metrics(0.0)
+
+        # Check if both queries are strings and equal.
+        if (
+            isinstance(target_query, str)
+            and isinstance(predicted_query, str)
+            and self._is_target_equal_to_pred(target_query, predicted_query)
+        ):
+            metrics2value = self._constant_metrics(1.0)
+        elif (
+            self.pushdown_evaluator is not None
+            and isinstance(target_query, str)
+            and isinstance(predicted_query, str)
+        ):
+            metrics2value = self._evaluate_pushdown(
+                target_query, predicted_query, connector, get_target_values, metrics2value
+            )
+        elif (
+            self.streaming_evaluators
+            and isinstance(target_query, str)
+            and isinstance(predicted_query, str)
+        ):
+            metrics2value = self._evaluate_streaming(
+                predicted_query, connector, get_target_statistics, metrics2value
+            )
+        else:
+            # Run queries if they're strings
+            if self.profiling_names:
+                return self._evaluate_prediction_profiled(
+                    target_query, predicted_query, connector, get_target_values, result2metrics
+                )
+            target_values = get_target_values()
+            with profiling_caller("predicted_query"):
+                predicted_values = _utils_run_query_if_str(
+                    predicted_query, connector, self.result_cache, self.compact_results
+                )
+
+            if isinstance(predicted_query, list):
+                predicted_query = ""
+
+            if isinstance(target_query, list):
+                target_query = ""
+
+            result_key = None
+            if predicted_values is not None and result2metrics is not None:
+                result_key = _utils_result_key(predicted_values)
+                if result_key in result2metrics:
+                    return dict(result2metrics[result_key])
+
+            if predicted_values is not None:
+                predicted_test = PredictedTest.from_results(
+                    target_query=target_query,
+                    target_values=target_values,
+                    predicted_query=predicted_query,
+                    predicted_values=predicted_values,
+                )
+                state = self.graph.invoke(
+                    {"predicted_test": predicted_test, "connector": connector}
+                )
+                metrics2value = self._parse_graph_output(state)
+                if result_key is not None:
+                    result2metrics[result_key] = dict(metrics2value)
+
+        metrics2value.update({name: None for name in self.profiling_names})
+        return metrics2value
+
+    def _evaluate_prediction_profiled(
+        self,
+        target_query: str | list[list],
+        predicted_query: str | list[list],
+        connector: BaseConnector,
+        get_target_values: Callable[[], list[list]],
+        result2metrics: dict | None = None,
+    ) -> dict:
+        """Same as the python path of `_evaluate_prediction`, recording the timings and/or the peak memory
+        of each phase"""
+        profile = {name: None for name in self.profiling_names}
+        metrics2value = self._constant_metrics(0.0)
+        memory_start = tracemalloc.get_traced_memory()[0] if self.record_memory else None
+
+        target_values = self._run_profiled_phase("target_query", get_target_values, profile, memory_start)
+        profile["target_rows"] = len(target_values)
+
+        with profiling_caller("predicted_query"):
+            predicted_values = self._run_profiled_phase(
+                "predicted_query",
+                lambda: _utils_run_query_if_str(predicted_query, connector, self.result_cache, self.compact_results),
+                profile,
+                memory_start,
+            )
+
+        if predicted_values is not None:
+            profile["predicted_rows"] = len(predicted_values)
+            result_key = _utils_result_key(predicted_values) if result2metrics is not None else None
+            if result_key is not None and result_key in result2metrics:
+                metrics2value = dict(result2metrics[result_key])
+            else:
+                predicted_test = PredictedTest.from_results(
+                    target_query=target_query if isinstance(target_query, str) else "",
+                    target_values=target_values,
+                    predicted_query=predicted_query if isinstance(predicted_query, str) else "",
+                    predicted_values=predicted_values,
+                )
+                state = self._run_profiled_phase(
+                    "graph_invoke",
+                    lambda: self.graph.invoke({"predicted_test": predicted_test, "connector": connector}),
+                    profile,
+                    memory_start,
+                )
+                metrics2value = self._parse_graph_output(state)
+                profile.update({name: metrics2value.pop(name) for name in self.timing_names if name in metrics2value})
+                if result_key is not None:
+                    result2metrics[result_key] = dict(metrics2value)
+
+        metrics2value.update(profile)
+        return metrics2value
+
+    def _run_profiled_phase(self, name: str, phase: Callable, profile: dict, memory_start: int | None):
+        """Runs `phase` recording in `profile` its time (`time_<name>`) and the peak of the allocations during
+        the phase (`peak_memory_<name>`) and since `memory_start` (`peak_memory`)"""
+        if self.record_memory:
+            tracemalloc.reset_peak()
+            phase_memory_start = tracemalloc.get_traced_memory()[0]
+        start_time = time.perf_counter()
+        output = phase()
+        if self.record_timings:
+            profile[f"time_{name}"] = time.perf_counter() - start_time
+        if self.record_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            profile[f"peak_memory_{name}"] = peak - phase_memory_start
+            profile["peak_memory"] = max(profile["peak_memory"] or 0, peak - memory_start)
+        return output
+
+    def _memory_tracing(self) -> contextlib.AbstractContextManager:
+        """Context tracing the allocations if the memory is recorded"""
+        return utils_trace_memory() if self.record_memory else contextlib.nullcontext()
+
+    @property
+    def config(self) -> dict:
+        """The configuration determining the output of each test, stored in the checkpoints"""
+        return {
+            "evaluator_names": list(self.evaluator_names),
+            "mode": self.mode,
+            "approximate_metrics": list(self.approximate_metrics),
+            "sql_normalization": self.sql_normalization,
+            "record_timings": self.record_timings,
+            "record_memory": self.record_memory,
+        }
+
+    def _get_evaluator(self, name: str):
+        """Returns the evaluator instance for the given name, the approximate one if requested"""
+        if name in self.approximate_metrics:
+            return name2approximate_evaluator[name]()
+        return name2evaluator[name]()
+
+    def _constant_metrics(self, value: float | None) -> dict:
+        """Metrics assigned without evaluation (e.g. equal queries): the error bounds are 0 as the value is exact"""
+        metrics2value = {name: value for name in self.evaluator_names}
+        metrics2value.update({name: None if value is None else 0.0 for name in self.error_bound_names})
+        return metrics2value
+
+    def _evaluate_streaming(
+        self,
+        predicted_query: str,
+        connector: BaseConnector,
+        get_target_statistics: Callable[[], tuple[ResultStatistics, SketchStatistics | None]],
+        default_metrics: dict,
+    ) -> dict:
+        """Computes the metrics consuming the results from the cursor, the statistics of the target are obtained
+        through `get_target_statistics`. The `default_metrics` are returned if the prediction fails"""
+        target_statistics, target_sketches = get_target_statistics()
+        # only the tuples sampled from the target are counted in the prediction
+        tuple_hashes = None
+        if target_sketches is not None and target_sketches.tuple_sketch is not None:
+            tuple_hashes = target_sketches.tuple_sketch.counts
+        try:
+            with profiling_caller("predicted_query"):
+                predicted_statistics, predicted_sketches = self._streaming_statistics(
+                    predicted_query, connector, tuple_hashes
+                )
+        except (CompileError, DBAPIError, FunctionTimedOut, OperationalError) as e:
+            logging.warning(e)
+            return default_metrics
+
+        metrics2value = dict()
+        for evaluator in self.streaming_evaluators:
+            if isinstance(evaluator, BaseApproximateEvaluator):
+                metrics2value[evaluator.metric_name], metrics2value[evaluator.error_name] = (
+                    evaluator.run_metric_with_error(target_sketches, predicted_sketches)
+                )
+            else:
+                metrics2value[evaluator.metric_name] = evaluator.run_metric(target_statistics, predicted_statistics)
+        return metrics2value
+
+    def _streaming_statistics(
+        self,
+        query: str,
+        connector: BaseConnector,
+        tuple_hashes: Iterable[int] | None = None,
+    ) -> tuple[ResultStatistics, SketchStatistics | None]:
+        """Consumes the result of the query from the cursor, building the statistics of the exact streaming
+        evaluators and the sketches of the approximate ones (None without approximate metrics) in a single pass"""
+        exact_names = [name for name in self.evaluator_names if name not in self.approximate_metrics]
+        with_cells = "cell_precision" in exact_names or "cell_recall" in exact_names
+        with_tuples = "tuple_constraint" in exact_names
+        approximate_evaluators = [evaluator for evaluator in self.streaming_evaluators
+                                  if isinstance(evaluator, BaseApproximateEvaluator)]
+
+        rows = connector.iter_query(query.replace(";", ""))
+        sketches = None
+        if approximate_evaluators:
+            sketches = SketchStatistics(
+                sketch_size=max(evaluator.sketch_size for evaluator in approximate_evaluators),
+                with_cells="cell_precision" in self.approximate_metrics or "cell_recall" in self.approximate_metrics,
+                with_tuples="tuple_constraint" in self.approximate_metrics,
+                tuple_hashes=tuple_hashes,
+            )
+            rows = sketches.observe(rows)
+        return ResultStatistics(rows, with_cells, with_tuples), sketches
+
+    def _evaluate_pushdown(
+        self,
+        target_query: str,
+        predicted_query: str,
+        connector: BaseConnector,
+        get_target_values: Callable[[], list[list]],
+        default_metrics: dict,
+    ) -> dict:
+        """Computes the metrics inside the database. The `default_metrics` are returned if the prediction fails.
+
+        If the combined statement fails, the queries are executed alone to find out which one fails: the target
+        through `get_target_values`, which raises a ValueError if the target is what failed, and then the
+        prediction. If both succeed, the statement built by the `PushdownEvaluator` is what failed, hence the
+        metrics are computed in Python instead of being reported as a wrong prediction"""
+        target_columns = _utils_get_query_columns(target_query, connector)
+        if target_columns is None:
+            raise ValueError(f"Target gets an Error `{target_query}`")
+
+        predicted_columns = _utils_get_query_columns(predicted_query, connector)
+        if predicted_columns is None:
+            return default_metrics
+
+        try:
+            with profiling_caller("pushdown"):
+                return self.pushdown_evaluator.evaluate(
+                    target_query.replace(";", ""),
+                    predicted_query.replace(";", ""),
+                    connector,
+                    target_columns=target_columns,
+                    predicted_columns=predicted_columns,
+                )
+        except (CompileError, DBAPIError, FunctionTimedOut, OperationalError) as e:
+            logging.warning(e)
+
+        target_values = get_target_values()
+        with profiling_caller("predicted_query"):
+            predicted_values = _utils_run_query_if_str(
+                predicted_query, connector, self.result_cache, self.compact_results
+            )
+        if predicted_values is None:
+            return default_metrics
+        logging.warning(f"Pushdown failed on valid queries, evaluating in Python `{target_query}`, `{predicted_query}`")
+        predicted_test = PredictedTest.from_results(
+            target_query=target_query,
+            target_values=target_values,
+            predicted_query=predicted_query,
+            predicted_values=predicted_values,
+        )
+        state = self.graph.invoke({"predicted_test": predicted_test, "connector": connector})
+        return self._parse_graph_output(state)
+
+    def _parse_graph_output(self, state: StateOrchestratorEvaluator) -> dict:
+        """parse function that connects the Graph State with the columns to add in a pd.DataFrame"""
+        evaluated_tests = state["evaluated_tests"]
+        output = dict()
+        for test in evaluated_tests:
+            output[test["metric_name"]] = test["metric_value"]
+        return output
+
+    def _canonicalize(self, query: str) -> str:
+        return utils_canonicalize_query(query, self.sql_normalization)
+
+    def _is_target_equal_to_pred(self, target: str, prediction: str):
+        """Check if target is equal to prediction, i.e. they have the same canonical form. In future release,
+        this will be substitute with more sophisticated syntactic metrics"""
+        return self._canonicalize(target) == self._canonicalize(prediction)
\ No newline at end of file
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from ..connectors import BaseConnector
+
+# metrics that only need set/multiset statistics and can therefore be computed inside the database
+PUSHDOWN_METRICS = ('cell_precision', 'cell_recall', 'tuple_cardinality', 'tuple_constraint')
+
+# prefix of the CTE names, which would otherwise shadow the tables of the database with the same name
+_CTE_PREFIX = '__qatch_'
+
+
+def _cell_token(column: str) -> str:
+    """SQL expression mapping a cell to a string that is equal for cells that are equal in Python.
+
+    Integral REAL values are printed as integers so that `1` and `1.0` produce the same token,
+    every other value is printed with `quote`, which keeps the storage class distinguishable
+    (e.g. `1` and `'1'` produce different tokens).
+    """
+    return (f"CASE WHEN typeof({column}) = 'real' AND {column} = CAST({column} AS INTEGER) "
+            f"THEN CAST(CAST({column} AS INTEGER) AS TEXT) ELSE quote({column}) END")
+
+
+class PushdownEvaluator:
+    """
+    Computes the set-based metrics directly inside the database.
+
+    Instead of fetching both result sets in Python, the target and the prediction are wrapped in two CTEs
+    and the metrics are obtained with `UNION`/`INTERSECT`/`GROUP BY` counts. Only the scalar counts are
+    transferred back to Python, where the same edge cases of the in-Python evaluators are applied.
+
+    Note:
+        - Only the metrics in `PUSHDOWN_METRICS` are supported.
+        - The connector must implement `get_query_columns` and its SQL dialect must support
+          window functions (SQLite >= 3.25).
+        - As in `TupleConstraint`, the projection order is not relevant when comparing tuples:
+          each tuple is represented by the sorted concatenation of its cells.
+        - The CTE names start with `__qatch_`, so that they do not shadow the tables of the database.
+
+    Attributes:
+        metric_names (list[str]): The metrics to compute, a subset of `PUSHDOWN_METRICS`.
+
+    Raises:
+        ValueError: If a metric cannot be computed inside the database.
+    """
+
+    def __init__(self, metric_names: list[str] | None = None):
+        self.metric_names = list(metric_names or PUSHDOWN_METRICS)
+        not_supported = [name for name in self.metric_names if name not in PUSHDOWN_METRICS]
+        if not_supported:
+            raise ValueError(f'Metrics {not_supported} cannot be computed in the database. '
+                             f'Supported metrics are {list(PUSHDOWN_METRICS)}')
+
+    def evaluate(self,
+                 target_query: str,
+                 predicted_query: str,
+                 connector: BaseConnector,
+                 target_columns: list[str] | None = None,
+                 predicted_columns: list[str] | None = None) -> dict[str, float]:
+        """
+        Evaluates the selected metrics for a target/prediction pair inside the database.
+
+        Args:
+            target_query (str): The target SQL query.
+            predicted_query (str): The predicted SQL query.
+            connector (BaseConnector): The connector used to run the aggregation query.
+            target_columns (list[str] | None): The columns of the target query, if already known.
+            predicted_columns (list[str] | None): The columns of the predicted query, if already known.
+
+        Returns:
+            dict[str, float]: A dictionary mapping each metric name to its value.
+        """
+        target_columns = target_columns or connector.get_query_columns(target_query)
+        predicted_columns = predicted_columns or connector.get_query_columns(predicted_query)
+        query = self.build_query(target_query, len(target_columns), predicted_query, len(predicted_columns))
+        counts = dict(zip(self._count_names(), connector.run_query(query)[0]))
+        return {name: self._compute_metric(name, counts) for name in self.metric_names}
+
+    def build_query(self, target_query: str, target_arity: int, predicted_query: str, predicted_arity: int) -> str:
+        """
+        Builds the single SELECT statement returning the counts needed by the selected metrics.
+
+        Args:
+            target_query (str): The target SQL query.
+            target_arity (int): The number of columns returned by the target query.
+            predicted_query (str): The predicted SQL query.
+            predicted_arity (int): The number of columns returned by the predicted query.
+
+        Returns:
+            str: The SQL statement. It returns a single row whose values follow `_count_names`.
+        """
+        target, prediction = f'{_CTE_PREFIX}target', f'{_CTE_PREFIX}prediction'
+        ctes = [self._result_cte(target, target_query, target_arity),
+                self._result_cte(prediction, predicted_query, predicted_arity)]
+        counts = [f'(SELECT COUNT(*) FROM {target})', f'(SELECT COUNT(*) FROM {prediction})']
+
+        if self._needs_cells:
+            ctes += [self._cells_cte(target, target_arity), self._cells_cte(prediction, predicted_arity)]
+            counts += [f'(SELECT COUNT(*) FROM {target}_cells)',
+                       f'(SELECT COUNT(*) FROM {prediction}_cells)',
+                       f'(SELECT COUNT(*) FROM (SELECT v FROM {target}_cells '
+                       f'INTERSECT SELECT v FROM {prediction}_cells))']
+
+        if self._needs_tuples:
+            ctes += [self._tuple_counts_cte(target, target_arity),
+                     self._tuple_counts_cte(prediction, predicted_arity)]
+            counts += [f'(SELECT COUNT(*) FROM {target}_tuples)',
+                       f'(SELECT COUNT(*) FROM {target}_tuples AS t JOIN {prediction}_tuples AS p '
+                       'ON t.k = p.k AND t.n = p.n)']
+
+        return f"WITH {', '.join(ctes)} SELECT {', '.join(counts)}"
+
+    @property
+    def _needs_cells(self) -> bool:
+        return 'cell_precision' in self.metric_names or 'cell_recall' in self.metric_names
+
+    @property
+    def _needs_tuples(self) -> bool:
+        return 'tuple_constraint' in self.metric_names
+
+    def _count_names(self) -> list[str]:
+        names = ['target_rows', 'prediction_rows']
+        if self._needs_cells:
+            names += ['target_cells', 'prediction_cells', 'intersected_cells']
+        if self._needs_tuples:
+            names += ['target_tuples', 'matched_tuples']
+        return names
+
+    @staticmethod
+    def _columns(arity: int) -> list[str]:
+        return [f'c{i}' for i in range(arity)]
+
+    def _result_cte(self, name: str, query: str, arity: int) -> str:
+        query = query.replace(';', '')
+        # the newlines end a trailing `--` comment of the query before the closing parenthesis
+        return f"{name}({', '.join(self._columns(arity))}) AS (SELECT * FROM (\n{query}\n))"
+
+    def _cells_cte(self, name: str, arity: int) -> str:
+        # DISTINCT and UNION remove duplicates: the CTE contains the distinct cells of the result.
+        # The unary `+` removes the column affinity, otherwise SQLite converts the cells
+        # to the affinity of the first column when the CTE is materialized
+        cells = ' UNION '.join(f'SELECT DISTINCT +{col} FROM {name}' for col in self._columns(arity))
+        return f'{name}_cells(v) AS ({cells})'
+
+    def _tuple_counts_cte(self, name: str, arity: int) -> str:
+        # each tuple is identified by the concatenation of its sorted cell tokens,
+        # the window ORDER BY guarantees the concatenation order
+        numbered = f'SELECT ROW_NUMBER() OVER () AS rid, * FROM {name}'
+        tokens = ' UNION ALL '.join(f'SELECT rid, {_cell_token(col)} AS tok FROM {_CTE_PREFIX}numbered'
+                                    for col in self._columns(arity))
+        keys = ("SELECT DISTINCT rid, group_concat(tok, ',') OVER ("
+                "PARTITION BY rid ORDER BY tok ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING) AS k "
+                f"FROM ({tokens})")
+        return (f'{name}_tuples(k, n) AS ('
+                f'WITH {_CTE_PREFIX}numbered AS ({numbered}) '
+                f'SELECT k, COUNT(*) FROM ({keys}) GROUP BY k)')
+
+    @staticmethod
+    def _compute_metric(name: str, counts: dict[str, int]) -> float:
+        target_len = counts['target_rows']
+        prediction_len = counts['prediction_rows']
+        if target_len == prediction_len == 0:
+            return 1.0
+
+        if name == 'tuple_cardinality':
+            return round(min(target_len, prediction_len) / max(target_len, prediction_len), 3)
+
+        if prediction_len == 0 or target_len == 0:
+            return 0.0
+
+        if name == 'cell_precision':
+            return round(counts['intersected_cells'] / counts['prediction_cells'], 3)
+        if name == 'cell_recall':
+            return round(counts['intersected_cells'] / counts['target_cells'], 3)
+        # tuple_constraint
+        return round(counts['matched_tuples'] / counts['target_tuples'], 3)
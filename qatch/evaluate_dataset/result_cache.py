@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import time
+
+from typing_extensions import Literal
+
+from .sql_normalizer import utils_canonicalize_query
+
+# version of the canonical form of the cache keys: caches with a different version are cleared when opened
+CACHE_KEY_VERSION = 1
+
+
+def utils_database_fingerprint(db_path: str) -> str:
+    """
+    Returns a fingerprint of the database file, which changes whenever the file is modified.
+
+    The fingerprint is computed from the absolute path, the size and the modification time of the file,
+    hence it does not require reading the (possibly huge) database.
+
+    Args:
+        db_path (str): The path of the database file.
+
+    Returns:
+        str: The hexadecimal fingerprint of the database.
+    """
+    stat = os.stat(db_path)
+    key = f'{os.path.realpath(db_path)}|{stat.st_size}|{stat.st_mtime_ns}'
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk cache of the executed query results, shared between runs and processes.
+
+    The results are stored in a local SQLite file keyed by (database fingerprint, canonical SQL),
+    see `utils_canonicalize_query`. The canonical SQL is computed with `sql_normalization`, which should be
+    the one of the evaluator, so that the queries considered equal are also cached together.
+    When the cache exceeds `max_size_bytes`, the least recently used results are evicted.
+
+    Note:
+        - The results are serialized with `pickle`: only use cache files created by you.
+        - Queries raising an error are not cached.
+        - The hit rate refers to the lookups performed by the current instance.
+        - The results cached with a different version of the canonical SQL (`CACHE_KEY_VERSION`) are discarded.
+        - The access times of the hits are buffered and written in a single transaction every
+          `access_flush_size` hits, with the next `put` or on `close`, so that the lookups do not take the
+          write lock of the cache shared by the processes. The access times not written yet are not seen by
+          the evictions of the other processes.
+
+    Attributes:
+        path (str): The path of the cache file.
+        max_size_bytes (int): The maximum size of the cached results.
+        access_flush_size (int): The number of buffered access times that triggers their write.
+        sql_normalization (Literal['tokens', 'ast']): How the canonical SQL of the keys is computed.
+        hits (int): The number of lookups that found the result in the cache.
+        misses (int): The number of lookups that did not find the result in the cache.
+
+    Args:
+        path (str): The path of the cache file. It is created if it does not exist.
+        max_size_bytes (int): The maximum size of the cached results, 1 GB by default.
+        access_flush_size (int): The number of buffered access times that triggers their write, 100 by default.
+        sql_normalization (Literal['tokens', 'ast']): How the canonical SQL of the keys is computed,
+            see `utils_canonicalize_query`.
+    """
+
+    def __init__(self, path: str, max_size_bytes: int = 1 << 30, access_flush_size: int = 100,
+                 sql_normalization: Literal['tokens', 'ast'] = 'tokens'):
+        self.path = path
+        self.max_size_bytes = max_size_bytes
+        self.access_flush_size = access_flush_size
+        self.sql_normalization = sql_normalization
+        self.hits = 0
+        self.misses = 0
+        # last access time of the hits not written to the cache yet
+        self._pending_accesses: dict[tuple[str, str], float] = dict()
+        self._con = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._con.execute('PRAGMA journal_mode=WAL')
+        with self._con:
+            self._con.execute('CREATE TABLE IF NOT EXISTS results ('
+                              'db_fingerprint TEXT NOT NULL, '
+                              'query TEXT NOT NULL, '
+                              'result BLOB NOT NULL, '
+                              'size INTEGER NOT NULL, '
+                              'last_access REAL NOT NULL, '
+                              'PRIMARY KEY (db_fingerprint, query))')
+            self._con.execute('CREATE INDEX IF NOT EXISTS results_last_access ON results(last_access)')
+            if self._con.execute('PRAGMA user_version').fetchone()[0] != CACHE_KEY_VERSION:
+                self._con.execute('DELETE FROM results')
+                self._con.execute(f'PRAGMA user_version = {CACHE_KEY_VERSION}')
+        self._size_bytes = self._total_size()
+
+    def get(self, db_fingerprint: str, query: str) -> list[list] | None:
+        """Returns the cached result of the query, or None if it is not in the cache"""
+        key = (db_fingerprint, utils_canonicalize_query(query, self.sql_normalization))
+        row = self._con.execute('SELECT result FROM results WHERE db_fingerprint = ? AND query = ?', key).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._pending_accesses[key] = time.time()
+        if len(self._pending_accesses) >= self.access_flush_size:
+            with self._con:
+                self._flush_accesses()
+        return pickle.loads(row[0])
+
+    def put(self, db_fingerprint: str, query: str, result: list[list]):
+        """Stores the result of the query, evicting the least recently used results if the cache is full"""
+        blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_size_bytes:
+            return
+        key = (db_fingerprint, utils_canonicalize_query(query, self.sql_normalization))
+        with self._con:
+            # the buffered access times are written in the same transaction
+            self._flush_accesses()
+            old_size = self._con.execute('SELECT size FROM results WHERE db_fingerprint = ? AND query = ?',
+                                         key).fetchone()
+            self._con.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)',
+                              (*key, blob, len(blob), time.time()))
+        # a replaced result no longer takes space
+        self._size_bytes += len(blob) - (old_size[0] if old_size is not None else 0)
+        if self._size_bytes > self.max_size_bytes:
+            self._evict()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        """Returns the hit/miss counters and the current size of the cache"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hit_rate, 3),
+            'size_bytes': self._size_bytes,
+            'max_size_bytes': self.max_size_bytes,
+        }
+
+    def close(self):
+        with self._con:
+            self._flush_accesses()
+        self._con.close()
+
+    def _flush_accesses(self):
+        """Writes the buffered access times, within the transaction of the caller"""
+        if not self._pending_accesses:
+            return
+        pending, self._pending_accesses = self._pending_accesses, dict()
+        self._con.executemany('UPDATE results SET last_access = ? WHERE db_fingerprint = ? AND query = ?',
+                              [(last_access, *key) for key, last_access in pending.items()])
+
+    def _total_size(self) -> int:
+        return self._con.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+    def _evict(self):
+        """Removes the least recently used results until the cache fills 90% of `max_size_bytes`"""
+        # other processes may have changed the cache: start from the actual size
+        self._size_bytes = self._total_size()
+        target_size = int(self.max_size_bytes * 0.9)
+        with self._con:
+            rows = self._con.execute('SELECT rowid, size FROM results ORDER BY last_access')
+            to_delete = []
+            for rowid, size in rows:
+                if self._size_bytes <= target_size:
+                    break
+                to_delete.append((rowid,))
+                self._size_bytes -= size
+            self._con.executemany('DELETE FROM results WHERE rowid = ?', to_delete)
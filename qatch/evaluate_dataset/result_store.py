@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+import uuid
+
+import pandas as pd
+
+
+class EvaluationResultStore:
+    """
+    Local SQLite database of the per-test metrics, shared among evaluation runs.
+
+    Each evaluated test is appended to the `evaluations` table with its run id, model id, test id, database path,
+    evaluation time and error, while its metrics are appended to the `metrics` table, one row per metric.
+    The rows are buffered and inserted every `batch_size` evaluations in a single transaction.
+    The tables are indexed by run, model and metric, hence aggregates can be queried without loading all the rows.
+
+    Note:
+        - Use the class as a context manager to insert the remaining rows on exit, also in case of exceptions.
+        - Rows are never updated: evaluating the same test twice in the same run appends it twice.
+
+    Attributes:
+        path (str): The path of the results database.
+        run_id (str): The identifier of the current run, attached to all the inserted rows.
+        batch_size (int): The number of buffered evaluations that triggers an insert.
+
+    Args:
+        path (str): The path of the results database. It is created if it does not exist.
+        run_id (str | None): The identifier of the current run. If None, a new one is generated.
+        batch_size (int): The number of buffered evaluations that triggers an insert.
+    """
+
+    def __init__(self, path: str, run_id: str | None = None, batch_size: int = 500):
+        self.path = path
+        self.run_id = run_id or f'{time.strftime("%Y%m%d-%H%M%S")}-{uuid.uuid4().hex[:8]}'
+        self.batch_size = batch_size
+        self._buffer: list[tuple] = []
+        self._con = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._con.execute('PRAGMA journal_mode=WAL')
+        with self._con:
+            self._con.execute('CREATE TABLE IF NOT EXISTS evaluations ('
+                              'evaluation_id INTEGER PRIMARY KEY, '
+                              'run_id TEXT NOT NULL, '
+                              'model_id TEXT NOT NULL, '
+                              'test_id TEXT NOT NULL, '
+                              'db_path TEXT, '
+                              'elapsed_seconds REAL, '
+                              'error TEXT, '
+                              'created_at REAL NOT NULL)')
+            self._con.execute('CREATE TABLE IF NOT EXISTS metrics ('
+                              'evaluation_id INTEGER NOT NULL REFERENCES evaluations(evaluation_id), '
+                              'metric TEXT NOT NULL, '
+                              'value REAL)')
+            self._con.execute('CREATE INDEX IF NOT EXISTS evaluations_run_model ON evaluations(run_id, model_id)')
+            self._con.execute('CREATE INDEX IF NOT EXISTS evaluations_test ON evaluations(test_id)')
+            self._con.execute('CREATE INDEX IF NOT EXISTS metrics_evaluation ON metrics(evaluation_id, metric)')
+            self._con.execute('CREATE INDEX IF NOT EXISTS metrics_metric ON metrics(metric)')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.flush()
+
+    def add(self,
+            test_id: str,
+            metrics: dict,
+            model_id: str = '',
+            db_path: str | None = None,
+            elapsed_seconds: float | None = None,
+            error: str | None = None):
+        """Buffers the metrics of an evaluated test, inserting the buffer if it is full"""
+        self._buffer.append((test_id, metrics, model_id, db_path, elapsed_seconds, error, time.time()))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Inserts the buffered evaluations in a single transaction"""
+        if not self._buffer:
+            return
+        with self._con:
+            for test_id, metrics, model_id, db_path, elapsed_seconds, error, created_at in self._buffer:
+                cursor = self._con.execute(
+                    'INSERT INTO evaluations (run_id, model_id, test_id, db_path, elapsed_seconds, error, created_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (self.run_id, model_id, test_id, db_path, elapsed_seconds, error, created_at)
+                )
+                self._con.executemany(
+                    'INSERT INTO metrics VALUES (?, ?, ?)',
+                    [(cursor.lastrowid, metric, None if value is None else float(value))
+                     for metric, value in metrics.items()]
+                )
+        self._buffer = []
+
+    def aggregate(self, run_id: str | None = None, model_id: str | None = None) -> pd.DataFrame:
+        """
+        Returns the count and the mean of each metric for each run and model, computed inside the database.
+
+        Args:
+            run_id (str | None): If provided, only the evaluations of this run are aggregated.
+            model_id (str | None): If provided, only the evaluations of this model are aggregated.
+
+        Returns:
+            pd.DataFrame: The columns `run_id`, `model_id`, `metric`, `count` (non-null values) and `mean`.
+        """
+        self.flush()
+        where, params = self._where(run_id, model_id)
+        query = ('SELECT e.run_id, e.model_id, m.metric, COUNT(m.value) AS count, AVG(m.value) AS mean '
+                 f'FROM evaluations e JOIN metrics m ON e.evaluation_id = m.evaluation_id {where} '
+                 'GROUP BY e.run_id, e.model_id, m.metric ORDER BY e.run_id, e.model_id, m.metric')
+        return pd.read_sql_query(query, self._con, params=params)
+
+    def load(self, run_id: str | None = None, model_id: str | None = None) -> pd.DataFrame:
+        """
+        Returns the evaluations with one column for each metric.
+
+        Args:
+            run_id (str | None): If provided, only the evaluations of this run are loaded.
+            model_id (str | None): If provided, only the evaluations of this model are loaded.
+
+        Returns:
+            pd.DataFrame: One row for each evaluation, with the evaluation fields and the metric columns.
+        """
+        self.flush()
+        where, params = self._where(run_id, model_id)
+        evaluations = pd.read_sql_query(f'SELECT * FROM evaluations e {where} ORDER BY e.evaluation_id',
+                                        self._con, params=params)
+        metrics = pd.read_sql_query(
+            'SELECT m.evaluation_id, m.metric, m.value FROM metrics m '
+            f'JOIN evaluations e ON e.evaluation_id = m.evaluation_id {where}',
+            self._con, params=params
+        )
+        metrics = metrics.pivot(index='evaluation_id', columns='metric', values='value').reset_index()
+        metrics.columns.name = None
+        return evaluations.merge(metrics, on='evaluation_id', how='left')
+
+    def close(self):
+        self.flush()
+        self._con.close()
+
+    @staticmethod
+    def _where(run_id: str | None, model_id: str | None) -> tuple[str, list]:
+        conditions, params = [], []
+        if run_id is not None:
+            conditions.append('e.run_id = ?')
+            params.append(run_id)
+        if model_id is not None:
+            conditions.append('e.model_id = ?')
+            params.append(model_id)
+        return ('WHERE ' + ' AND '.join(conditions)) if conditions else '', params
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import math
+from statistics import NormalDist
+
+from .aggregation import RunningStatistics
+from .metrics_evaluators.sketches import proportion_error_bound
+
+
+def utils_mean_half_width(stats: RunningStatistics, population: int, confidence: float) -> float:
+    """
+    Returns the half-width of the confidence interval of the mean of a stratum estimated by sampling
+    without replacement. The finite population correction is applied, hence the half-width is 0 when the
+    whole stratum has been evaluated.
+
+    The normal interval on the sample variance collapses to 0 when all the sampled values are equal,
+    e.g. when the first tests of a stratum all pass. Hence, when all the values are in [0, 1], as for the
+    QATCH metrics, the half-width is at least the one of the Wilson score interval of the mean
+    (see `proportion_error_bound`): the variance of a value in [0, 1] with mean p is at most p(1 - p),
+    which is reached by 0/1 metrics such as `execution_accuracy`.
+
+    Args:
+        stats (RunningStatistics): The statistics of the sampled values.
+        population (int): The number of tests in the stratum.
+        confidence (float): Confidence level of the interval, e.g. 0.95.
+
+    Returns:
+        float: The half-width of the interval, infinite with less than two sampled values.
+    """
+    if stats.count >= population:
+        return 0.0
+    if stats.count < 2:
+        return math.inf
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    fpc = math.sqrt((population - stats.count) / (population - 1))
+    half_width = z * math.sqrt(stats.variance / stats.count) * fpc
+    if 0.0 <= stats.min and stats.max <= 1.0:
+        half_width = max(half_width,
+                         proportion_error_bound(stats.mean * stats.count, stats.count, population, confidence))
+    return half_width
+
+
+class SequentialStoppingRule:
+    """
+    Decides when the evaluation of a stratum (e.g. a test category) can stop.
+
+    Without a baseline, a stratum stops when the confidence interval of the mean of each metric is narrower
+    than `margin`. With a baseline, a stratum also stops as soon as the interval shows that the mean is
+    farther than `margin` from the baseline (`worse`/`better`), or within `margin` of it (`equivalent`).
+
+    A metric that is None for all the evaluated tests of a stratum (e.g. `tuple_order` when no target has an
+    ORDER BY) never narrows its interval: after `min_tests`, it is `undefined` and no longer blocks the stratum,
+    which is closed when all its monitored metrics are decided or undefined.
+
+    Attributes:
+        metrics (list[str]): The metrics whose intervals are monitored.
+        margin (float): The tolerated difference from the baseline, and the target half-width of the intervals.
+        confidence (float): The confidence level of the intervals.
+        min_tests (int): The minimum number of tests evaluated in each stratum before stopping.
+        baseline (dict[str, dict[str, float]] | None): For each stratum, the baseline mean of each metric.
+    """
+
+    def __init__(self,
+                 metrics: list[str],
+                 margin: float = 0.02,
+                 confidence: float = 0.95,
+                 min_tests: int = 30,
+                 baseline: dict[str, dict[str, float]] | None = None):
+        self.metrics = metrics
+        self.margin = margin
+        self.confidence = confidence
+        self.min_tests = min_tests
+        self.baseline = baseline or {}
+
+    def decision(self, stratum, metric: str, stats: RunningStatistics, population: int) -> str:
+        """
+        Returns the decision on the metric of the stratum: `worse`, `better` or `equivalent` with respect
+        to the baseline, `estimated` when the interval is tight enough without a baseline, `undefined` when no
+        evaluated test has a value for the metric, `undecided` otherwise.
+        """
+        if stats.count == 0:
+            return 'undefined'
+        half_width = utils_mean_half_width(stats, population, self.confidence)
+        baseline = self.baseline.get(stratum, {}).get(metric)
+        if baseline is not None and stats.count > 0:
+            difference = stats.mean - baseline
+            if abs(difference) - half_width > self.margin:
+                return 'better' if difference > 0 else 'worse'
+            if abs(difference) + half_width <= self.margin:
+                return 'equivalent'
+        if baseline is None and half_width <= self.margin:
+            return 'estimated'
+        return 'undecided'
+
+    def should_stop(self, stratum, metric2stats: dict[str, RunningStatistics], num_tests: int,
+                    population: int) -> bool:
+        """Returns True if the stratum is exhausted or all the monitored metrics are decided or undefined"""
+        if num_tests >= population:
+            return True
+        if num_tests < self.min_tests:
+            return False
+        return all(
+            self.decision(stratum, metric, metric2stats.get(metric, RunningStatistics()), population) != 'undecided'
+            for metric in self.metrics
+        )
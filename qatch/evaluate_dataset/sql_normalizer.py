@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+
+from typing_extensions import Literal
+
+_TOKEN_REGEX = re.compile(
+    r"""
+    (?P<comment>--[^\n]*|/\*.*?(?:\*/|$))
+    |(?P<string>'(?:[^']|'')*')
+    |(?P<quoted>"(?:[^"]|"")*"|`(?:[^`]|``)*`|\[[^\]]*\])
+    |(?P<number>(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)
+    |(?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+    |(?P<space>\s+)
+    |(?P<operator><>|!=|<=|>=|==|\|\||<<|>>|\S)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+_PLAIN_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_$]*')
+
+_OPERATOR_ALIASES = {'<>': '!=', '==': '='}
+
+# SQLite keywords that can follow a table reference, hence cannot be a table alias
+SQL_KEYWORDS = frozenset("""
+    abort action add after all alter always analyze and as asc attach autoincrement before begin between by
+    cascade case cast check collate column commit conflict constraint create cross current current_date
+    current_time current_timestamp database default deferrable deferred delete desc detach distinct do drop
+    each else end escape except exclude exclusive exists explain fail filter first following for foreign from
+    full generated glob group groups having if ignore immediate in index indexed initially inner insert instead
+    intersect into is isnull join key last left like limit match materialized natural no not nothing notnull
+    null nulls of offset on or order others outer over partition plan pragma preceding primary query raise range
+    recursive references regexp reindex release rename replace restrict returning right rollback row rows
+    savepoint select set table temp temporary then ties to transaction trigger unbounded union unique update
+    using vacuum values view virtual when where window with without
+""".split())
+
+# keywords closing the list of tables of a FROM clause
+_FROM_TERMINATORS = frozenset(
+    ['where', 'group', 'order', 'limit', 'having', 'union', 'intersect', 'except', 'window', 'on', 'using',
+     'select', 'values']
+)
+
+
+def _tokenize(query: str) -> list[tuple[str, str]]:
+    """Splits the query in (kind, token) pairs, dropping comments and whitespaces"""
+    tokens = []
+    for match in _TOKEN_REGEX.finditer(query):
+        kind = match.lastgroup
+        token = match.group()
+        if kind in ('comment', 'space'):
+            continue
+        if kind == 'quoted' and token[0] == '"':
+            # SQLite reads `"..."` as a string literal when it is not a column, hence the case is kept
+            kind = 'string'
+        elif kind == 'quoted':
+            content = token[1:-1]
+            if token[0] != '[':
+                content = content.replace(token[0] * 2, token[0])
+            if _PLAIN_IDENTIFIER.fullmatch(content) and content.lower() not in SQL_KEYWORDS:
+                kind, token = 'word', content
+            else:
+                token = '"' + content.lower().replace('"', '""') + '"'
+        if kind == 'word':
+            token = token.lower()
+            if token not in SQL_KEYWORDS:
+                kind = 'identifier'
+        elif kind == 'operator':
+            token = _OPERATOR_ALIASES.get(token, token)
+        tokens.append((kind, token))
+    while tokens and tokens[-1][1] == ';':
+        tokens.pop()
+    return tokens
+
+
+def _rename_table_aliases(tokens: list[tuple[str, str]]) -> list[str]:
+    """
+    Renames the table aliases defined in the FROM clauses with positional names (`_t1`, `_t2`, ...),
+    in order of definition. The optional `AS` before a table alias is removed.
+    """
+    alias2name = dict()
+    definitions = set()  # positions of the alias definitions
+    dropped = set()  # positions of the `AS` before a table alias
+    in_from = [False]  # whether the current parenthesis level is listing the tables of a FROM clause
+    expect_table = False
+    for i, (kind, token) in enumerate(tokens):
+        if token == '(':
+            in_from.append(False)
+            expect_table = False
+            continue
+        if token == ')':
+            if len(in_from) > 1:
+                in_from.pop()
+            expect_table = False
+            continue
+        if token in ('from', 'join'):
+            in_from[-1] = True
+            expect_table = True
+            continue
+        if token in _FROM_TERMINATORS:
+            in_from[-1] = False
+        if token == ',' and in_from[-1]:
+            expect_table = True
+            continue
+        if expect_table and kind == 'identifier':
+            expect_table = False
+            j = i + 1
+            if j + 1 < len(tokens) and tokens[j][1] == '.':  # schema.table
+                j += 2
+            if j < len(tokens) and tokens[j][1] == '(':  # table-valued function
+                continue
+            if j < len(tokens) and tokens[j][1] == 'as':
+                dropped.add(j)
+                j += 1
+            if j < len(tokens) and tokens[j][0] == 'identifier':
+                definitions.add(j)
+                alias2name.setdefault(tokens[j][1], f'_t{len(alias2name) + 1}')
+            else:
+                dropped.discard(j - 1)
+            continue
+        expect_table = False
+
+    output = []
+    for i, (kind, token) in enumerate(tokens):
+        if i in dropped:
+            continue
+        is_reference = (
+            kind == 'identifier'
+            and token in alias2name
+            and (i in definitions or (i + 1 < len(tokens) and tokens[i + 1][1] == '.'))
+            and (i == 0 or tokens[i - 1][1] != '.')
+        )
+        output.append(alias2name[token] if is_reference else token)
+    return output
+
+
+def _canonicalize_tokens(query: str) -> str:
+    return ' '.join(_rename_table_aliases(_tokenize(query)))
+
+
+def _canonicalize_ast(query: str) -> str:
+    try:
+        import sqlglot
+    except ImportError as e:
+        raise ImportError('The AST normalization requires `sqlglot`, install it with '
+                          '`pip install qatch[sqlglot]`') from e
+    tokens_form = _canonicalize_tokens(query)
+    try:
+        # the token form has no backticks and brackets, which `sqlglot` turns into double quotes
+        expression = sqlglot.parse_one(tokens_form, read='sqlite')
+    except sqlglot.errors.SqlglotError:
+        # both parsing and tokenizing errors (e.g. unterminated strings)
+        return tokens_form
+    # double-quoted table names are identifiers, unlike the double-quoted tokens in the other positions
+    for table in expression.find_all(sqlglot.exp.Table):
+        identifier = table.this
+        if isinstance(identifier, sqlglot.exp.Identifier) and identifier.quoted \
+                and _PLAIN_IDENTIFIER.fullmatch(identifier.name):
+            table.set('this', sqlglot.exp.to_identifier(identifier.name.lower()))
+    return _canonicalize_tokens(expression.sql(dialect='sqlite', normalize=True))
+
+
+@lru_cache(maxsize=65536)
+def utils_canonicalize_query(query: str, method: Literal['tokens', 'ast'] = 'tokens') -> str:
+    """
+    Returns a canonical form of the SQL query: queries that differ only in formatting have the same canonical form.
+
+    With `method="tokens"` the canonical form is computed on the query tokens:
+
+    - comments, whitespaces and trailing semicolons are removed;
+    - keywords and identifiers are lower-cased (SQLite identifiers are case-insensitive), string literals are not;
+    - backticks and brackets are removed from the identifiers that do not need them;
+    - table aliases are renamed positionally (`FROM singer AS T1` and `FROM singer s` become `FROM singer _t1`).
+
+    With `method="ast"` the token canonical form is also parsed and regenerated with `sqlglot`, which must be
+    installed (`pip install qatch[sqlglot]`). The double-quoted table names are lower-cased as identifiers.
+    Queries that `sqlglot` cannot tokenize or parse fall back to the token canonical form.
+
+    Note:
+        - The canonical form is used as a key and it is not meant to be executed.
+        - The canonical form of each string is memoized.
+        - Double-quoted tokens are kept as they are: SQLite reads them as string literals when they do not
+        match a column, e.g. `WHERE country = "France"` in Spider queries.
+
+    Args:
+        query (str): The SQL query.
+        method (Literal['tokens', 'ast']): How the canonical form is computed.
+
+    Returns:
+        str: The canonical form of the query.
+
+    Examples:
+        >>> utils_canonicalize_query('SELECT T1.name FROM `Singer` AS T1;')
+        'select _t1 . name from singer _t1'
+        >>> utils_canonicalize_query("select  s.name from singer s -- all singers")
+        'select _t1 . name from singer _t1'
+    """
+    if method == 'ast':
+        return _canonicalize_ast(query)
+    return _canonicalize_tokens(query)
@@ -1,17 +1,53 @@
 import operator
-from typing import TypedDict
+from typing import TypedDict, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing_extensions import Annotated
 
-from ..connectors import BaseConnector
+from ..connectors import BaseConnector, CompactResult
+
+
+def _is_valid_result(values) -> bool:
+    if isinstance(values, CompactResult):
+        return True
+    return type(values) is list and all(type(row) is list for row in values)
 
 
 class PredictedTest(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     target_query: str
-    target_values: list[list]
+    target_values: Union[list[list], CompactResult]
     predicted_query: str
-    predicted_values: list[list]
+    predicted_values: Union[list[list], CompactResult]
+
+    @classmethod
+    def from_results(
+        cls,
+        target_query: str,
+        target_values: list[list],
+        predicted_query: str,
+        predicted_values: list[list],
+    ) -> 'PredictedTest':
+        """
+        Creates the test without validation when both results are already lists of lists or `CompactResult`:
+        the results are referenced instead of being validated and copied row by row, whose cost grows with
+        the size of the results.
+        Otherwise (e.g. rows as tuples), the test is validated as usual.
+        """
+        if not (_is_valid_result(target_values) and _is_valid_result(predicted_values)):
+            return cls(
+                target_query=target_query,
+                target_values=target_values,
+                predicted_query=predicted_query,
+                predicted_values=predicted_values,
+            )
+        return cls.model_construct(
+            target_query=target_query,
+            target_values=target_values,
+            predicted_query=predicted_query,
+            predicted_values=predicted_values,
+        )
 
 
 class StateOrchestratorEvaluator(TypedDict):
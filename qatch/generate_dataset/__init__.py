@@ -1 +1,14 @@
-from .orchestrator_generator import OrchestratorGenerator
+# The orchestrator (and with it LangGraph) is imported on first access (PEP 562)
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .orchestrator_generator import OrchestratorGenerator
+
+__all__ = ['OrchestratorGenerator']
+
+
+def __getattr__(name: str):
+    if name == 'OrchestratorGenerator':
+        from .orchestrator_generator import OrchestratorGenerator
+        return OrchestratorGenerator
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
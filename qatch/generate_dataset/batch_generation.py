@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import random
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .orchestrator_generator import OrchestratorGenerator
+
+# `SqliteConnector` treats the paths without `.sqlite` as directories
+DATABASE_EXTENSIONS = ('.sqlite', '.sqlite3')
+
+
+def utils_find_databases(paths: str | list[str]) -> list[str]:
+    """
+    Returns the SQLite databases in `paths`.
+
+    Each path is either a database file, returned as is, or a directory, searched recursively for the files
+    with extension `.sqlite` or `.sqlite3`.
+
+    Args:
+        paths (str | list[str]): The database files and directories.
+
+    Returns:
+        list[str]: The database paths, sorted within each directory.
+
+    Raises:
+        FileNotFoundError: If a path does not exist.
+    """
+    paths = [paths] if isinstance(paths, str) else paths
+    db_paths = []
+    for path in paths:
+        if os.path.isfile(path):
+            db_paths.append(path)
+        elif os.path.isdir(path):
+            db_paths += sorted(
+                os.path.join(root, file_name)
+                for root, _, file_names in os.walk(path)
+                for file_name in file_names
+                if file_name.lower().endswith(DATABASE_EXTENSIONS)
+            )
+        else:
+            raise FileNotFoundError(f'Database path `{path}` does not exist')
+    return db_paths
+
+
+def utils_database_seed(seed: int, db_path: str) -> int:
+    """Returns the seed of the generation on `db_path`, which depends only on `seed` and the database path,
+    hence it does not change with the order of the databases or the number of processes"""
+    digest = hashlib.sha1(f'{seed}|{db_path}'.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+class DatabaseGenerationResult:
+    """
+    The tests generated from a database by `OrchestratorGenerator.iter_generate_datasets`.
+
+    Attributes:
+        db_path (str): The path of the database.
+        seed (int): The seed of the random sampling of the generators on this database.
+        dataset (pd.DataFrame | None): The generated tests, None if the generation failed.
+        stats (pd.DataFrame | None): The `GeneratorStats` of each generator and table, None if the generation failed.
+        error (str | None): The exception raised while opening the database or generating the tests, if any.
+    """
+    __slots__ = ('db_path', 'seed', 'dataset', 'stats', 'error')
+
+    def __init__(self, db_path: str, seed: int, dataset: pd.DataFrame | None = None,
+                 stats: pd.DataFrame | None = None, error: str | None = None):
+        self.db_path = db_path
+        self.seed = seed
+        self.dataset = dataset
+        self.stats = stats
+        self.error = error
+
+    def __repr__(self) -> str:
+        num_tests = None if self.dataset is None else len(self.dataset)
+        return f'DatabaseGenerationResult(db_path={self.db_path!r}, seed={self.seed}, tests={num_tests}, ' \
+               f'error={self.error!r})'
+
+
+def _generate_database(orchestrator: OrchestratorGenerator, db_path: str, seed: int,
+                       generation_kwargs: dict, query_timeout: float | None) -> DatabaseGenerationResult:
+    """Generates the tests of a single database, returning the raised exception in the result"""
+    from func_timeout import FunctionTimedOut
+
+    from ..connectors import SqliteConnector
+
+    connector = None
+    try:
+        connector = SqliteConnector(relative_db_path=db_path,
+                                    db_name=os.path.splitext(os.path.basename(db_path))[0],
+                                    query_timeout=query_timeout)
+        # the generators sample with the global random generator
+        random.seed(seed)
+        dataset, stats = orchestrator.generate_dataset(connector, return_stats=True, **generation_kwargs)
+    except (Exception, FunctionTimedOut) as e:
+        return DatabaseGenerationResult(db_path, seed, error=f'{type(e).__name__}: {e}')
+    finally:
+        if connector is not None:
+            connector.engine.dispose()
+    return DatabaseGenerationResult(db_path, seed, dataset, stats)
+
+
+# orchestrator of the worker processes, created once per process by `_init_worker`
+_worker_orchestrator: OrchestratorGenerator | None = None
+
+
+def _init_worker(orchestrator_kwargs: dict):
+    global _worker_orchestrator
+    from .orchestrator_generator import OrchestratorGenerator
+    _worker_orchestrator = OrchestratorGenerator(**orchestrator_kwargs)
+
+
+def _generate_database_in_worker(db_path: str, seed: int, generation_kwargs: dict,
+                                 query_timeout: float | None) -> DatabaseGenerationResult:
+    return _generate_database(_worker_orchestrator, db_path, seed, generation_kwargs, query_timeout)
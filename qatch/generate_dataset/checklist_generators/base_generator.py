@@ -1,11 +1,14 @@
+from __future__ import annotations
+
 import random
+import time
 from abc import ABC, abstractmethod
 from itertools import chain
 from typing import TypedDict, Literal
 
 from sqlalchemy.exc import OperationalError
 
-from qatch.connectors import ConnectorTable
+from qatch.connectors import ConnectorTable, profiling_caller
 from ..state_orchestrator_generator import StateOrchestratorGenerator
 
 
@@ -22,6 +25,21 @@ class BaseTest(SingleQA):
     test_category: str
 
 
+class GeneratorStats(TypedDict):
+    generator: str  # The test category of the generator
+    db_path: str
+    tbl_name: str
+    candidates: int  # The number of tests generated from the templates
+    kept: int  # The number of tests with a non-empty result
+    dropped_empty: int  # The number of tests dropped because their result is empty
+    dropped_error: int  # The number of tests dropped because their execution failed
+    errors: dict[str, int]  # The number of dropped tests for each error message
+    generation_time: float  # Seconds spent generating the templates, including the statistics queries
+    stats_query_time: float  # Seconds spent running the statistics queries of the templates (e.g. HAVING thresholds)
+    stats_queries: int  # The number of statistics queries
+    validation_time: float  # Seconds spent executing the tests to drop the empty or failing ones
+
+
 class BaseGenerator(ABC):
     """
     A Base class for all types of generators. This class provides the basic skeleton for a template
@@ -32,6 +50,8 @@ class BaseGenerator(ABC):
         random.seed(seed)
         self.connector = None
         self.column_to_include = None  # column to include in the generation if present
+        self._stats_query_time = 0.0
+        self._stats_queries = 0
 
     @property
     @abstractmethod
@@ -65,20 +85,21 @@ class BaseGenerator(ABC):
        """
         raise NotImplementedError
 
-    def graph_call(self, state: StateOrchestratorGenerator) -> dict[Literal['generated_templates']: list[BaseTest]]:
+    def graph_call(self, state: StateOrchestratorGenerator) -> dict[Literal['generated_templates', 'generator_stats']: list]:
         """
         Processes the state of the Orchestrator Generator and generates tests based on the database tables and tests.
 
         This method goes through each table in the database, generates templates, creates base tests,
-        flattens the tests for each table, and removes any tests with empty results.
+        and removes any tests with empty results. For each table, the number of generated, kept and dropped
+        tests and the time spent in each phase are collected in a `GeneratorStats`.
 
         Args:
             state (StateOrchestratorGenerator): The input state object for the Orchestrator Generator that contains connector,
             database, and generated templates.
 
         Returns:
-            dict[Literal['generated_templates']: list[BaseTest]]: A dictionary containing the final list of generated tests.
-            The dictionary has a single key, 'generated_templates', and the value associated is the list of generated tests.
+            dict[Literal['generated_templates', 'generator_stats']: list]: A dictionary containing the final list of
+            generated tests in 'generated_templates' and the list of `GeneratorStats` of each table in 'generator_stats'.
 
         Note:
             - The argument `state` must be an instance of StateOrchestratorGenerator.
@@ -89,19 +110,40 @@ class BaseGenerator(ABC):
         self.column_to_include = state['column_to_include'] if 'column_to_include' in state else None
         connector = self.connector = state['connector']
         table_tests = []
-        for tbl_name, table in database.items():
-            tests = self.template_generator(table)
-
-            tests = [self._create_base_test(table, test) for test in tests]
-
-            table_tests.append(tests)
+        generator_stats = []
+        with profiling_caller(self.test_name):
+            for tbl_name, table in database.items():
+                self._stats_query_time, self._stats_queries = 0.0, 0
+                start_time = time.perf_counter()
+                tests = self.template_generator(table)
+                tests = [self._create_base_test(table, test) for test in tests]
+                generation_time = time.perf_counter() - start_time
+
+                stats = GeneratorStats(
+                    generator=self.test_name, db_path=table.db_path, tbl_name=tbl_name, candidates=len(tests),
+                    kept=0, dropped_empty=0, dropped_error=0, errors={}, generation_time=generation_time,
+                    stats_query_time=self._stats_query_time, stats_queries=self._stats_queries, validation_time=0.0
+                )
+                # remove empty tests
+                start_time = time.perf_counter()
+                tests = self._remove_test_with_empty_results_or_errors(tests, connector, stats)
+                stats['validation_time'] = time.perf_counter() - start_time
+
+                table_tests.append(tests)
+                generator_stats.append(stats)
         # flatten the table tests
         table_tests = list(chain.from_iterable(table_tests))
 
-        # remove empty tests
-        table_tests = self._remove_test_with_empty_results_or_errors(table_tests, connector)
+        return {'generated_templates': table_tests, 'generator_stats': generator_stats}
 
-        return {'generated_templates': table_tests}
+    def _run_stats_query(self, query: str) -> list[list]:
+        """Runs a query whose result is used to build the templates, e.g. a threshold, and records its time"""
+        start_time = time.perf_counter()
+        try:
+            return self.connector.run_query(query)
+        finally:
+            self._stats_query_time += time.perf_counter() - start_time
+            self._stats_queries += 1
 
     def _create_base_test(self, table, test: SingleQA) -> BaseTest:
         return BaseTest(
@@ -112,14 +154,25 @@ class BaseGenerator(ABC):
             test_category=self.test_name
         )
 
-    def _remove_test_with_empty_results_or_errors(self, tests: list[SingleQA], connector) -> list[SingleQA]:
+    def _remove_test_with_empty_results_or_errors(self, tests: list[SingleQA], connector,
+                                                  stats: GeneratorStats | None = None) -> list[SingleQA]:
+        """Returns the tests with a non-empty result. If provided, `stats` is updated with the number of kept
+        and dropped tests"""
         new_tests = []
         for test in tests:
             try:
                 result = connector.run_query(test['query'])
                 if len(result) > 0:
                     new_tests.append(test)
-            except OperationalError:
+                elif stats is not None:
+                    stats['dropped_empty'] += 1
+            except OperationalError as e:
+                if stats is not None:
+                    stats['dropped_error'] += 1
+                    message = str(e.orig)
+                    stats['errors'][message] = stats['errors'].get(message, 0) + 1
                 continue
 
+        if stats is not None:
+            stats['kept'] = len(new_tests)
         return new_tests
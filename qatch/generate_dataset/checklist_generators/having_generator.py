@@ -153,7 +153,7 @@ class HavingGenerator(BaseGenerator):
         # SQL query to get the average count for each category
         inner_query = f'SELECT COUNT(*) AS row_count FROM `{table_name}` GROUP BY `{cat_col}`'
         # Run the inner query and get the average of row counts
-        average = self.connector.run_query(f'SELECT AVG(row_count) FROM ({inner_query})')[0][0]
+        average = self._run_stats_query(f'SELECT AVG(row_count) FROM ({inner_query})')[0][0]
         return int(average)
 
     def _get_average_of_sum_avg_cat_col(self, table_name: str, cat_col: list[str], num_col: list[str]) -> float:
@@ -178,6 +178,6 @@ class HavingGenerator(BaseGenerator):
         inner_query_sum = f'SELECT SUM(`{num_col}`) AS sum_col FROM `{table_name}` GROUP BY `{cat_col}`'
         inner_query_avg = f'SELECT AVG(`{num_col}`) AS avg_col FROM `{table_name}` GROUP BY `{cat_col}`'
         # Run the inner queries and get the average of sums and averages
-        average_sum = self.connector.run_query(f'SELECT AVG(sum_col) FROM ({inner_query_sum})')[0][0]
-        average_avg = self.connector.run_query(f'SELECT AVG(avg_col) FROM ({inner_query_avg})')[0][0]
+        average_sum = self._run_stats_query(f'SELECT AVG(sum_col) FROM ({inner_query_sum})')[0][0]
+        average_avg = self._run_stats_query(f'SELECT AVG(avg_col) FROM ({inner_query_avg})')[0][0]
         return round(average_sum, 2), round(average_avg, 2)
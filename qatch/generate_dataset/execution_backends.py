@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import multiprocessing
+import operator
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+
+from .state_orchestrator_generator import StateOrchestratorGenerator
+
+
+class BaseExecutionBackend(ABC):
+    """
+    Runs the generators of `OrchestratorGenerator` on the same input state and merges their outputs.
+
+    Each node is a function with the `graph_call` contract of the generators: it takes the state and returns
+    a dictionary whose values are lists, e.g. `{'generated_templates': [...], 'generator_stats': [...]}`.
+    The lists returned by the nodes for the same key are concatenated.
+
+    Args:
+        name2node (dict[str, Callable]): The node functions, by generator name.
+        max_workers (int | None): The maximum number of nodes executed in parallel, if supported by the backend.
+    """
+
+    def __init__(self, name2node: dict[str, Callable], max_workers: int | None = None):
+        self.name2node = name2node
+        self.max_workers = max_workers
+
+    @abstractmethod
+    def invoke(self, state: StateOrchestratorGenerator) -> StateOrchestratorGenerator:
+        """Runs all the nodes on `state` and returns the state updated with their merged outputs"""
+        raise NotImplementedError
+
+    def close(self):
+        """Releases the resources of the backend, e.g. its worker pool"""
+
+    @staticmethod
+    def _merge(state: StateOrchestratorGenerator, outputs: list[dict]) -> StateOrchestratorGenerator:
+        state = dict(state)
+        for output in outputs:
+            for key, value in output.items():
+                state[key] = operator.add(state[key], value) if key in state else list(value)
+        return state
+
+
+class LangGraphBackend(BaseExecutionBackend):
+    """
+    Runs the nodes with a LangGraph `StateGraph` in which every node goes from START to END.
+
+    Attributes:
+        graph: The compiled StateGraph.
+    """
+
+    def __init__(self, name2node: dict[str, Callable], max_workers: int | None = None):
+        super().__init__(name2node, max_workers)
+        from langgraph.constants import START, END
+        from langgraph.graph import StateGraph
+
+        graph = StateGraph(StateOrchestratorGenerator)
+        for node_name, node_fun in name2node.items():
+            graph.add_node(node_name, node_fun)
+            graph.add_edge(START, node_name)
+            graph.add_edge(node_name, END)
+        self.graph = graph.compile()
+
+    def invoke(self, state: StateOrchestratorGenerator) -> StateOrchestratorGenerator:
+        config = {'max_concurrency': self.max_workers} if self.max_workers else None
+        return self.graph.invoke(state, config=config)
+
+
+class _PoolBackend(BaseExecutionBackend):
+    """Runs each node as a task of a `concurrent.futures` executor. The outputs are merged in node order.
+    The executor is created on the first `invoke` and reused until `close`"""
+
+    def __init__(self, name2node: dict[str, Callable], max_workers: int | None = None):
+        super().__init__(name2node, max_workers)
+        self._pool: Executor | None = None
+
+    @abstractmethod
+    def _executor(self) -> Executor:
+        raise NotImplementedError
+
+    def invoke(self, state: StateOrchestratorGenerator) -> StateOrchestratorGenerator:
+        if self._pool is None:
+            self._pool = self._executor()
+        futures = [self._pool.submit(node_fun, state) for node_fun in self.name2node.values()]
+        outputs = [future.result() for future in futures]
+        return self._merge(state, outputs)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class ThreadPoolBackend(_PoolBackend):
+    """
+    Runs the nodes in a thread pool, without LangGraph.
+
+    The generators spend most of their time waiting for the database, hence threads are enough to overlap
+    their queries.
+    """
+
+    def _executor(self) -> Executor:
+        return ThreadPoolExecutor(max_workers=self.max_workers)
+
+
+class ProcessPoolBackend(_PoolBackend):
+    """
+    Runs the nodes in a process pool, without LangGraph.
+
+    The state (with the connector and the loaded tables) and the generators are pickled for each node, hence
+    the connector must support pickling (see `SqliteConnector`). The processes do not share the profiler
+    of the connector.
+    The processes are started with `spawn`, as forking a process holding SQLAlchemy engines and threads is
+    unsafe, and they are kept until `close`.
+    """
+
+    def _executor(self) -> Executor:
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+name2backend = {
+    'langgraph': LangGraphBackend,
+    'thread': ThreadPoolBackend,
+    'process': ProcessPoolBackend,
+}
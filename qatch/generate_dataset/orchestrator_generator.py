@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import json
 import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
 
 import pandas as pd
-from langgraph.constants import START, END
-from langgraph.graph import StateGraph
+from typing_extensions import Literal
 
 from .checklist_generators import (
     ProjectGenerator,
@@ -18,8 +22,17 @@ from .checklist_generators import (
     ManyToManyGenerator
 
 )
-from .state_orchestrator_generator import StateOrchestratorGenerator
-from ..connectors import BaseConnector
+from .batch_generation import (
+    DatabaseGenerationResult,
+    utils_database_seed,
+    utils_find_databases,
+    _generate_database,
+    _generate_database_in_worker,
+    _init_worker,
+)
+from .checklist_generators.base_generator import GeneratorStats
+from .execution_backends import BaseExecutionBackend, name2backend
+from ..connectors import BaseConnector, profiling_caller
 
 name2generator = {
     'project': ProjectGenerator,
@@ -39,12 +52,21 @@ class OrchestratorGenerator:
     Initializes an OrchestratorGenerator object with a list of generator names or
     defaults to all available generator names.
 
+    The generators run in parallel with the execution backend selected by `backend` (see `name2backend`):
+    a LangGraph `StateGraph` (`langgraph`, the default), a thread pool (`thread`) or a process pool (`process`).
+    All backends call the same `graph_call` of the generators and return the same tests; the thread and process
+    backends do not import LangGraph.
+
     Args:
         generator_names (list[str] | None): A list of generator names or None to use all available generator names
         if not provided.
+        backend (Literal['langgraph', 'thread', 'process']): The execution backend of the generators.
+        max_workers (int | None): The maximum number of generators running in parallel, None for the backend default.
 
     Attributes:
-        graph: Compiled StateGraph object containing node functions added from the generator names.
+        backend (BaseExecutionBackend): The execution backend of the generators.
+        graph: Compiled StateGraph object containing node functions added from the generator names,
+            None if the backend is not `langgraph`.
 
     Methods:
         - generate_dataset(connector: BaseConnector) -> pd.DataFrame:
@@ -54,29 +76,37 @@ class OrchestratorGenerator:
             Returns a DataFrame with columns 'db_path', 'db_id', 'tbl_name', 'test_category',
              'sql_tag', 'query', 'question'.
             Logs a warning if no dataset can be generated from the connector's database.
+        - iter_generate_datasets(db_paths: str | list[str]) -> Iterator[DatabaseGenerationResult]:
+            Generates the tests of several SQLite databases in a process pool, one result per database.
+        - generate_datasets(db_paths: str | list[str]) -> pd.DataFrame:
+            Generates the tests of several SQLite databases and concatenates them.
+        - close():
+            Shuts down the worker pool of the thread and process backends, which is reused by every generation.
     """
 
-    def __init__(self, generator_names: list[str] | None = None):
-        graph = StateGraph(StateOrchestratorGenerator)
-
+    def __init__(self,
+                 generator_names: list[str] | None = None,
+                 backend: Literal['langgraph', 'thread', 'process'] = 'langgraph',
+                 max_workers: int | None = None):
         if generator_names is None:
             generator_names = name2generator.keys()
+        self.generator_names = list(generator_names)
+        self.max_workers = max_workers
+        self.backend_name = backend
+        if backend not in name2backend:
+            raise ValueError(f'Backend `{backend}` must be one of {list(name2backend.keys())}')
 
-        list_node_fun = [
-            (name, name2generator[name]().graph_call)
+        name2node = {
+            name: name2generator[name]().graph_call
             for name in generator_names
-        ]
-
-        for node_name, node_fun in list_node_fun:
-            graph.add_node(node_name, node_fun)
-            graph.add_edge(START, node_name)
-            graph.add_edge(node_name, END)
-
-        self.graph = graph.compile()
+        }
+        self.backend: BaseExecutionBackend = name2backend[backend](name2node, max_workers)
+        self.graph = getattr(self.backend, 'graph', None)
 
     def generate_dataset(self, connector: BaseConnector,
                          column_to_include: str | None = None,
-                         tables_to_include: str | list | None = None) -> pd.DataFrame:
+                         tables_to_include: str | list | None = None,
+                         return_stats: bool = False) -> pd.DataFrame | tuple[pd.DataFrame, pd.DataFrame]:
         """
         Generates a dataset from the database connected by the given connector.
 
@@ -91,12 +121,16 @@ class OrchestratorGenerator:
             contains database access configurations.
             column_to_include (str): If the column is present in the table, it will be selected in the generation
             tables_to_include (str | list | None): If the table is present in the database, it will be selected in the generation
+            return_stats (bool): If True, the statistics of each generator and table are returned with the dataset.
 
         Returns:
-            pd.DataFrame: The DataFrame created from the `generated_templates` in the state
+            pd.DataFrame | tuple[pd.DataFrame, pd.DataFrame]: The DataFrame created from the `generated_templates` in the state
             containing only specific columns 'db_path', 'db_id', 'tbl_name', 'test_category',
             'sql_tag', 'query', 'question' if any data exists.
             Otherwise, it will be an empty DataFrame.
+            If `return_stats` is True, also the DataFrame of the `GeneratorStats` of each generator and table:
+            generated candidates, kept and dropped tests (empty results or errors, with the error messages),
+            generation, statistics queries and validation times. Each stats row is also logged as JSON at DEBUG level.
 
         Note:
             This could lead to an empty DataFrame if no tests could be generated from the
@@ -104,11 +138,12 @@ class OrchestratorGenerator:
             In that case, a warning message will be logged specifying the 'db_path'.
         """
 
-        database = connector.load_tables_from_database()
+        with profiling_caller('load_tables'):
+            database = connector.load_tables_from_database()
         tables_to_include = tables_to_include or list(database.keys())
         database = {table: database[table] for table in tables_to_include}
 
-        state = self.graph.invoke(
+        state = self.backend.invoke(
             {'database': database,
              'connector': connector,
              'column_to_include': column_to_include})
@@ -118,4 +153,122 @@ class OrchestratorGenerator:
             dataset = dataset.loc[:, ['db_path', 'db_id', 'tbl_name', 'test_category', 'sql_tag', 'query', 'question']]
         else:
             logging.warning(f'QATCH not able to generate tests from {connector.db_path}')
+
+        generator_stats = state.get('generator_stats', [])
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            for stats in generator_stats:
+                logging.debug(json.dumps(stats))
+        if return_stats:
+            return dataset, pd.DataFrame(generator_stats, columns=list(GeneratorStats.__annotations__))
+        return dataset
+
+    def iter_generate_datasets(self,
+                               db_paths: str | list[str],
+                               column_to_include: str | None = None,
+                               tables_to_include: str | list | None = None,
+                               num_processes: int | None = None,
+                               seed: int = 2023,
+                               query_timeout: float | None = None) -> Iterator[DatabaseGenerationResult]:
+        """
+        Generates the tests of several SQLite databases, yielding the result of each database in input order.
+
+        The databases are distributed to a pool of `num_processes` spawned processes, each with its own orchestrator
+        (same generators, backend and workers as this one). The connectors are created in the processes,
+        when the database is generated, hence at most one database per process is open at a time.
+        At most two results per process are kept in memory before being yielded.
+
+        Before the generation on a database, the random generator is seeded with `utils_database_seed(seed, db_path)`,
+        hence the sampled tests do not depend on the other databases or on the number of processes.
+
+        Args:
+            db_paths (str | list[str]): The SQLite database files or directories of databases,
+                see `utils_find_databases`.
+            column_to_include (str | None): If the column is present in the table, it will be selected in the generation.
+            tables_to_include (str | list | None): The tables selected in the generation of each database.
+            num_processes (int | None): The number of processes. If 1, the databases are generated in the current
+                process. If None, the number of CPUs.
+            seed (int): The seed from which the seed of each database is derived.
+            query_timeout (float | None): The timeout in seconds of the queries on the databases, None for the
+                `SqliteConnector` default.
+
+        Returns:
+            Iterator[DatabaseGenerationResult]: The tests and the statistics of each database. If opening the
+            database or generating its tests raises an exception, the result holds the error instead and
+            the other databases are generated anyway.
+
+        Note:
+            The generators running in parallel threads on the same database share the random generator, hence
+            the tests are reproducible only if the generators of a database run one at a time
+            (e.g. `backend='thread'` with `max_workers=1`).
+        """
+        db_paths = utils_find_databases(db_paths)
+        generation_kwargs = {'column_to_include': column_to_include, 'tables_to_include': tables_to_include}
+        if num_processes == 1:
+            for db_path in db_paths:
+                yield self._log_result(_generate_database(
+                    self, db_path, utils_database_seed(seed, db_path), generation_kwargs, query_timeout))
+            return
+
+        orchestrator_kwargs = {'generator_names': self.generator_names, 'backend': self.backend_name,
+                               'max_workers': self.max_workers}
+        # spawned processes do not inherit the locks held by other threads, e.g. by a query still running
+        # after its timeout, which would deadlock forked processes
+        with ProcessPoolExecutor(max_workers=num_processes, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker, initargs=(orchestrator_kwargs,)) as executor:
+            max_pending = 2 * (num_processes or os.cpu_count() or 1)
+            pending = []
+            for db_path in db_paths:
+                pending.append(executor.submit(_generate_database_in_worker, db_path,
+                                               utils_database_seed(seed, db_path), generation_kwargs, query_timeout))
+                if len(pending) >= max_pending:
+                    yield self._log_result(pending.pop(0).result())
+            for future in pending:
+                yield self._log_result(future.result())
+
+    def generate_datasets(self,
+                          db_paths: str | list[str],
+                          column_to_include: str | None = None,
+                          tables_to_include: str | list | None = None,
+                          num_processes: int | None = None,
+                          seed: int = 2023,
+                          query_timeout: float | None = None,
+                          return_stats: bool = False) -> pd.DataFrame | tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Generates the tests of several SQLite databases in a process pool and concatenates them.
+
+        See `iter_generate_datasets` for the arguments. The databases whose generation fails are logged as errors
+        and skipped.
+
+        Args:
+            return_stats (bool): If True, the concatenated `GeneratorStats` of all the databases are returned
+                with the dataset.
+
+        Returns:
+            pd.DataFrame | tuple[pd.DataFrame, pd.DataFrame]: The tests of all the databases, with the same columns
+            of `generate_dataset`, and the statistics if `return_stats` is True.
+        """
+        datasets, stats = [], []
+        for result in self.iter_generate_datasets(db_paths, column_to_include, tables_to_include,
+                                                  num_processes, seed, query_timeout):
+            if result.error is None:
+                datasets.append(result.dataset)
+                stats.append(result.stats)
+        datasets = [dataset for dataset in datasets if len(dataset) > 0]
+        dataset = pd.concat(datasets, ignore_index=True) if datasets else pd.DataFrame()
+        if return_stats:
+            stats = pd.concat(stats, ignore_index=True) if stats else pd.DataFrame(
+                columns=list(GeneratorStats.__annotations__))
+            return dataset, stats
         return dataset
+
+    def close(self):
+        """Shuts down the worker pool of the backend, if any"""
+        self.backend.close()
+
+    @staticmethod
+    def _log_result(result: DatabaseGenerationResult) -> DatabaseGenerationResult:
+        if result.error is not None:
+            logging.error(f'QATCH failed to generate tests from {result.db_path}: {result.error}')
+        else:
+            logging.info(f'Generated {len(result.dataset)} tests from {result.db_path}')
+        return result
@@ -8,4 +8,5 @@ class StateOrchestratorGenerator(TypedDict):
     connector: BaseConnector
     database: dict[str, ConnectorTable]
     generated_templates: Annotated[list, operator.add]
+    generator_stats: Annotated[list, operator.add]
     column_to_include: str
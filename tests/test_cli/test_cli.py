@@ -0,0 +1,114 @@
+import json
+import os.path
+
+import pandas as pd
+import pytest
+from func_timeout import FunctionTimedOut
+
+from qatch import cli
+from qatch.connectors import SqliteConnector
+from qatch.evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+
+METRICS = ['cell_precision', 'cell_recall', 'tuple_cardinality', 'tuple_order', 'execution_accuracy']
+
+
+def _create_database(db_path: str) -> SqliteConnector:
+    return SqliteConnector(
+        relative_db_path=db_path,
+        db_name='olympic_games',
+        tables={'olympic_games': pd.DataFrame({'year': [1896, 1900, 2004, 2008],
+                                               'city': ['athens', 'paris', 'athens', 'beijing']})},
+        table2primary_key=None
+    )
+
+
+@pytest.fixture
+def db_dir(tmp_path):
+    db_dir = os.path.join(tmp_path, 'databases')
+    os.makedirs(os.path.join(db_dir, 'nested'))
+    _create_database(os.path.join(db_dir, 'first.sqlite'))
+    _create_database(os.path.join(db_dir, 'nested', 'second.sqlite3'))
+    return db_dir
+
+
+@pytest.fixture
+def predictions_path(tmp_path):
+    db_path = _create_database(os.path.join(tmp_path, 'temp.sqlite')).db_path
+    df = pd.DataFrame({
+        'db_path': [db_path] * 5,
+        'query': ['SELECT city FROM olympic_games'] * 5,
+        'prediction': ['SELECT city FROM olympic_games',
+                       'SELECT year FROM olympic_games',
+                       'SELECT city FROM olympic_games WHERE year > 1900',
+                       'SELECT city, year FROM olympic_games',
+                       'SELECT DISTINCT city FROM olympic_games'],
+    })
+    path = os.path.join(tmp_path, 'predictions.jsonl')
+    df.to_json(path, orient='records', lines=True)
+    return path
+
+
+def test_generate(db_dir, tmp_path):
+    output = os.path.join(tmp_path, 'tests.jsonl')
+    stats_output = os.path.join(tmp_path, 'stats.csv')
+    assert cli.main(['generate', db_dir, '--output', output, '--stats-output', stats_output,
+                     '--generators', 'distinct', 'orderby', '--backend', 'thread', '--workers', '2',
+                     '--processes', '1', '--timeout', '10']) == 0
+
+    tests = pd.read_json(output, lines=True)
+    assert set(tests['db_id']) == {'first', 'second'}
+    assert set(tests['test_category']) == {'DISTINCT', 'ORDERBY'}
+    stats = pd.read_csv(stats_output)
+    assert stats.groupby('db_path')['kept'].sum().sum() == len(tests)
+
+
+def test_generate_failed_database(db_dir, tmp_path):
+    with open(os.path.join(db_dir, 'corrupted.sqlite'), 'w') as file:
+        file.write('not a database')
+    output = os.path.join(tmp_path, 'tests.jsonl')
+    assert cli.main(['generate', db_dir, '--output', output, '--generators', 'distinct', '--processes', '2']) == 1
+    assert set(pd.read_json(output, lines=True)['db_id']) == {'first', 'second'}
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_evaluate_equal_to_evaluate_df(predictions_path, tmp_path, workers):
+    output = os.path.join(tmp_path, 'metrics.jsonl')
+    assert cli.main(['evaluate', predictions_path, '--output', output, '--metrics', *METRICS,
+                     '--chunk-size', '2', '--workers', str(workers),
+                     '--cache-dir', os.path.join(tmp_path, 'cache')]) == 0
+
+    expected = OrchestratorEvaluator(METRICS).evaluate_df(
+        pd.read_json(predictions_path, lines=True), 'query', 'prediction', 'db_path')
+    result = pd.read_json(output, lines=True)
+    pd.testing.assert_frame_equal(result[METRICS], expected[METRICS], check_dtype=False)
+    assert os.path.exists(os.path.join(tmp_path, 'cache', cli.RESULT_CACHE_FILE_NAME))
+
+
+def test_evaluate_with_checkpoint_and_result_store(predictions_path, tmp_path):
+    checkpoint = os.path.join(tmp_path, 'checkpoint.jsonl')
+    result_store = os.path.join(tmp_path, 'results.sqlite')
+    cli.main(['evaluate', predictions_path, '--output', os.path.join(tmp_path, 'metrics.csv'), '--metrics', *METRICS,
+              '--checkpoint', checkpoint, '--checkpoint-every', '1', '--result-store', result_store])
+    with open(checkpoint) as file:
+        header, *records = [json.loads(line) for line in file]
+    assert header['config']['evaluator_names'] == METRICS
+    assert len(records) == 5
+    assert os.path.exists(result_store)
+
+
+def test_checkpoint_requires_one_worker(predictions_path, tmp_path):
+    with pytest.raises(SystemExit):
+        cli.main(['evaluate', predictions_path, '--output', os.path.join(tmp_path, 'metrics.jsonl'),
+                  '--checkpoint', os.path.join(tmp_path, 'checkpoint.jsonl'), '--workers', '2'])
+
+
+def test_query_timeout(tmp_path):
+    connector = _create_database(os.path.join(tmp_path, 'temp.sqlite'))
+    assert connector.query_timeout == SqliteConnector.query_timeout
+    connector = SqliteConnector(relative_db_path=connector.db_path, db_name='olympic_games', query_timeout=0.01)
+    # the query keeps running in the background after the timeout, hence it must terminate
+    slow_query = ('WITH RECURSIVE counter(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM counter WHERE n < 1000000) '
+                  'SELECT COUNT(*) FROM counter')
+    with pytest.raises(FunctionTimedOut):
+        connector.run_query(slow_query)
+    assert connector.run_query('SELECT COUNT(*) FROM olympic_games') == [[4]]
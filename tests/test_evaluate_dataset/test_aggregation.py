@@ -0,0 +1,68 @@
+import os.path
+import random
+import statistics
+
+import pandas as pd
+import pytest
+
+from qatch.connectors import SqliteConnector
+from qatch.evaluate_dataset.aggregation import MetricsAggregator, RunningStatistics
+from qatch.evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+
+METRICS = ['cell_precision', 'cell_recall', 'tuple_cardinality', 'tuple_order', 'execution_accuracy']
+
+
+def test_running_statistics():
+    rng = random.Random(0)
+    values = [rng.random() for _ in range(101)]
+    stats = RunningStatistics()
+    for value in values:
+        stats.update(value)
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(statistics.mean(values))
+    assert stats.variance == pytest.approx(statistics.variance(values))
+
+    first, second = RunningStatistics(), RunningStatistics()
+    for value in values[:30]:
+        first.update(value)
+    for value in values[30:]:
+        second.update(value)
+    first.merge(second)
+    assert first.count == stats.count
+    assert first.mean == pytest.approx(stats.mean)
+    assert first.variance == pytest.approx(stats.variance)
+
+
+def test_aggregator_equal_to_groupby(tmp_path):
+    connector = SqliteConnector(
+        relative_db_path=os.path.join(tmp_path, 'temp.sqlite'),
+        db_name='olympic_games',
+        tables={'olympic_games': pd.DataFrame({'year': [1896, 1900, 2004], 'city': ['athens', 'paris', 'athens']})},
+        table2primary_key=None
+    )
+    df = pd.DataFrame({
+        'db_path': [connector.db_path] * 4,
+        'test_category': ['project', 'project', 'select', 'select'],
+        'query': ['SELECT city FROM olympic_games', 'SELECT year FROM olympic_games',
+                  'SELECT city FROM olympic_games WHERE year > 1896', 'SELECT * FROM olympic_games ORDER BY year'],
+        'prediction': ['SELECT city FROM olympic_games', 'SELECT city FROM olympic_games',
+                       'SELECT city FROM olympic_games', 'SELECT * FROM olympic_games ORDER BY year DESC'],
+    })
+    calls = []
+    aggregator = MetricsAggregator(['test_category'], callback=lambda agg: calls.append(agg.num_tests),
+                                   callback_every=2)
+    result = OrchestratorEvaluator(METRICS).evaluate_df(df, 'query', 'prediction', 'db_path', aggregator=aggregator)
+    assert calls == [2, 4]
+
+    summary = aggregator.summary().set_index(['group_by', 'group', 'metric'])
+    expected = result.groupby('test_category')[METRICS].agg(['count', 'mean'])
+    for category in ['project', 'select']:
+        for metric in METRICS:
+            if expected.loc[category, (metric, 'count')] == 0:
+                assert ('test_category', category, metric) not in summary.index
+                continue
+            row = summary.loc[('test_category', category, metric)]
+            assert row['count'] == expected.loc[category, (metric, 'count')]
+            assert row['mean'] == pytest.approx(expected.loc[category, (metric, 'mean')])
+    for metric in METRICS:
+        assert aggregator.means()[metric] == pytest.approx(result[metric].astype(float).mean())
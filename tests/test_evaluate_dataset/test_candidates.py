@@ -0,0 +1,93 @@
+import os.path
+
+import pandas as pd
+import pytest
+
+from qatch.connectors import SqliteConnector
+from qatch.evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator, utils_pass_at_k
+
+METRICS = ['cell_precision', 'cell_recall', 'tuple_cardinality', 'tuple_order', 'execution_accuracy']
+
+
+class TestCandidates:
+    @pytest.fixture
+    def connector(self, tmp_path):
+        data = {
+            "id": [0, 1, 2, 3, 4, 5],
+            "year": [1896, 1900, 1904, 2004, 2008, 2012],
+            "city": ["athens", "paris", "st. louis", "athens", "beijing", "london"]
+        }
+        return SqliteConnector(
+            relative_db_path=os.path.join(tmp_path, 'temp.sqlite'),
+            db_name='olympic_games',
+            tables={'olympic_games': pd.DataFrame.from_dict(data)},
+            table2primary_key=None
+        )
+
+    @pytest.mark.parametrize('n, c, k, expected', [
+        (5, 0, 1, 0.0),
+        (5, 5, 3, 1.0),
+        (4, 1, 1, 0.25),
+        (4, 1, 2, 0.5),
+        (4, 2, 3, 1.0),
+        (2, 1, 3, None),
+    ])
+    def test_pass_at_k(self, n, c, k, expected):
+        assert utils_pass_at_k(n, c, k) == expected
+
+    def test_candidates_metrics_and_aggregates(self, connector, monkeypatch):
+        executed = []
+        original_run_query = connector.run_query
+        monkeypatch.setattr(connector, 'run_query', lambda query: executed.append(query) or original_run_query(query))
+
+        orchestrator = OrchestratorEvaluator(METRICS)
+        target = 'SELECT city FROM olympic_games WHERE year > 2000'
+        candidates = ['SELECT city FROM olympic_games',
+                      'SELECT city FROM olympic_games;',
+                      'SELECT city FROM olympic_games WHERE id > 2',
+                      'SELECT city FROM olympic_games WHERE year >= 2004']
+        output = orchestrator.evaluate_candidates(target, candidates, connector, k_values=(1, 2, 5))
+
+        # the target and the distinct candidates are executed only once
+        assert len(executed) == 4
+        expected = [orchestrator.evaluate_single_test(target, candidate, connector) for candidate in candidates]
+        assert output['candidates_metrics'] == expected
+        for metric in METRICS:
+            values = [metrics[metric] for metrics in expected if metrics[metric] is not None]
+            assert output[f'best_{metric}'] == (max(values) if values else None)
+        assert output['pass@1'] == 0.5
+        assert output['pass@2'] == utils_pass_at_k(4, 2, 2)
+        assert output['pass@5'] is None
+
+    def test_candidates_with_same_rows_share_metrics(self, connector, monkeypatch):
+        orchestrator = OrchestratorEvaluator(METRICS)
+        graph_calls = []
+        original_invoke = orchestrator.graph.invoke
+        monkeypatch.setattr(orchestrator.graph, 'invoke', lambda state: graph_calls.append(1) or original_invoke(state))
+
+        target = 'SELECT city FROM olympic_games'
+        candidates = ['SELECT city FROM olympic_games WHERE id > 2',
+                      'SELECT city FROM olympic_games WHERE year > 1904']
+        output = orchestrator.evaluate_candidates(target, candidates, connector)
+        assert len(graph_calls) == 1
+        assert output['candidates_metrics'][0] == output['candidates_metrics'][1]
+
+    def test_unknown_correctness_metric(self, connector):
+        orchestrator = OrchestratorEvaluator(['cell_precision'])
+        with pytest.raises(ValueError):
+            orchestrator.evaluate_candidates('SELECT city FROM olympic_games', [], connector)
+
+    def test_evaluate_candidates_df(self, connector):
+        df = pd.DataFrame({
+            'db_path': [connector.db_path] * 2,
+            'query': ['SELECT city FROM olympic_games', 'SELECT year FROM olympic_games'],
+            'candidates': [['SELECT city FROM olympic_games', 'SELECT id FROM olympic_games'],
+                           ['SELECT id FROM olympic_games']],
+        })
+        orchestrator = OrchestratorEvaluator(METRICS)
+        result = orchestrator.evaluate_candidates_df(df, 'query', 'candidates', 'db_path', k_values=(1, 2))
+        assert result['pass@1'].tolist() == [0.5, 0.0]
+        assert result['pass@2'].tolist()[0] == 1.0
+        assert pd.isna(result['pass@2'].tolist()[1])
+        assert result['best_execution_accuracy'].tolist() == [1, 0]
+        assert len(result['candidates_metrics'][0]) == 2
@@ -0,0 +1,126 @@
+import json
+import os.path
+
+import pandas as pd
+import pytest
+
+from qatch.connectors import SqliteConnector
+from qatch.evaluate_dataset.checkpoint import EvaluationCheckpoint, utils_test_id
+from qatch.evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+
+
+class TestEvaluationCheckpoint:
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        data = {
+            "id": [0, 1, 2, 3, 4, 5],
+            "year": [1896, 1900, 1904, 2004, 2008, 2012],
+            "city": ["athens", "paris", "st. louis", "athens", "beijing", "london"]
+        }
+        db_path = os.path.join(tmp_path, 'temp.sqlite')
+        SqliteConnector(
+            relative_db_path=db_path,
+            db_name='olympic_games',
+            tables={'olympic_games': pd.DataFrame.from_dict(data)},
+            table2primary_key=None
+        )
+        return db_path
+
+    @pytest.fixture
+    def df(self, db_path):
+        return pd.DataFrame({
+            'db_path': [db_path] * 4,
+            'query': ['SELECT city FROM olympic_games',
+                      'SELECT year FROM olympic_games',
+                      'SELECT wrong FROM olympic_games',
+                      'SELECT id FROM olympic_games'],
+            'prediction': ['SELECT city FROM olympic_games WHERE id > 2',
+                           'SELECT year FROM olympic_games',
+                           'SELECT id FROM olympic_games',
+                           'SELECT city FROM olympic_games'],
+        })
+
+    def test_test_id_is_stable(self):
+        assert utils_test_id('db', 'SELECT 1', [[1]]) == utils_test_id('db', 'SELECT 1', [[1]])
+        assert utils_test_id('db', 'SELECT 1', [[1]]) != utils_test_id('db', 'SELECT 1', [[2]])
+
+    def test_checkpoint_append_and_load(self, tmp_path):
+        path = os.path.join(tmp_path, 'checkpoint.jsonl')
+        with EvaluationCheckpoint(path, flush_every=2) as checkpoint:
+            checkpoint.add('a', {'cell_recall': 1.0})
+            assert not os.path.exists(path)
+            checkpoint.add('b', {'cell_recall': None}, error='broken target')
+            assert os.path.exists(path)
+            checkpoint.add('c', {'cell_recall': 0.5})
+        # simulate a crash while writing the last line
+        with open(path, 'a') as f:
+            f.write('{"test_id": "d", "metr')
+
+        checkpoint = EvaluationCheckpoint(path)
+        assert set(checkpoint.completed) == {'a', 'b', 'c'}
+        assert checkpoint.get('b')['error'] == 'broken target'
+        checkpoint.add('e', {'cell_recall': 0.0})
+        checkpoint.flush()
+        assert 'e' in EvaluationCheckpoint(path)
+
+    def test_skip_target_errors(self, df):
+        orchestrator = OrchestratorEvaluator(['cell_precision', 'cell_recall'])
+        with pytest.raises(ValueError):
+            orchestrator.evaluate_df(df, 'query', 'prediction', 'db_path')
+
+        result = orchestrator.evaluate_df(df, 'query', 'prediction', 'db_path', skip_target_errors=True)
+        assert result['evaluation_error'].isna().tolist() == [True, True, False, True]
+        assert pd.isna(result.loc[2, 'cell_precision'])
+        assert result.loc[1, 'cell_recall'] == 1.0
+
+    def test_resume_from_checkpoint(self, df, tmp_path, monkeypatch):
+        path = os.path.join(tmp_path, 'checkpoint.jsonl')
+        orchestrator = OrchestratorEvaluator(['cell_precision', 'cell_recall'])
+        # the broken target interrupts the evaluation, completed tests are saved anyway
+        with pytest.raises(ValueError):
+            orchestrator.evaluate_df(df, 'query', 'prediction', 'db_path', checkpoint_path=path)
+        with open(path) as f:
+            header, *records = [json.loads(line) for line in f]
+        assert header == {'config': orchestrator.config}
+        assert len(records) == 2
+
+        expected = orchestrator.evaluate_df(df, 'query', 'prediction', 'db_path', skip_target_errors=True)
+        evaluated_predictions = []
+        original_evaluate = orchestrator.evaluate_multiple_predictions
+
+        def spy(target, predictions, connector):
+            evaluated_predictions.extend(predictions)
+            return original_evaluate(target, predictions, connector)
+
+        monkeypatch.setattr(orchestrator, 'evaluate_multiple_predictions', spy)
+        result = orchestrator.evaluate_df(df, 'query', 'prediction', 'db_path', checkpoint_path=path,
+                                          skip_target_errors=True)
+        assert evaluated_predictions == df['prediction'].tolist()[2:]
+        pd.testing.assert_frame_equal(result, expected)
+
+        # every test is now in the checkpoint
+        evaluated_predictions.clear()
+        orchestrator.evaluate_df(df, 'query', 'prediction', 'db_path', checkpoint_path=path,
+                                 skip_target_errors=True)
+        assert evaluated_predictions == []
+
+    def test_resume_with_other_config(self, df, tmp_path):
+        path = os.path.join(tmp_path, 'checkpoint.jsonl')
+        orchestrator = OrchestratorEvaluator(['cell_precision', 'cell_recall'])
+        orchestrator.evaluate_df(df, 'query', 'prediction', 'db_path', checkpoint_path=path, skip_target_errors=True)
+        for other in [OrchestratorEvaluator(['cell_precision']),
+                      OrchestratorEvaluator(['cell_precision', 'cell_recall'], mode='streaming'),
+                      OrchestratorEvaluator(['cell_precision', 'cell_recall'], sql_normalization='ast')]:
+            with pytest.raises(ValueError):
+                other.evaluate_df(df, 'query', 'prediction', 'db_path', checkpoint_path=path, skip_target_errors=True)
+        # the same configuration resumes the checkpoint
+        OrchestratorEvaluator(['cell_precision', 'cell_recall']).evaluate_df(
+            df, 'query', 'prediction', 'db_path', checkpoint_path=path, skip_target_errors=True)
+
+    def test_checkpoint_without_header(self, tmp_path, caplog):
+        path = os.path.join(tmp_path, 'checkpoint.jsonl')
+        with EvaluationCheckpoint(path) as checkpoint:
+            checkpoint.add('a', {'cell_recall': 1.0})
+        checkpoint = EvaluationCheckpoint(path, config={'mode': 'python'})
+        assert 'a' in checkpoint
+        assert 'no configuration header' in caplog.text
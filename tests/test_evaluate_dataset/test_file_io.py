@@ -0,0 +1,82 @@
+import json
+import os.path
+
+import pandas as pd
+import pytest
+
+from qatch.connectors import SqliteConnector
+from qatch.evaluate_dataset.file_io import ChunkWriter, utils_iter_file_chunks
+from qatch.evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+
+METRICS = ['cell_precision', 'cell_recall', 'tuple_cardinality', 'tuple_order', 'execution_accuracy']
+
+
+class TestEvaluateFile:
+    @pytest.fixture
+    def df(self, tmp_path):
+        data = {
+            "id": [0, 1, 2, 3, 4, 5],
+            "year": [1896, 1900, 1904, 2004, 2008, 2012],
+            "city": ["athens", "paris", "st. louis", "athens", "beijing", "london"]
+        }
+        connector = SqliteConnector(
+            relative_db_path=os.path.join(tmp_path, 'temp.sqlite'),
+            db_name='olympic_games',
+            tables={'olympic_games': pd.DataFrame.from_dict(data)},
+            table2primary_key=None
+        )
+        return pd.DataFrame({
+            'db_path': [connector.db_path] * 5,
+            'query': ['SELECT city FROM olympic_games'] * 5,
+            'prediction': ['SELECT city FROM olympic_games',
+                           'SELECT year FROM olympic_games',
+                           'SELECT city FROM olympic_games WHERE id > 2',
+                           'SELECT city, year FROM olympic_games',
+                           'SELECT wrong FROM olympic_games'],
+        })
+
+    @pytest.mark.parametrize('input_format, output_format', [('jsonl', 'jsonl'), ('csv', 'csv'), ('jsonl', 'csv')])
+    def test_evaluate_file_equal_to_evaluate_df(self, df, tmp_path, input_format, output_format):
+        input_path = os.path.join(tmp_path, f'input.{input_format}')
+        output_path = os.path.join(tmp_path, f'output.{output_format}')
+        if input_format == 'jsonl':
+            df.to_json(input_path, orient='records', lines=True)
+        else:
+            df.to_csv(input_path, index=False)
+
+        orchestrator = OrchestratorEvaluator(METRICS)
+        num_rows = orchestrator.evaluate_file(input_path, output_path, 'query', 'prediction', 'db_path',
+                                              chunk_size=2)
+        assert num_rows == len(df)
+
+        expected = orchestrator.evaluate_df(df, 'query', 'prediction', 'db_path')
+        result = list(utils_iter_file_chunks(output_path, chunk_size=100))
+        assert len(result) == 1
+        for metric in METRICS:
+            assert result[0][metric].tolist() == pytest.approx(expected[metric].astype(float).tolist(), nan_ok=True)
+
+    def test_connectors_created_once(self, df, tmp_path, monkeypatch):
+        input_path = os.path.join(tmp_path, 'input.jsonl')
+        df.to_json(input_path, orient='records', lines=True)
+        created = []
+        original_init = SqliteConnector.__init__
+        monkeypatch.setattr(SqliteConnector, '__init__',
+                            lambda self, *args, **kwargs: created.append(1) or original_init(self, *args, **kwargs))
+        orchestrator = OrchestratorEvaluator(METRICS)
+        orchestrator.evaluate_file(input_path, os.path.join(tmp_path, 'output.jsonl'),
+                                   'query', 'prediction', 'db_path', chunk_size=1)
+        assert len(created) == 1
+
+    def test_chunk_writer_appends_chunks(self, tmp_path):
+        path = os.path.join(tmp_path, 'output.jsonl')
+        with ChunkWriter(path) as writer:
+            writer.write(pd.DataFrame({'a': [1, 2]}))
+            writer.write(pd.DataFrame({'a': [3]}))
+        with open(path) as f:
+            assert [json.loads(line)['a'] for line in f] == [1, 2, 3]
+
+    def test_unsupported_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            ChunkWriter(os.path.join(tmp_path, 'output.xlsx'))
+        with pytest.raises(ValueError):
+            next(utils_iter_file_chunks(os.path.join(tmp_path, 'input.txt')))
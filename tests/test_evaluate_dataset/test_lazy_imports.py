@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ['langgraph', 'langchain', 'langchain_core', 'pandas', 'sqlalchemy', 'tqdm', 'pydantic']
+
+
+def _imported_heavy_modules(statement: str) -> list[str]:
+    """Runs `statement` in a new interpreter and returns the heavy modules it imported"""
+    code = (f'import sys\n{statement}\n'
+            f'print(",".join(sorted({{name.split(".")[0] for name in sys.modules}} & {set(HEAVY_MODULES)!r})))')
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return [name for name in output.stdout.strip().split(',') if name]
+
+
+@pytest.mark.parametrize('statement', [
+    'import qatch',
+    'import qatch.evaluate_dataset',
+    'import qatch.generate_dataset',
+    'import qatch.connectors',
+    'from qatch.connectors import CompactResult, SqlProfiler, profiling_caller',
+    'from qatch.evaluate_dataset.metrics_evaluators import CellPrecision, TupleOrder, ValidEfficiencyScore',
+])
+def test_no_heavy_imports(statement):
+    assert _imported_heavy_modules(statement) == []
+
+
+def test_metrics_without_heavy_imports():
+    statement = ('from qatch.evaluate_dataset.metrics_evaluators import CellPrecision, ExecutionAccuracy\n'
+                 'assert CellPrecision().run_metric([[1, "a"]], [[1, "b"]]) == 0.5\n'
+                 'assert ExecutionAccuracy().run_metric([[1, "a"]], [["a", 1]]) == 1')
+    assert _imported_heavy_modules(statement) == []
+
+
+def test_lazy_attributes():
+    from qatch.connectors import SqliteConnector
+    from qatch.evaluate_dataset import OrchestratorEvaluator
+    from qatch.generate_dataset import OrchestratorGenerator
+
+    import qatch.connectors
+    assert qatch.connectors.SqliteConnector is SqliteConnector
+    assert OrchestratorEvaluator.__name__ == 'OrchestratorEvaluator'
+    assert OrchestratorGenerator.__name__ == 'OrchestratorGenerator'
+    with pytest.raises(AttributeError):
+        qatch.connectors.NotAConnector
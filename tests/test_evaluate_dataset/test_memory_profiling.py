@@ -0,0 +1,73 @@
+import os.path
+import tracemalloc
+
+import pandas as pd
+import pytest
+
+from qatch.connectors import SqliteConnector
+from qatch.evaluate_dataset.memory_profiling import utils_memory_budget, utils_memory_report, utils_trace_memory
+from qatch.evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+
+METRICS = ['cell_precision', 'cell_recall', 'tuple_cardinality', 'tuple_order', 'execution_accuracy']
+
+
+class TestRecordMemory:
+    @pytest.fixture
+    def connector(self, tmp_path):
+        return SqliteConnector(
+            relative_db_path=os.path.join(tmp_path, 'temp.sqlite'),
+            db_name='numbers',
+            tables={'numbers': pd.DataFrame({'id': range(2000), 'name': [f'name_{i}' for i in range(2000)]})},
+            table2primary_key=None
+        )
+
+    def test_peak_memory(self, connector):
+        orchestrator = OrchestratorEvaluator(METRICS, record_memory=True)
+        target = 'SELECT id, name FROM numbers'
+        prediction = 'SELECT id, name FROM numbers WHERE id < 1000'
+        output = orchestrator.evaluate_single_test(target, prediction, connector)
+
+        assert set(output) == set(METRICS) | set(orchestrator.profiling_names)
+        assert output['target_rows'] == 2000
+        assert output['predicted_rows'] == 1000
+        assert output['peak_memory_target_query'] > output['peak_memory_predicted_query'] > 0
+        assert output['peak_memory'] >= output['peak_memory_target_query']
+        assert not tracemalloc.is_tracing()
+        expected = OrchestratorEvaluator(METRICS).evaluate_single_test(target, prediction, connector)
+        assert {metric: output[metric] for metric in METRICS} == expected
+
+    def test_with_timings(self, connector):
+        orchestrator = OrchestratorEvaluator(METRICS, record_timings=True, record_memory=True)
+        output = orchestrator.evaluate_single_test('SELECT id FROM numbers', 'SELECT name FROM numbers', connector)
+        assert output['time_graph_invoke'] > 0
+        assert output['peak_memory_graph_invoke'] > 0
+        assert orchestrator.profiling_names.count('target_rows') == 1
+
+    def test_report_and_budget(self, connector):
+        df = pd.DataFrame({'query': ['SELECT id FROM numbers', 'SELECT * FROM numbers WHERE id < 10'],
+                           'prediction': ['SELECT id FROM numbers WHERE id < 100', 'SELECT * FROM numbers'],
+                           'db_path': [connector.db_path] * 2})
+        evaluated = OrchestratorEvaluator(METRICS, record_memory=True).evaluate_df(
+            df, 'query', 'prediction', 'db_path')
+
+        report = utils_memory_report(evaluated, n=1)
+        assert len(report) == 1
+        assert report['peak_memory'].iloc[0] == evaluated['peak_memory'].max()
+
+        budget = utils_memory_budget(evaluated, memory_limit=2 ** 30, quantile=1.0)
+        assert budget['peak_memory'] == evaluated['peak_memory'].max()
+        assert budget['max_result_rows'] == int(2 ** 30 / budget['bytes_per_row'])
+        assert budget['max_parallel_tests'] >= 1
+
+    def test_budget_without_memory(self):
+        with pytest.raises(ValueError):
+            utils_memory_budget(pd.DataFrame({'peak_memory': [None], 'target_rows': [1], 'predicted_rows': [1]}),
+                                memory_limit=1)
+
+
+def test_trace_memory_nested():
+    with utils_trace_memory():
+        with utils_trace_memory():
+            assert tracemalloc.is_tracing()
+        assert tracemalloc.is_tracing()
+    assert not tracemalloc.is_tracing()
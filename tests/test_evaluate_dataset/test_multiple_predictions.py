@@ -0,0 +1,78 @@
+import os.path
+
+import pandas as pd
+import pytest
+
+from qatch.connectors import SqliteConnector
+from qatch.evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+
+METRICS = ['cell_precision', 'cell_recall', 'tuple_cardinality', 'tuple_order', 'execution_accuracy']
+
+
+class TestMultiplePredictions:
+    @pytest.fixture
+    def connector(self, tmp_path):
+        data = {
+            "id": [0, 1, 2, 3, 4, 5],
+            "year": [1896, 1900, 1904, 2004, 2008, 2012],
+            "city": ["athens", "paris", "st. louis", "athens", "beijing", "london"]
+        }
+        return SqliteConnector(
+            relative_db_path=os.path.join(tmp_path, 'temp.sqlite'),
+            db_name='olympic_games',
+            tables={'olympic_games': pd.DataFrame.from_dict(data)},
+            table2primary_key=None
+        )
+
+    def test_target_executed_once_and_predictions_deduplicated(self, connector, monkeypatch):
+        executed = []
+        original_run_query = connector.run_query
+        monkeypatch.setattr(connector, 'run_query', lambda query: executed.append(query) or original_run_query(query))
+
+        orchestrator = OrchestratorEvaluator(METRICS)
+        target = 'SELECT city FROM olympic_games ORDER BY year'
+        predictions = ['SELECT city FROM olympic_games',
+                       'SELECT  city FROM olympic_games;',
+                       'SELECT city FROM olympic_games WHERE year > 1900',
+                       [['athens'], ['paris']]]
+        outputs = orchestrator.evaluate_multiple_predictions(target, predictions, connector)
+
+        assert executed.count(target) == 1
+        assert executed.count('SELECT city FROM olympic_games') == 1
+        assert len(executed) == 3
+        assert outputs[0] == outputs[1]
+        for prediction, output in zip(predictions, outputs):
+            assert output == orchestrator.evaluate_single_test(target, prediction, connector)
+
+    def test_evaluate_df_with_multiple_prediction_columns(self, connector):
+        df = pd.DataFrame({
+            'db_path': [connector.db_path] * 2,
+            'query': ['SELECT city FROM olympic_games', 'SELECT year FROM olympic_games'],
+            'model_a': ['SELECT city FROM olympic_games', 'SELECT id FROM olympic_games'],
+            'model_b': ['SELECT year FROM olympic_games', 'SELECT year FROM olympic_games WHERE id > 2'],
+        })
+        orchestrator = OrchestratorEvaluator(METRICS)
+        result = orchestrator.evaluate_df(df, 'query', ['model_a', 'model_b'], 'db_path')
+        for model in ['model_a', 'model_b']:
+            expected = orchestrator.evaluate_df(df, 'query', model, 'db_path')
+            for metric in METRICS:
+                pd.testing.assert_series_equal(result[f'{model}_{metric}'], expected[metric], check_names=False)
+
+    def test_result_key_only_with_several_distinct_predictions(self, connector, monkeypatch):
+        from qatch.evaluate_dataset import orchestrator_evaluator
+
+        keyed = []
+        original_result_key = orchestrator_evaluator._utils_result_key
+        monkeypatch.setattr(orchestrator_evaluator, '_utils_result_key',
+                            lambda result: keyed.append(result) or original_result_key(result))
+
+        orchestrator = OrchestratorEvaluator(METRICS)
+        target = 'SELECT city FROM olympic_games'
+        orchestrator.evaluate_single_test(target, 'SELECT year FROM olympic_games', connector)
+        orchestrator.evaluate_multiple_predictions(
+            target, ['SELECT year FROM olympic_games', 'select year from olympic_games;'], connector)
+        assert keyed == []
+
+        orchestrator.evaluate_multiple_predictions(
+            target, ['SELECT year FROM olympic_games', 'SELECT id FROM olympic_games'], connector)
+        assert len(keyed) == 2
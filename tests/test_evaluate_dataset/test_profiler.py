@@ -0,0 +1,92 @@
+import os.path
+
+import pandas as pd
+import pytest
+
+from qatch.connectors import BaseConnector, SqliteConnector, SqlProfiler, profiling_caller
+from qatch.connectors.profiler import utils_statement_fingerprint
+from qatch.evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+
+METRICS = ['cell_precision', 'cell_recall', 'tuple_cardinality', 'tuple_order', 'execution_accuracy']
+
+
+class TestSqlProfiler:
+    @pytest.fixture
+    def connector(self, tmp_path):
+        return SqliteConnector(
+            relative_db_path=os.path.join(tmp_path, 'temp.sqlite'),
+            db_name='olympic_games',
+            tables={'olympic_games': pd.DataFrame({'year': [1896, 1900, 2004], 'city': ['athens', 'paris', 'athens']})},
+            table2primary_key=None
+        )
+
+    def test_record(self, connector):
+        profiler = SqlProfiler(vm_step_interval=1)
+        connector.set_profiler(profiler)
+        with profiling_caller('outer'), profiling_caller('inner'):
+            result = connector.run_query('SELECT city FROM olympic_games WHERE year > 1896')
+
+        assert result == [['paris'], ['athens']]
+        record, = profiler.records
+        assert record.callers == ('outer', 'inner')
+        assert record.rows == 2
+        assert record.vm_steps > 0
+        assert record.duration > 0
+        assert record.error is None
+
+    def test_all_connector_methods(self, connector):
+        profiler = SqlProfiler()
+        connector.set_profiler(profiler)
+        connector.run_query_compact('SELECT * FROM olympic_games')
+        assert list(connector.iter_query('SELECT year FROM olympic_games')) == [(1896,), (1900,), (2004,)]
+        connector.get_query_columns('SELECT year FROM olympic_games')
+        assert [record.rows for record in profiler.records] == [3, 3, 0]
+
+    def test_error(self, connector):
+        profiler = SqlProfiler()
+        connector.set_profiler(profiler)
+        with pytest.raises(Exception):
+            connector.run_query('SELECT not_a_column FROM olympic_games')
+        assert profiler.records[0].error == 'OperationalError'
+
+    def test_disabled(self, connector):
+        profiler = SqlProfiler()
+        connector.set_profiler(profiler)
+        connector.set_profiler(None)
+        connector.run_query('SELECT * FROM olympic_games')
+        assert profiler.records == []
+
+    def test_installed_for_all_connectors(self, connector):
+        with SqlProfiler() as profiler:
+            assert BaseConnector.profiler is profiler
+            OrchestratorEvaluator(METRICS).evaluate_single_test(
+                'SELECT city FROM olympic_games', 'SELECT year FROM olympic_games', connector
+            )
+        assert BaseConnector.profiler is None
+        callers = {record.callers for record in profiler.records}
+        assert callers == {('evaluation', 'target_query'), ('evaluation', 'predicted_query')}
+
+    def test_top_n_and_folded(self, connector, tmp_path):
+        profiler = SqlProfiler()
+        connector.set_profiler(profiler)
+        with profiling_caller('evaluator'):
+            for year in [1896, 1900, 2004]:
+                connector.run_query(f'SELECT city FROM olympic_games WHERE year = {year}')
+            connector.run_query("SELECT year FROM olympic_games WHERE city = 'athens'")
+
+        report = profiler.top_n(1, by='count')
+        assert report.loc[0, 'statement'] == 'SELECT city FROM olympic_games WHERE year = ?'
+        assert report.loc[0, 'count'] == 3
+        assert report.loc[0, 'total_rows'] == 3
+
+        path = os.path.join(tmp_path, 'profile.folded')
+        assert profiler.export_folded(path, weight='count') == 2
+        with open(path) as file:
+            lines = file.read().splitlines()
+        assert lines[0] == 'evaluator;SELECT city FROM olympic_games WHERE year = ? 3'
+        assert lines[1] == 'evaluator;SELECT year FROM olympic_games WHERE city = ? 1'
+
+
+def test_statement_fingerprint():
+    assert utils_statement_fingerprint("SELECT  a\nFROM t WHERE b = 'it''s' AND c > 1.5") == \
+           'SELECT a FROM t WHERE b = ? AND c > ?'
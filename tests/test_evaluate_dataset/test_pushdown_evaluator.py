@@ -0,0 +1,162 @@
+import os.path
+
+import pandas as pd
+import pytest
+
+from qatch.connectors import SqliteConnector
+from qatch.evaluate_dataset.metrics_evaluators import CellPrecision, CellRecall, TupleCardinality, TupleConstraint
+from qatch.evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+from qatch.evaluate_dataset.pushdown_evaluator import PushdownEvaluator
+
+QUERIES = [
+    'SELECT * FROM olympic_games',
+    'SELECT city, year FROM olympic_games',
+    'SELECT year, city FROM olympic_games',
+    'SELECT city FROM olympic_games',
+    'SELECT DISTINCT city FROM olympic_games',
+    'SELECT city, city FROM olympic_games',
+    'SELECT year, score FROM olympic_games',
+    'SELECT score, year FROM olympic_games WHERE year > 1950',
+    'SELECT city, COUNT(*) FROM olympic_games GROUP BY city',
+    'SELECT id FROM olympic_games WHERE year > 3000',
+    'SELECT * FROM olympic_games WHERE city = "athens" ORDER BY year DESC',
+    'SELECT year, 1.0 * year FROM olympic_games',
+    'SELECT CAST(year AS TEXT) FROM olympic_games',
+    'SELECT score, NULL FROM olympic_games',
+]
+
+
+class TestPushdownEvaluator:
+    @pytest.fixture
+    def connector(self, tmp_path):
+        data = {
+            "id": [0, 1, 2, 3, 4, 5, 6],
+            "year": [1896, 1900, 1904, 2004, 2008, 2012, 2012],
+            "city": ["athens", "paris", "st. louis", "athens", "beijing", "london", "london"],
+            "score": [1.5, None, 2.0, 1.5, 3.25, None, 7.0],
+        }
+        table = pd.DataFrame.from_dict(data)
+        return SqliteConnector(
+            relative_db_path=os.path.join(tmp_path, 'temp.sqlite'),
+            db_name='olympic_games',
+            tables={'olympic_games': table},
+            table2primary_key=None
+        )
+
+    @pytest.mark.parametrize('target_query', QUERIES)
+    def test_parity_with_python_evaluators(self, connector, target_query):
+        evaluators = [CellPrecision(), CellRecall(), TupleCardinality(), TupleConstraint()]
+        pushdown = PushdownEvaluator()
+        target = connector.run_query(target_query)
+        for predicted_query in QUERIES:
+            prediction = connector.run_query(predicted_query)
+            result = pushdown.evaluate(target_query, predicted_query, connector)
+            for evaluator in evaluators:
+                expected = evaluator.run_metric(target, prediction)
+                assert result[evaluator.metric_name] == expected, (evaluator.metric_name, predicted_query)
+
+    def test_subset_of_metrics(self, connector):
+        pushdown = PushdownEvaluator(['cell_recall'])
+        result = pushdown.evaluate('SELECT city FROM olympic_games', 'SELECT DISTINCT city FROM olympic_games',
+                                   connector)
+        assert result == {'cell_recall': 1.0}
+
+    def test_unsupported_metric(self):
+        with pytest.raises(ValueError):
+            PushdownEvaluator(['tuple_order'])
+        with pytest.raises(ValueError):
+            OrchestratorEvaluator(['execution_accuracy'], mode='pushdown')
+
+    def test_orchestrator_pushdown_mode(self, connector):
+        python_orchestrator = OrchestratorEvaluator(
+            ['cell_precision', 'cell_recall', 'tuple_cardinality', 'tuple_constraint']
+        )
+        pushdown_orchestrator = OrchestratorEvaluator(mode='pushdown')
+        target = 'SELECT city, year FROM olympic_games;'
+        for prediction in ['SELECT year, city FROM olympic_games WHERE year > 1900',
+                           'SELECT * FROM olympic_games',
+                           'SELECT wrong_column FROM olympic_games']:
+            assert (pushdown_orchestrator.evaluate_single_test(target, prediction, connector)
+                    == python_orchestrator.evaluate_single_test(target, prediction, connector))
+
+        with pytest.raises(ValueError):
+            pushdown_orchestrator.evaluate_single_test('SELECT wrong_column FROM olympic_games', target, connector)
+
+    def test_orchestrator_pushdown_runtime_errors(self, connector):
+        pushdown_orchestrator = OrchestratorEvaluator(mode='pushdown')
+        target = 'SELECT city, year FROM olympic_games'
+        # compiles, but overflows when executed
+        failing = 'SELECT abs(-9223372036854775807 - 1), year FROM olympic_games'
+        metrics = pushdown_orchestrator.evaluate_single_test(target, failing, connector)
+        assert set(metrics.values()) == {0.0}
+
+        with pytest.raises(ValueError):
+            pushdown_orchestrator.evaluate_single_test(failing, target, connector)
+
+        df = pd.DataFrame({'target': [failing, target], 'prediction': [target, target], 'db_path': connector.db_path})
+        result = pushdown_orchestrator.evaluate_df(df, 'target', 'prediction', 'db_path', skip_target_errors=True)
+        assert result['evaluation_error'].notna().tolist() == [True, False]
+
+    def test_orchestrator_pushdown_target_timeout(self, connector):
+        connector = SqliteConnector(relative_db_path=connector.db_path, db_name='olympic_games', query_timeout=0.2)
+        pushdown_orchestrator = OrchestratorEvaluator(mode='pushdown')
+        # bounded, since the timed out statements keep running in their threads
+        slow_target = ('WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 5000000) '
+                       'SELECT SUM(x) FROM n')
+        with pytest.raises(ValueError):
+            pushdown_orchestrator.evaluate_single_test(slow_target, 'SELECT 1', connector)
+        assert pushdown_orchestrator.evaluate_single_test('SELECT 1', slow_target, connector)['cell_recall'] == 0.0
+
+    def test_query_columns_with_trailing_comment(self, connector):
+        query = 'SELECT city, year FROM olympic_games WHERE year < 1950 -- the early games'
+        assert connector.get_query_columns(query) == ['city', 'year']
+
+    def test_orchestrator_pushdown_trailing_comment(self, connector):
+        python_orchestrator = OrchestratorEvaluator(
+            ['cell_precision', 'cell_recall', 'tuple_cardinality', 'tuple_constraint']
+        )
+        pushdown_orchestrator = OrchestratorEvaluator(mode='pushdown')
+        commented = 'SELECT city, year FROM olympic_games WHERE year < 1950 -- the early games'
+        plain = 'SELECT city, year FROM olympic_games'
+        for target, prediction in [(plain, commented), (commented, plain)]:
+            expected = python_orchestrator.evaluate_single_test(target, prediction, connector)
+            assert pushdown_orchestrator.evaluate_single_test(target, prediction, connector) == expected
+            assert expected['cell_precision'] > 0.0
+
+    def test_orchestrator_pushdown_falls_back_to_python(self, connector, monkeypatch):
+        python_orchestrator = OrchestratorEvaluator(
+            ['cell_precision', 'cell_recall', 'tuple_cardinality', 'tuple_constraint']
+        )
+        pushdown_orchestrator = OrchestratorEvaluator(mode='pushdown')
+        # a statement of the pushdown evaluator failing on valid queries
+        monkeypatch.setattr(pushdown_orchestrator.pushdown_evaluator, 'build_query',
+                            lambda *args: 'SELECT COUNT(*) FROM missing_table')
+        target = 'SELECT city, year FROM olympic_games'
+        prediction = 'SELECT city FROM olympic_games WHERE year > 1950'
+        expected = python_orchestrator.evaluate_single_test(target, prediction, connector)
+        assert pushdown_orchestrator.evaluate_single_test(target, prediction, connector) == expected
+
+        failing = 'SELECT abs(-9223372036854775807 - 1), year FROM olympic_games'
+        metrics = pushdown_orchestrator.evaluate_single_test(target, failing, connector)
+        assert set(metrics.values()) == {0.0}
+
+
+def test_tables_named_as_the_ctes(tmp_path):
+    tables = {
+        'target': pd.DataFrame({'a': [1, 2, 3, 4], 'b': ['x', 'y', 'z', 'x']}),
+        'prediction': pd.DataFrame({'a': [1, 2, 5], 'b': ['x', 'y', 'w']}),
+        'numbered': pd.DataFrame({'a': [1]}),
+        'target_cells': pd.DataFrame({'v': [1]}),
+        'prediction_tuples': pd.DataFrame({'k': [1]}),
+    }
+    connector = SqliteConnector(relative_db_path=os.path.join(tmp_path, 'shadowing.sqlite'), db_name='shadowing',
+                                tables=tables, table2primary_key=None)
+    names = ['cell_precision', 'cell_recall', 'tuple_cardinality', 'tuple_constraint']
+    python_orchestrator = OrchestratorEvaluator(names)
+    pushdown_orchestrator = OrchestratorEvaluator(mode='pushdown')
+    for target, prediction in [('SELECT a, b FROM target', 'SELECT a, b FROM prediction'),
+                               ('SELECT * FROM numbered', 'SELECT v FROM target_cells'),
+                               ('SELECT k FROM prediction_tuples', 'SELECT a FROM target')]:
+        expected = python_orchestrator.evaluate_single_test(target, prediction, connector)
+        assert pushdown_orchestrator.evaluate_single_test(target, prediction, connector) == expected
+    assert expected != {name: 0.0 for name in names}
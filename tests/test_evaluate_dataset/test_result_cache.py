@@ -0,0 +1,139 @@
+import os.path
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from qatch.connectors import SqliteConnector
+from qatch.evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+from qatch.evaluate_dataset.result_cache import ResultCache, utils_database_fingerprint
+
+METRICS = ['cell_precision', 'cell_recall', 'tuple_order', 'execution_accuracy']
+
+
+class TestResultCache:
+    @pytest.fixture
+    def connector(self, tmp_path):
+        data = {
+            "id": [0, 1, 2, 3, 4, 5],
+            "year": [1896, 1900, 1904, 2004, 2008, 2012],
+            "city": ["athens", "paris", "st. louis", "athens", "beijing", "london"]
+        }
+        return SqliteConnector(
+            relative_db_path=os.path.join(tmp_path, 'temp.sqlite'),
+            db_name='olympic_games',
+            tables={'olympic_games': pd.DataFrame.from_dict(data)},
+            table2primary_key=None
+        )
+
+    def test_get_put_normalized_query(self, tmp_path):
+        cache = ResultCache(os.path.join(tmp_path, 'cache.sqlite'))
+        assert cache.get('db', 'SELECT 1') is None
+        cache.put('db', 'SELECT  1;', [[1, 'a', None, 2.5]])
+        assert cache.get('db', '\nSELECT 1 ') == [[1, 'a', None, 2.5]]
+        assert cache.get('other_db', 'SELECT 1') is None
+        assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
+        assert cache.hit_rate == pytest.approx(1 / 3)
+
+    def test_shared_between_instances(self, tmp_path):
+        path = os.path.join(tmp_path, 'cache.sqlite')
+        ResultCache(path).put('db', 'SELECT 1', [[1]])
+        assert ResultCache(path).get('db', 'SELECT 1') == [[1]]
+
+    def test_eviction_of_least_recently_used(self, tmp_path):
+        cache = ResultCache(os.path.join(tmp_path, 'cache.sqlite'), max_size_bytes=3000)
+        cache.put('db', 'q0', [['x' * 900]])
+        cache.put('db', 'q1', [['y' * 900]])
+        cache.get('db', 'q0')
+        cache.put('db', 'q2', [['z' * 900]])
+        cache.put('db', 'q3', [['w' * 900]])
+        assert cache.stats()['size_bytes'] <= 3000
+        assert cache.get('db', 'q1') is None
+        assert cache.get('db', 'q3') is not None
+
+    def test_fingerprint_changes_with_database(self, connector):
+        fingerprint = utils_database_fingerprint(connector.db_path)
+        assert fingerprint == utils_database_fingerprint(connector.db_path)
+        os.utime(connector.db_path, ns=(0, 0))
+        assert fingerprint != utils_database_fingerprint(connector.db_path)
+
+    def test_orchestrator_uses_cache(self, connector, tmp_path):
+        path = os.path.join(tmp_path, 'cache.sqlite')
+        target = 'SELECT city FROM olympic_games'
+        prediction = 'SELECT city FROM olympic_games WHERE year > 1900'
+        expected = OrchestratorEvaluator(METRICS).evaluate_single_test(target, prediction, connector)
+
+        orchestrator = OrchestratorEvaluator(METRICS, result_cache=path)
+        assert orchestrator.evaluate_single_test(target, prediction, connector) == expected
+        assert orchestrator.result_cache.stats()['misses'] == 2
+
+        orchestrator = OrchestratorEvaluator(METRICS, result_cache=ResultCache(path))
+        assert orchestrator.evaluate_single_test(target, prediction, connector) == expected
+        assert orchestrator.result_cache.stats()['hits'] == 2
+
+
+def test_cache_with_other_key_version_is_cleared(tmp_path):
+    path = os.path.join(tmp_path, 'cache.sqlite')
+    cache = ResultCache(path)
+    cache.put('db', 'SELECT 1', [[1]])
+    cache._con.execute('PRAGMA user_version = 0')
+    cache.close()
+
+    cache = ResultCache(path)
+    assert cache.get('db', 'SELECT 1') is None
+    assert cache.stats()['size_bytes'] == 0
+
+
+def test_replaced_result_is_counted_once(tmp_path):
+    path = os.path.join(tmp_path, 'cache.sqlite')
+    cache = ResultCache(path)
+    cache.put('db', 'SELECT 1', [['x' * 900]])
+    cache.put('db', 'SELECT 1', [['y' * 100]])
+    assert cache.stats()['size_bytes'] == cache._total_size() < 900
+    cache.close()
+    assert ResultCache(path).stats()['size_bytes'] == cache.stats()['size_bytes']
+
+
+def test_access_times_are_written_in_batches(tmp_path):
+    path = os.path.join(tmp_path, 'cache.sqlite')
+    cache = ResultCache(path, access_flush_size=3)
+    cache.put('db', 'q0', [[0]])
+    cache.put('db', 'q1', [[1]])
+
+    def last_accesses():
+        con = sqlite3.connect(path)
+        try:
+            return dict(con.execute('SELECT query, last_access FROM results'))
+        finally:
+            con.close()
+
+    written = last_accesses()
+    cache.get('db', 'q0')
+    cache.get('db', 'q1')
+    assert last_accesses() == written
+    cache.get('db', 'q0')
+    assert len(cache._pending_accesses) == 2
+    cache.get('db', 'q0')
+    cache.get('db', 'q1')
+    assert last_accesses() == written
+    cache.put('db', 'q2', [[2]])
+    assert all(last_accesses()[query] > written[query] for query in written)
+
+    cache.get('db', 'q2')
+    cache.close()
+    assert last_accesses()['q2'] > written['q1']
+
+
+def test_cache_uses_the_sql_normalization_of_the_evaluator(tmp_path):
+    path = os.path.join(tmp_path, 'cache.sqlite')
+    orchestrator = OrchestratorEvaluator(METRICS, result_cache=path, sql_normalization='ast')
+    assert orchestrator.result_cache.sql_normalization == 'ast'
+    with pytest.raises(ValueError):
+        OrchestratorEvaluator(METRICS, result_cache=ResultCache(path), sql_normalization='ast')
+
+
+def test_ast_keys(tmp_path):
+    pytest.importorskip('sqlglot')
+    cache = ResultCache(os.path.join(tmp_path, 'cache.sqlite'), sql_normalization='ast')
+    cache.put('db', 'SELECT * FROM "Singer"', [[1]])
+    assert cache.get('db', 'select * from singer;') == [[1]]
@@ -0,0 +1,66 @@
+import os.path
+
+import pandas as pd
+import pytest
+
+from qatch.connectors import SqliteConnector
+from qatch.evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+from qatch.evaluate_dataset.result_store import EvaluationResultStore
+
+METRICS = ['cell_precision', 'cell_recall', 'tuple_cardinality', 'execution_accuracy']
+
+
+class TestEvaluationResultStore:
+    @pytest.fixture
+    def df(self, tmp_path):
+        connector = SqliteConnector(
+            relative_db_path=os.path.join(tmp_path, 'temp.sqlite'),
+            db_name='olympic_games',
+            tables={'olympic_games': pd.DataFrame({'year': [1896, 1900, 2004], 'city': ['athens', 'paris', 'athens']})},
+            table2primary_key=None
+        )
+        return pd.DataFrame({
+            'db_path': [connector.db_path] * 3,
+            'query': ['SELECT city FROM olympic_games'] * 3,
+            'model_a': ['SELECT city FROM olympic_games', 'SELECT year FROM olympic_games', 'SELECT wrong'],
+            'model_b': ['SELECT city FROM olympic_games WHERE year > 1896'] * 3,
+        })
+
+    def test_batched_inserts(self, tmp_path):
+        store = EvaluationResultStore(os.path.join(tmp_path, 'results.sqlite'), run_id='run', batch_size=2)
+        store.add('t1', {'cell_precision': 1.0})
+        assert store._con.execute('SELECT COUNT(*) FROM evaluations').fetchone()[0] == 0
+        store.add('t2', {'cell_precision': 0.5, 'tuple_order': None})
+        assert store._con.execute('SELECT COUNT(*) FROM evaluations').fetchone()[0] == 2
+        assert store._con.execute('SELECT COUNT(*) FROM metrics').fetchone()[0] == 3
+        store.close()
+
+    def test_evaluate_df_writes_store(self, df, tmp_path):
+        path = os.path.join(tmp_path, 'results.sqlite')
+        orchestrator = OrchestratorEvaluator(METRICS)
+        with EvaluationResultStore(path, run_id='run_1') as store:
+            result = orchestrator.evaluate_df(df, 'query', ['model_a', 'model_b'], 'db_path', result_store=store)
+
+        loaded = store.load(run_id='run_1')
+        assert len(loaded) == 2 * len(df)
+        assert (loaded['elapsed_seconds'] >= 0).all()
+        for model in ['model_a', 'model_b']:
+            model_rows = loaded[loaded['model_id'] == model]
+            for metric in METRICS:
+                assert model_rows[metric].tolist() == pytest.approx(result[f'{model}_{metric}'].tolist())
+
+        aggregate = store.aggregate(run_id='run_1', model_id='model_a').set_index('metric')
+        for metric in METRICS:
+            assert aggregate.loc[metric, 'count'] == len(df)
+            assert aggregate.loc[metric, 'mean'] == pytest.approx(result[f'model_a_{metric}'].mean())
+
+    def test_runs_are_appended(self, df, tmp_path):
+        path = os.path.join(tmp_path, 'results.sqlite')
+        orchestrator = OrchestratorEvaluator(METRICS)
+        orchestrator.evaluate_df(df, 'query', 'model_a', 'db_path', result_store=path)
+        orchestrator.evaluate_df(df, 'query', 'model_a', 'db_path', result_store=path)
+        store = EvaluationResultStore(path)
+        aggregate = store.aggregate()
+        assert aggregate['run_id'].nunique() == 2
+        assert set(aggregate['model_id']) == {'model_a'}
+        store.close()
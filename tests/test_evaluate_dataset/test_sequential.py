@@ -0,0 +1,121 @@
+import math
+import os.path
+
+import pandas as pd
+import pytest
+
+from qatch.connectors import SqliteConnector
+from qatch.evaluate_dataset.aggregation import RunningStatistics
+from qatch.evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+from qatch.evaluate_dataset.sequential import SequentialStoppingRule, utils_mean_half_width
+
+
+def _stats(values):
+    stats = RunningStatistics()
+    for value in values:
+        stats.update(value)
+    return stats
+
+
+def test_mean_half_width():
+    assert utils_mean_half_width(_stats([1.0]), 10, 0.95) == math.inf
+    assert utils_mean_half_width(_stats([0.0, 1.0]), 2, 0.95) == 0.0
+    assert utils_mean_half_width(_stats([0.0, 1.0] * 50), 10_000, 0.95) > utils_mean_half_width(
+        _stats([0.0, 1.0] * 500), 10_000, 0.95)
+
+
+def test_mean_half_width_of_equal_values():
+    # the interval of 0/1 metrics does not collapse when all the sampled tests pass
+    assert utils_mean_half_width(_stats([1.0] * 30), 1000, 0.95) > 0.1
+    assert utils_mean_half_width(_stats([0.0] * 30), 1000, 0.95) > 0.1
+    # the normal interval is used for values outside [0, 1]
+    assert utils_mean_half_width(_stats([2.0] * 30), 1000, 0.95) == 0.0
+
+
+def test_stratum_with_all_tests_passing():
+    rule = SequentialStoppingRule(['execution_accuracy'], margin=0.02, min_tests=30,
+                                  baseline={'select': {'execution_accuracy': 0.9}})
+    metric2stats = {'execution_accuracy': _stats([1.0] * 30)}
+    assert rule.decision('select', 'execution_accuracy', metric2stats['execution_accuracy'], 1000) == 'undecided'
+    assert rule.decision('other', 'execution_accuracy', metric2stats['execution_accuracy'], 1000) == 'undecided'
+    assert not rule.should_stop('select', metric2stats, 30, 1000)
+    assert not rule.should_stop('other', metric2stats, 30, 1000)
+
+
+def test_stopping_rule_with_baseline():
+    rule = SequentialStoppingRule(['execution_accuracy'], margin=0.1, min_tests=10,
+                                  baseline={'select': {'execution_accuracy': 0.9}})
+    assert rule.decision('select', 'execution_accuracy', _stats([0.0] * 20), 1000) == 'worse'
+    assert rule.decision('select', 'execution_accuracy', _stats([1.0] * 5 + [0.0] * 5), 1000) == 'undecided'
+    assert rule.decision('select', 'execution_accuracy', _stats([1.0] * 9 + [0.0]), 10) == 'equivalent'
+    assert rule.decision('other', 'execution_accuracy', _stats([1.0] * 2000), 100_000) == 'estimated'
+    assert not rule.should_stop('select', {'execution_accuracy': _stats([0.0] * 5)}, 5, 1000)
+
+
+def test_stratum_with_undefined_metric():
+    rule = SequentialStoppingRule(['tuple_order'], margin=0.05, min_tests=10)
+    assert rule.decision('select', 'tuple_order', RunningStatistics(), 1000) == 'undefined'
+    assert not rule.should_stop('select', {}, 5, 1000)
+    assert rule.should_stop('select', {}, 10, 1000)
+    # a defined metric still has to be decided
+    rule = SequentialStoppingRule(['tuple_order', 'execution_accuracy'], margin=0.05, min_tests=10)
+    assert not rule.should_stop('select', {'execution_accuracy': _stats([1.0, 0.0] * 5)}, 10, 1000)
+
+
+class TestEvaluateDfSequential:
+    @pytest.fixture
+    def df(self, tmp_path):
+        connector = SqliteConnector(
+            relative_db_path=os.path.join(tmp_path, 'temp.sqlite'),
+            db_name='olympic_games',
+            tables={'olympic_games': pd.DataFrame({'year': [1896, 1900, 2004], 'city': ['athens', 'paris', 'athens']})},
+            table2primary_key=None
+        )
+        num_tests = 60
+        return pd.DataFrame({
+            'db_path': [connector.db_path] * 2 * num_tests,
+            'test_category': ['project'] * num_tests + ['select'] * num_tests,
+            'query': ['SELECT city FROM olympic_games'] * 2 * num_tests,
+            'prediction': (['SELECT city FROM olympic_games'] * num_tests
+                           + ['SELECT city FROM olympic_games', 'SELECT year FROM olympic_games'] * (num_tests // 2)),
+        })
+
+    def test_stops_early_on_constant_strata(self, df):
+        orchestrator = OrchestratorEvaluator(['cell_precision', 'execution_accuracy'])
+        evaluated, report = orchestrator.evaluate_df_sequential(
+            df, 'query', 'prediction', 'db_path', margin=0.05, min_tests_per_stratum=10
+        )
+        report = report.set_index('test_category')
+        # all the predictions of `project` are correct: the Wilson interval is narrower than 0.05
+        # before evaluating the whole stratum, but not after the minimum number of tests
+        assert 10 < report.loc['project', 'num_evaluated'] < 60
+        assert report.loc['project', 'decision'] == 'estimated'
+        # half of the `select` predictions are wrong: the interval needs most of the tests to be narrower than 0.05
+        assert 10 < report.loc['select', 'num_evaluated'] <= 60
+        assert report.loc['select', 'half_width'] <= 0.05
+        assert report.loc['select', 'mean'] == pytest.approx(0.5, abs=0.05)
+        assert len(evaluated) == report.loc['project', 'num_evaluated'] + report.loc['select', 'num_evaluated']
+        assert set(evaluated.columns) >= {'cell_precision', 'execution_accuracy'}
+
+    def test_stops_when_baseline_is_decided(self, df):
+        orchestrator = OrchestratorEvaluator(['execution_accuracy'])
+        baseline = {'project': {'execution_accuracy': 1.0}, 'select': {'execution_accuracy': 1.0}}
+        _, report = orchestrator.evaluate_df_sequential(
+            df, 'query', 'prediction', 'db_path', margin=0.1, min_tests_per_stratum=10, baseline=baseline
+        )
+        report = report.set_index('test_category')
+        assert report.loc['project', 'decision'] == 'equivalent'
+        assert report.loc['select', 'decision'] == 'worse'
+        assert report.loc['select', 'num_evaluated'] < 60
+
+    def test_closes_strata_with_undefined_metric(self, df):
+        orchestrator = OrchestratorEvaluator(['tuple_order'])
+        evaluated, report = orchestrator.evaluate_df_sequential(
+            df, 'query', 'prediction', 'db_path', min_tests_per_stratum=10
+        )
+        report = report.set_index('test_category')
+        # no target has an ORDER BY: tuple order is always None and the strata stop after the minimum tests
+        assert (report['decision'] == 'undefined').all()
+        assert (report['num_evaluated'] == 10).all()
+        assert report['mean'].isna().all()
+        assert len(evaluated) == 20
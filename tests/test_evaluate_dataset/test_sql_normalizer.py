@@ -0,0 +1,108 @@
+import os.path
+
+import pandas as pd
+import pytest
+
+from qatch.connectors import SqliteConnector
+from qatch.evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+from qatch.evaluate_dataset.sql_normalizer import utils_canonicalize_query
+
+
+@pytest.mark.parametrize('query_1, query_2', [
+    ('SELECT name FROM singer', 'select  name\n  FROM singer;'),
+    ('SELECT name FROM singer', 'SELECT [name] FROM `Singer` -- comment'),
+    ('SELECT T1.name FROM singer AS T1 JOIN concert AS T2 ON T1.id = T2.singer_id',
+     'SELECT s.name FROM singer s JOIN concert c ON s.id = c.singer_id'),
+    ('SELECT * FROM singer WHERE age <> 3', 'SELECT * FROM singer WHERE age != 3'),
+    ('SELECT * FROM singer WHERE /* adults */ age > 18', 'SELECT * FROM singer WHERE age > 18'),
+])
+def test_equivalent_queries(query_1, query_2):
+    assert utils_canonicalize_query(query_1) == utils_canonicalize_query(query_2)
+
+
+@pytest.mark.parametrize('query_1, query_2', [
+    ("SELECT * FROM singer WHERE name = 'Paris'", "SELECT * FROM singer WHERE name = 'paris'"),
+    ('SELECT name FROM singer', 'SELECT age FROM singer'),
+    ('SELECT s.name FROM singer s', 'SELECT s.name FROM concert s'),
+    # the column `name` must not be renamed as the table alias `name`
+    ('SELECT name.x, y.name FROM t name, u y', 'SELECT name.x, y.other FROM t name, u y'),
+    ('SELECT "select" FROM singer', 'SELECT select FROM singer'),
+    ('SELECT * FROM singer WHERE country = "France"', 'SELECT * FROM singer WHERE country = "france"'),
+    ('SELECT * FROM singer WHERE country = "france"', 'SELECT * FROM singer WHERE country = france'),
+])
+def test_different_queries(query_1, query_2):
+    assert utils_canonicalize_query(query_1) != utils_canonicalize_query(query_2)
+
+
+def test_canonical_form_is_memoized():
+    utils_canonicalize_query.cache_clear()
+    utils_canonicalize_query('SELECT 1')
+    utils_canonicalize_query('SELECT 1')
+    assert utils_canonicalize_query.cache_info().hits == 1
+
+
+def test_equivalent_prediction_is_not_executed(tmp_path, monkeypatch):
+    connector = SqliteConnector(
+        relative_db_path=os.path.join(tmp_path, 'temp.sqlite'),
+        db_name='singers',
+        tables={'singer': pd.DataFrame({'id': [1, 2], 'name': ['a', 'b']})},
+        table2primary_key=None
+    )
+    executed = []
+    monkeypatch.setattr(connector, 'run_query', lambda query: executed.append(query))
+
+    orchestrator = OrchestratorEvaluator(['cell_precision', 'execution_accuracy'])
+    output = orchestrator.evaluate_single_test('SELECT T1.name FROM singer AS T1',
+                                               'select s.name from `Singer` s;', connector)
+    assert executed == []
+    assert output == {'cell_precision': 1.0, 'execution_accuracy': 1.0}
+
+
+def test_double_quoted_strings_are_executed(tmp_path):
+    connector = SqliteConnector(
+        relative_db_path=os.path.join(tmp_path, 'temp.sqlite'),
+        db_name='singers',
+        tables={'singer': pd.DataFrame({'id': [1, 2], 'country': ['France', 'Italy']})},
+        table2primary_key=None
+    )
+    output = OrchestratorEvaluator(['execution_accuracy']).evaluate_single_test(
+        'SELECT id FROM singer WHERE country = "France"', 'SELECT id FROM singer WHERE country = "france"', connector)
+    assert output == {'execution_accuracy': 0}
+
+
+@pytest.mark.parametrize('query_1, query_2', [
+    ('SELECT T1.name FROM singer AS T1', 'select s.NAME from Singer s;'),
+    ('SELECT * FROM singer WHERE age <> 3', 'SELECT * FROM singer WHERE age != 3'),
+    ('SELECT * FROM "Singer"', 'SELECT * FROM singer'),
+])
+def test_ast_equivalent_queries(query_1, query_2):
+    pytest.importorskip('sqlglot')
+    assert utils_canonicalize_query(query_1, 'ast') == utils_canonicalize_query(query_2, 'ast')
+    assert (utils_canonicalize_query('SELECT * FROM singer WHERE country = "France"', 'ast')
+            != utils_canonicalize_query('SELECT * FROM singer WHERE country = "france"', 'ast'))
+
+
+@pytest.mark.parametrize('query', ["SELECT 'unterminated FROM singer", 'SELECT * FROM singer WHERE a = "x'])
+def test_ast_falls_back_to_tokens(query):
+    pytest.importorskip('sqlglot')
+    assert utils_canonicalize_query(query, 'ast') == utils_canonicalize_query(query, 'tokens')
+
+
+def test_orchestrator_ast_normalization(tmp_path, monkeypatch):
+    pytest.importorskip('sqlglot')
+    connector = SqliteConnector(
+        relative_db_path=os.path.join(tmp_path, 'temp.sqlite'),
+        db_name='singers',
+        tables={'singer': pd.DataFrame({'id': [1, 2], 'name': ['a', 'b']})},
+        table2primary_key=None
+    )
+    orchestrator = OrchestratorEvaluator(['cell_precision', 'execution_accuracy'], sql_normalization='ast')
+    target = 'SELECT T1.name FROM singer AS T1'
+    assert orchestrator.evaluate_single_test(target, "SELECT name FROM singer WHERE name = 'a", connector) == {
+        'cell_precision': 0.0, 'execution_accuracy': 0.0}
+
+    executed = []
+    monkeypatch.setattr(connector, 'run_query', lambda query: executed.append(query))
+    output = orchestrator.evaluate_single_test(target, 'select s.name from `Singer` s;', connector)
+    assert executed == []
+    assert output == {'cell_precision': 1.0, 'execution_accuracy': 1.0}
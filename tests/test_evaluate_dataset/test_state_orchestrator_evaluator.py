@@ -0,0 +1,16 @@
+from qatch.evaluate_dataset.state_orchestrator_evaluator import PredictedTest
+
+
+def test_from_results_does_not_copy_lists_of_lists():
+    target = [[1, 'a'], [2, 'b']]
+    prediction = [[1, 'a']]
+    test = PredictedTest.from_results('SELECT 1', target, 'SELECT 2', prediction)
+    assert test.target_values is target
+    assert test.predicted_values is prediction
+    assert test == PredictedTest(target_query='SELECT 1', target_values=target,
+                                 predicted_query='SELECT 2', predicted_values=prediction)
+
+
+def test_from_results_validates_other_rows():
+    test = PredictedTest.from_results('', [(1, 'a')], '', [[1, 'a']])
+    assert test.target_values == [[1, 'a']]
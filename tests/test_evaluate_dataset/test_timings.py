@@ -0,0 +1,51 @@
+import os.path
+
+import pandas as pd
+import pytest
+
+from qatch.connectors import SqliteConnector
+from qatch.evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+
+METRICS = ['cell_precision', 'cell_recall', 'tuple_cardinality', 'tuple_order', 'execution_accuracy']
+
+
+class TestRecordTimings:
+    @pytest.fixture
+    def connector(self, tmp_path):
+        return SqliteConnector(
+            relative_db_path=os.path.join(tmp_path, 'temp.sqlite'),
+            db_name='olympic_games',
+            tables={'olympic_games': pd.DataFrame({'year': [1896, 1900, 2004], 'city': ['athens', 'paris', 'athens']})},
+            table2primary_key=None
+        )
+
+    def test_timings_and_rows(self, connector):
+        orchestrator = OrchestratorEvaluator(METRICS, record_timings=True)
+        target = 'SELECT city FROM olympic_games'
+        prediction = 'SELECT city, year FROM olympic_games WHERE year > 1896'
+        output = orchestrator.evaluate_single_test(target, prediction, connector)
+
+        assert set(output) == set(METRICS) | set(orchestrator.timing_names)
+        assert output['target_rows'] == 3
+        assert output['predicted_rows'] == 2
+        for name in orchestrator.timing_names:
+            assert output[name] >= 0
+        expected = OrchestratorEvaluator(METRICS).evaluate_single_test(target, prediction, connector)
+        assert {metric: output[metric] for metric in METRICS} == expected
+
+    def test_not_executed_phases_are_none(self, connector):
+        orchestrator = OrchestratorEvaluator(METRICS, record_timings=True)
+        output = orchestrator.evaluate_single_test('SELECT city FROM olympic_games',
+                                                   'select city from olympic_games;', connector)
+        assert all(output[name] is None for name in orchestrator.timing_names)
+
+        output = orchestrator.evaluate_single_test('SELECT city FROM olympic_games', 'SELECT wrong', connector)
+        assert output['target_rows'] == 3
+        assert output['predicted_rows'] is None
+        assert output['time_graph_invoke'] is None
+
+    def test_disabled_by_default(self, connector):
+        orchestrator = OrchestratorEvaluator(METRICS)
+        assert orchestrator.timing_names == []
+        output = orchestrator.evaluate_single_test('SELECT city FROM olympic_games', 'SELECT 1', connector)
+        assert set(output) == set(METRICS)
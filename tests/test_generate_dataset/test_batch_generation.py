@@ -0,0 +1,80 @@
+import os.path
+
+import pandas as pd
+import pytest
+
+from qatch.connectors import SqliteConnector
+from qatch.generate_dataset.batch_generation import utils_database_seed, utils_find_databases
+from qatch.generate_dataset.orchestrator_generator import OrchestratorGenerator
+
+GENERATORS = ['project', 'distinct', 'select']
+
+
+def _create_database(db_path: str, cities: list[str]):
+    SqliteConnector(
+        relative_db_path=db_path,
+        db_name='olympic_games',
+        tables={'olympic_games': pd.DataFrame({'year': list(range(1896, 1896 + 4 * len(cities), 4)),
+                                               'city': cities,
+                                               'country': [city.upper() for city in cities],
+                                               'medals': [float(i) for i in range(len(cities))]})},
+        table2primary_key=None
+    ).engine.dispose()
+
+
+@pytest.fixture
+def db_dir(tmp_path):
+    db_dir = os.path.join(tmp_path, 'databases')
+    os.makedirs(os.path.join(db_dir, 'nested'))
+    _create_database(os.path.join(db_dir, 'first.sqlite'), ['athens', 'paris', 'london', 'athens'])
+    _create_database(os.path.join(db_dir, 'nested', 'second.sqlite3'), ['rome', 'tokyo', 'rome'])
+    open(os.path.join(db_dir, 'notes.txt'), 'w').close()
+    return db_dir
+
+
+def test_find_databases(db_dir, tmp_path):
+    db_paths = utils_find_databases(db_dir)
+    assert [os.path.basename(path) for path in db_paths] == ['first.sqlite', 'second.sqlite3']
+    assert utils_find_databases([db_paths[1], db_paths[0]]) == [db_paths[1], db_paths[0]]
+    with pytest.raises(FileNotFoundError):
+        utils_find_databases([os.path.join(tmp_path, 'missing')])
+
+
+def test_database_seed():
+    assert utils_database_seed(2023, 'a.sqlite') == utils_database_seed(2023, 'a.sqlite')
+    assert utils_database_seed(2023, 'a.sqlite') != utils_database_seed(2023, 'b.sqlite')
+    assert utils_database_seed(2023, 'a.sqlite') != utils_database_seed(2024, 'a.sqlite')
+
+
+def test_same_tests_in_process_and_in_pool(db_dir):
+    # one generator at a time, hence the sampled tests depend only on the seed of each database
+    orchestrator = OrchestratorGenerator(GENERATORS, backend='thread', max_workers=1)
+    in_process, in_process_stats = orchestrator.generate_datasets(db_dir, num_processes=1, return_stats=True)
+    in_pool, in_pool_stats = orchestrator.generate_datasets(db_dir, num_processes=2, return_stats=True)
+
+    pd.testing.assert_frame_equal(in_process, in_pool)
+    assert set(in_process['db_id']) == {'first', 'second'}
+    assert in_process_stats['kept'].sum() == len(in_process)
+    assert len(in_pool_stats) == len(in_process_stats)
+
+
+def test_same_tests_as_generate_dataset(db_dir):
+    orchestrator = OrchestratorGenerator(['distinct'], backend='thread')
+    dataset = orchestrator.generate_datasets(db_dir, num_processes=1)
+    expected = pd.concat([
+        orchestrator.generate_dataset(SqliteConnector(relative_db_path=db_path, db_name=db_name))
+        for db_path, db_name in zip(utils_find_databases(db_dir), ['first', 'second'])
+    ], ignore_index=True)
+    pd.testing.assert_frame_equal(dataset, expected)
+
+
+@pytest.mark.parametrize('num_processes', [1, 2])
+def test_failure_isolation(db_dir, num_processes):
+    with open(os.path.join(db_dir, 'corrupted.sqlite'), 'w') as file:
+        file.write('not a database')
+    results = list(OrchestratorGenerator(['distinct']).iter_generate_datasets(db_dir, num_processes=num_processes))
+
+    assert [os.path.basename(result.db_path) for result in results] == [
+        'corrupted.sqlite', 'first.sqlite', 'second.sqlite3']
+    assert results[0].error.startswith('DatabaseError') and results[0].dataset is None
+    assert all(result.error is None and len(result.dataset) > 0 for result in results[1:])
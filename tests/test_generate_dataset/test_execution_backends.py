@@ -0,0 +1,75 @@
+import os.path
+import pickle
+
+import pandas as pd
+import pytest
+
+from qatch.connectors import SqliteConnector
+from qatch.generate_dataset.execution_backends import LangGraphBackend, ProcessPoolBackend, ThreadPoolBackend
+from qatch.generate_dataset.orchestrator_generator import OrchestratorGenerator
+
+# generators that do not sample randomly, hence produce the same tests with any backend
+DETERMINISTIC_GENERATORS = ['distinct', 'orderby', 'groupby', 'having', 'simple']
+
+
+@pytest.fixture
+def connector(tmp_path):
+    return SqliteConnector(
+        relative_db_path=os.path.join(tmp_path, 'temp.sqlite'),
+        db_name='olympic_games',
+        tables={'olympic_games': pd.DataFrame({'year': [1896, 1900, 2004, 2004],
+                                               'city': ['athens', 'paris', 'athens', 'athens'],
+                                               'medals': [10.5, 20.0, 30.0, 1.5]})},
+        table2primary_key=None
+    )
+
+
+@pytest.mark.parametrize('backend', ['thread', 'process'])
+def test_same_tests_as_langgraph(connector, backend):
+    expected, expected_stats = OrchestratorGenerator(DETERMINISTIC_GENERATORS).generate_dataset(
+        connector, return_stats=True)
+    orchestrator = OrchestratorGenerator(DETERMINISTIC_GENERATORS, backend=backend, max_workers=2)
+    dataset, stats = orchestrator.generate_dataset(connector, return_stats=True)
+    orchestrator.close()
+
+    sort_columns = ['test_category', 'query']
+    pd.testing.assert_frame_equal(dataset.sort_values(sort_columns).reset_index(drop=True),
+                                  expected.sort_values(sort_columns).reset_index(drop=True))
+    assert sorted(stats['generator']) == sorted(expected_stats['generator'])
+
+
+def test_process_pool_is_reused_until_closed(connector):
+    orchestrator = OrchestratorGenerator(DETERMINISTIC_GENERATORS, backend='process', max_workers=2)
+    assert isinstance(orchestrator.backend, ProcessPoolBackend)
+    expected = orchestrator.generate_dataset(connector)
+    pool = orchestrator.backend._pool
+    assert pool._mp_context.get_start_method() == 'spawn'
+    pd.testing.assert_frame_equal(orchestrator.generate_dataset(connector), expected)
+    assert orchestrator.backend._pool is pool
+    orchestrator.close()
+    assert orchestrator.backend._pool is None
+    # a new pool is started by the next generation
+    pd.testing.assert_frame_equal(orchestrator.generate_dataset(connector), expected)
+    orchestrator.close()
+
+
+def test_backend_attributes():
+    assert isinstance(OrchestratorGenerator(['distinct']).backend, LangGraphBackend)
+    orchestrator = OrchestratorGenerator(['distinct'], backend='thread')
+    assert isinstance(orchestrator.backend, ThreadPoolBackend)
+    assert orchestrator.graph is None
+    with pytest.raises(ValueError):
+        OrchestratorGenerator(['distinct'], backend='not_a_backend')
+
+
+def test_merge_outputs():
+    state = ThreadPoolBackend._merge({'database': {}, 'generated_templates': []},
+                                     [{'generated_templates': [1, 2]}, {'generated_templates': [3]}])
+    assert state == {'database': {}, 'generated_templates': [1, 2, 3]}
+
+
+def test_pickle_sqlite_connector(connector):
+    unpickled = pickle.loads(pickle.dumps(connector))
+    assert unpickled.db_path == connector.db_path
+    assert unpickled.run_query('SELECT COUNT(*) FROM olympic_games') == [[4]]
+    assert set(unpickled.load_tables_from_database()) == {'olympic_games'}
@@ -0,0 +1,49 @@
+import os.path
+
+import pandas as pd
+import pytest
+
+from qatch.connectors import SqliteConnector
+from qatch.generate_dataset.checklist_generators import ProjectGenerator
+from qatch.generate_dataset.orchestrator_generator import OrchestratorGenerator
+
+
+class TestGeneratorStats:
+    @pytest.fixture
+    def connector(self, tmp_path):
+        return SqliteConnector(
+            relative_db_path=os.path.join(tmp_path, 'temp.sqlite'),
+            db_name='olympic_games',
+            tables={'olympic_games': pd.DataFrame({'year': [1896, 1900, 2004, 2004],
+                                                   'city': ['athens', 'paris', 'athens', 'athens'],
+                                                   'medals': [10.5, 20.0, 30.0, 1.5]})},
+            table2primary_key=None
+        )
+
+    def test_stats_match_dataset(self, connector):
+        dataset, stats = OrchestratorGenerator(['project', 'having', 'orderby']).generate_dataset(
+            connector, return_stats=True
+        )
+        assert set(stats['generator']) == {'PROJECT', 'HAVING', 'ORDERBY'}
+        assert (stats['tbl_name'] == 'olympic_games').all()
+        assert stats.set_index('generator')['kept'].to_dict() == dataset['test_category'].value_counts().to_dict()
+        assert (stats['candidates'] == stats['kept'] + stats['dropped_empty'] + stats['dropped_error']).all()
+        having = stats.set_index('generator').loc['HAVING']
+        assert having['stats_queries'] > 0
+        assert 0 < having['stats_query_time'] <= having['generation_time']
+
+    def test_default_returns_only_dataset(self, connector):
+        dataset = OrchestratorGenerator(['project']).generate_dataset(connector)
+        assert isinstance(dataset, pd.DataFrame)
+
+    def test_dropped_tests(self, connector):
+        generator = ProjectGenerator()
+        tests = [{'query': 'SELECT city FROM olympic_games'},
+                 {'query': 'SELECT city FROM olympic_games WHERE year > 3000'},
+                 {'query': 'SELECT not_a_column FROM olympic_games'}]
+        stats = {'kept': 0, 'dropped_empty': 0, 'dropped_error': 0, 'errors': {}}
+        kept = generator._remove_test_with_empty_results_or_errors(tests, connector, stats)
+
+        assert kept == tests[:1]
+        assert stats == {'kept': 1, 'dropped_empty': 1, 'dropped_error': 1,
+                         'errors': {'no such column: not_a_column': 1}}
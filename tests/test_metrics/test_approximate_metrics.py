@@ -0,0 +1,122 @@
+import random
+
+import pytest
+
+from qatch.evaluate_dataset.metrics_evaluators import (
+    ApproxCellPrecision,
+    ApproxCellRecall,
+    ApproxTupleConstraint,
+    CellPrecision,
+    CellRecall,
+    SketchStatistics,
+    TupleConstraint,
+)
+from qatch.evaluate_dataset.metrics_evaluators.sketches import BottomKSketch, hash64
+from qatch.evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+
+
+def _random_table(n_rows, n_cols, n_values, seed):
+    rng = random.Random(seed)
+    return [[rng.randrange(n_values) for _ in range(n_cols)] for _ in range(n_rows)]
+
+
+class TestSketches:
+    def test_hash_follows_python_equality(self):
+        assert hash64(1) == hash64(1.0) == hash64(True)
+        assert hash64(-1) != hash64(-2)
+        assert hash64(1) != hash64('1')
+        assert hash64((1, 'a')) == hash64((1.0, 'a'))
+        assert hash64((1, 'a')) != hash64(('a', 1))
+
+    def test_exact_below_sketch_size(self):
+        sketch = BottomKSketch(k=16, values=['a', 'b', 'a', 1, 1.0])
+        assert not sketch.saturated
+        assert sketch.cardinality() == 3
+        assert sorted(sketch.counts.values()) == [1, 2, 2]
+
+    def test_cardinality_estimate(self):
+        sketch = BottomKSketch(k=1024, values=range(100_000))
+        assert sketch.saturated
+        assert len(sketch.counts) == 1024
+        assert abs(sketch.cardinality() - 100_000) / 100_000 < 0.1
+
+
+class TestApproximateMetrics:
+    @pytest.mark.parametrize('approx, exact', [
+        (ApproxCellPrecision, CellPrecision),
+        (ApproxCellRecall, CellRecall),
+        (ApproxTupleConstraint, TupleConstraint),
+    ])
+    def test_exact_for_small_results(self, approx, exact):
+        cases = [
+            ([['a', 'b'], ['c', 'd']], [['a', 'b'], ['c', 'd']]),
+            ([['a', 'b'], ['c', 'd']], [['a', 'b'], ['c', 'e']]),
+            ([['a', 'b'], ['c', 'd']], [['a', 'b'], ['a', 'b'], ['c', 'd']]),
+            ([['a', 'b'], ['c', 'd']], [['d', 'c'], ['b', 'a']]),
+            ([[1, 2], ['c', None]], [[2.0, 1], [None, 'c'], ['a', 'b']]),
+            ([], []),
+            ([['a']], []),
+            ([], [['a']]),
+        ]
+        for target, prediction in cases:
+            estimate, error_bound = approx(sketch_size=64).run_metric_with_error(target, prediction)
+            assert estimate == exact().run_metric(target, prediction)
+            assert error_bound == 0.0
+
+    @pytest.mark.parametrize('approx, exact', [
+        (ApproxCellPrecision, CellPrecision),
+        (ApproxCellRecall, CellRecall),
+        (ApproxTupleConstraint, TupleConstraint),
+    ])
+    def test_error_bound_on_large_results(self, approx, exact):
+        target = _random_table(20_000, 2, 30_000, seed=1)
+        prediction = _random_table(15_000, 2, 40_000, seed=2)
+        estimate, error_bound = approx(sketch_size=512).run_metric_with_error(target, prediction)
+        expected = exact().run_metric(target, prediction)
+        assert 0.0 < error_bound < 0.2
+        assert abs(estimate - expected) <= error_bound + 0.001
+
+    @pytest.mark.parametrize('approx', [ApproxCellPrecision, ApproxCellRecall, ApproxTupleConstraint])
+    def test_sketch_statistics_equal_to_rows(self, approx):
+        target = _random_table(20_000, 2, 30_000, seed=1)
+        prediction = _random_table(15_000, 2, 40_000, seed=2)
+        evaluator = approx(sketch_size=512)
+        target_statistics = SketchStatistics(iter(target), sketch_size=512)
+        predicted_statistics = SketchStatistics(iter(prediction), sketch_size=512,
+                                                tuple_hashes=target_statistics.tuple_sketch.counts)
+        assert target_statistics.num_rows == 20_000 and predicted_statistics.num_rows == 15_000
+        assert (evaluator.run_metric_with_error(target_statistics, predicted_statistics)
+                == evaluator.run_metric_with_error(target, prediction))
+
+    def test_tuple_constraint_on_prediction_sketch(self):
+        target = _random_table(20_000, 2, 300, seed=1)
+        prediction = _random_table(15_000, 2, 300, seed=2)
+        # without the counts of the target tuples, the sample is restricted below the prediction threshold
+        estimate, error_bound = ApproxTupleConstraint(sketch_size=512).run_metric_with_error(
+            SketchStatistics(target, sketch_size=512), SketchStatistics(prediction, sketch_size=512))
+        assert 0.0 < error_bound < 0.2
+        assert abs(estimate - TupleConstraint().run_metric(target, prediction)) <= error_bound + 0.001
+
+    def test_metric_name(self):
+        evaluator = ApproxCellPrecision()
+        assert evaluator.metric_name == 'cell_precision'
+        assert evaluator.error_name == 'cell_precision_error_bound'
+
+
+class TestOrchestratorApproximateMetrics:
+    def test_error_bound_columns(self):
+        orchestrator = OrchestratorEvaluator(
+            ['cell_precision', 'cell_recall', 'tuple_cardinality'],
+            approximate_metrics=['cell_precision'],
+        )
+        metrics = orchestrator.evaluate_single_test([['a', 'b']], [['a', 'c']], connector=None)
+        assert metrics == {'cell_precision': 0.5, 'cell_precision_error_bound': 0.0,
+                           'cell_recall': 0.5, 'tuple_cardinality': 1.0}
+        metrics = orchestrator.evaluate_single_test('SELECT 1', 'select 1', connector=None)
+        assert metrics['cell_precision_error_bound'] == 0.0
+
+    def test_invalid_approximate_metric(self):
+        with pytest.raises(ValueError):
+            OrchestratorEvaluator(approximate_metrics=['tuple_order'])
+        with pytest.raises(ValueError):
+            OrchestratorEvaluator(['cell_recall'], approximate_metrics=['cell_precision'])
@@ -0,0 +1,48 @@
+import random
+from decimal import Decimal
+
+import pytest
+
+from qatch.evaluate_dataset.metrics_evaluators.utils import canonicalize_rows, sort_with_different_types
+
+
+def _expected(rows):
+    return [tuple(sort_with_different_types(row)) for row in rows]
+
+
+def _assert_same_cells(result, expected):
+    # compare also the types: 1 == 1.0 == True, but the canonical rows must keep the original cells
+    assert result == expected
+    assert [[type(cell) for cell in row] for row in result] == [[type(cell) for cell in row] for row in expected]
+
+
+@pytest.mark.parametrize('values', [
+    [0, 1, 2, -3, 10 ** 20],
+    [0, 1, 1.0, True, False, 2.5, -0.5],
+    ['a', 'b', 'B', '', '10', '9'],
+    ['a', 1, 2.5, None, True],
+    [None, 1, float('nan'), 'x'],
+    [None, 1, Decimal('1'), b'x', 'x'],
+    [None, 1, 'x', (2, 1)],
+])
+def test_equivalent_to_sort_key(values):
+    rng = random.Random(42)
+    for width in [1, 2, 5]:
+        rows = [[rng.choice(values) for _ in range(width)] for _ in range(200)]
+        _assert_same_cells(canonicalize_rows(rows), _expected(rows))
+
+
+def test_rows_with_different_lengths():
+    rows = [[3, 1], [2, 1, 0], ['b', 'a'], [None, 'a', 1]]
+    _assert_same_cells(canonicalize_rows(rows), _expected(rows))
+
+
+def test_tuples_and_empty_rows():
+    assert canonicalize_rows([]) == []
+    assert canonicalize_rows([(), ()]) == [(), ()]
+    assert canonicalize_rows(((2, 1), (4, 3))) == [(1, 2), (3, 4)]
+
+
+def test_mixed_rows_with_unhashable_cells():
+    rows = [[None, 'a', 1]] * 10 + [[2, ['b'], None]]
+    _assert_same_cells(canonicalize_rows(rows), _expected(rows))
@@ -0,0 +1,77 @@
+import os.path
+import pickle
+import random
+
+import pandas as pd
+import pytest
+
+from qatch.connectors import CompactResult, SqliteConnector
+from qatch.evaluate_dataset.metrics_evaluators import (
+    CellPrecision,
+    CellRecall,
+    ExecutionAccuracy,
+    TupleCardinality,
+    TupleConstraint,
+    TupleOrder,
+)
+from qatch.evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+
+EVALUATORS = [CellPrecision, CellRecall, ExecutionAccuracy, TupleCardinality, TupleConstraint, TupleOrder]
+
+
+def _random_result(rng, num_rows):
+    values = ['a', 'b', 'c', 1, 2, 2.5, None]
+    return [[rng.choice(values) for _ in range(2)] for _ in range(num_rows)]
+
+
+class TestCompactResult:
+    def test_sequence_interface(self):
+        rows = [[1, 'a'], [2, 'b']]
+        result = CompactResult(rows)
+        assert len(result) == 2
+        assert result[0] == (1, 'a')
+        assert list(result) == [(1, 'a'), (2, 'b')]
+        assert result == rows
+        assert CompactResult.from_rows(result) is result
+
+    def test_strings_are_interned(self):
+        result = CompactResult([[''.join(['ab', 'c'])], [''.join(['a', 'bc'])]])
+        assert result[0][0] is result[1][0]
+
+    def test_pickle(self):
+        result = CompactResult([[1, 'a'], [None, 2.5]])
+        assert pickle.loads(pickle.dumps(result)) == result
+
+    def test_cached_structures(self):
+        result = CompactResult([[1, 'a'], [1, 'b']])
+        assert result.distinct_cells == {1, 'a', 'b'}
+        assert result.distinct_cells is result.distinct_cells
+        assert result.cached('num_rows', len) == 2
+
+    @pytest.mark.parametrize('evaluator_cls', EVALUATORS)
+    def test_metrics_equal_on_compact_results(self, evaluator_cls):
+        rng = random.Random(0)
+        evaluator = evaluator_cls()
+        for _ in range(50):
+            target = _random_result(rng, rng.randint(0, 6))
+            prediction = _random_result(rng, rng.randint(0, 6))
+            expected = evaluator.run_metric(target, prediction)
+            assert evaluator.run_metric(CompactResult(target), CompactResult(prediction)) == expected
+            assert evaluator.run_metric(CompactResult(target), prediction) == expected
+
+    def test_connector_and_orchestrator(self, tmp_path):
+        connector = SqliteConnector(
+            relative_db_path=os.path.join(tmp_path, 'temp.sqlite'),
+            db_name='olympic_games',
+            tables={'olympic_games': pd.DataFrame({'year': [1896, 1900, 2004], 'city': ['athens', 'paris', 'athens']})},
+            table2primary_key=None
+        )
+        result = connector.run_query_compact('SELECT city, year FROM olympic_games')
+        assert isinstance(result, CompactResult)
+        assert result == connector.run_query('SELECT city, year FROM olympic_games')
+
+        metrics = ['cell_precision', 'cell_recall', 'tuple_cardinality', 'tuple_constraint', 'execution_accuracy']
+        target = 'SELECT city FROM olympic_games'
+        for prediction in ['SELECT city FROM olympic_games WHERE year > 1896', 'SELECT city, year FROM olympic_games']:
+            assert (OrchestratorEvaluator(metrics, compact_results=True).evaluate_single_test(target, prediction, connector)
+                    == OrchestratorEvaluator(metrics).evaluate_single_test(target, prediction, connector))
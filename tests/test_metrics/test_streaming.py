@@ -0,0 +1,142 @@
+import math
+import os.path
+
+import pandas as pd
+import pytest
+from func_timeout import FunctionTimedOut
+
+from qatch.connectors import SqliteConnector
+from qatch.evaluate_dataset.metrics_evaluators import (
+    CellPrecision,
+    CellRecall,
+    ResultStatistics,
+    StreamingCellPrecision,
+    StreamingCellRecall,
+    StreamingTupleCardinality,
+    StreamingTupleConstraint,
+    TupleCardinality,
+    TupleConstraint,
+)
+from qatch.evaluate_dataset.orchestrator_evaluator import OrchestratorEvaluator
+
+CASES = [
+    ([['a', 'b'], ['c', 'd']], [['a', 'b'], ['c', 'd']]),
+    ([['a', 'b'], ['c', 'd']], [['x', 'y'], ['z', 'w']]),
+    ([[math.nan, 'b'], ['c', 'd']], [[math.nan, 'x'], ['y', 'd']]),
+    ([['a', 'b'], ['c', 'd']], [['a', 'a'], ['b', 'b'], ['c', 'd']]),
+    ([['a', 'b'], ['c', 'd']], [['d', 'c'], ['b', 'a']]),
+    ([[1, 2], ['c', None]], [[2.0, 1], [None, 'c'], ['a', 'b']]),
+    ([['a', 'b'], ['a', 'b'], ['c', 'd']], [['a', 'b'], ['c', 'd']]),
+    ([], []),
+    ([['a']], []),
+    ([], [['a']]),
+]
+
+
+class TestStreamingMetrics:
+    @pytest.mark.parametrize('streaming, exact', [
+        (StreamingCellPrecision, CellPrecision),
+        (StreamingCellRecall, CellRecall),
+        (StreamingTupleCardinality, TupleCardinality),
+        (StreamingTupleConstraint, TupleConstraint),
+    ])
+    def test_equal_to_exact_metric(self, streaming, exact):
+        for target, prediction in CASES:
+            expected = exact().run_metric(target, prediction)
+            # rows consumed from generators, as from a cursor
+            assert streaming().run_metric(iter(target), (row for row in prediction)) == expected
+            assert streaming().run_metric(ResultStatistics(target), ResultStatistics(prediction)) == expected
+            assert streaming().metric_name == exact().metric_name
+
+    def test_result_statistics(self):
+        statistics = ResultStatistics(iter([['a', 'b'], ['b', 'a'], ['c', 'a']]), with_cells=True, with_tuples=True)
+        assert statistics.num_rows == 3
+        assert statistics.distinct_cells == {'a', 'b', 'c'}
+        assert statistics.canonical_row_counts == {('a', 'b'): 2, ('a', 'c'): 1}
+        statistics = ResultStatistics(iter([['a', 'b']]), with_cells=False, with_tuples=False)
+        assert statistics.distinct_cells is None and statistics.canonical_row_counts is None
+
+
+class TestOrchestratorStreaming:
+    @pytest.fixture
+    def connector(self, tmp_path):
+        data = {
+            "id": [0, 1, 2, 3, 4, 5],
+            "year": [1896, 1900, 1904, 2004, 2008, 2012],
+            "city": ["athens", "paris", "st. louis", "athens", "beijing", "london"]
+        }
+        return SqliteConnector(
+            relative_db_path=os.path.join(tmp_path, 'temp.sqlite'),
+            db_name='olympic_games',
+            tables={'olympic_games': pd.DataFrame.from_dict(data)},
+            table2primary_key=None
+        )
+
+    def test_iter_query(self, connector):
+        rows = connector.iter_query('SELECT id, city FROM olympic_games', batch_size=4)
+        assert list(rows) == [tuple(row) for row in connector.run_query('SELECT id, city FROM olympic_games')]
+
+    def test_streaming_mode(self, connector):
+        python_orchestrator = OrchestratorEvaluator(
+            ['cell_precision', 'cell_recall', 'tuple_cardinality', 'tuple_constraint']
+        )
+        streaming_orchestrator = OrchestratorEvaluator(mode='streaming')
+        target = 'SELECT city, year FROM olympic_games;'
+        for prediction in ['SELECT year, city FROM olympic_games WHERE year > 1900',
+                           'SELECT city FROM olympic_games',
+                           'SELECT wrong_column FROM olympic_games']:
+            assert (streaming_orchestrator.evaluate_single_test(target, prediction, connector)
+                    == python_orchestrator.evaluate_single_test(target, prediction, connector))
+
+        with pytest.raises(ValueError):
+            streaming_orchestrator.evaluate_single_test('SELECT wrong_column FROM olympic_games', target, connector)
+
+    def test_query_timeout(self, connector):
+        connector.query_timeout = 0.5
+        endless_query = ('WITH RECURSIVE counter(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM counter) '
+                         'SELECT n FROM counter WHERE n < 0')
+        with pytest.raises(FunctionTimedOut):
+            list(connector.iter_query(endless_query))
+        assert list(connector.iter_query('SELECT COUNT(*) FROM olympic_games')) == [(6,)]
+
+        orchestrator = OrchestratorEvaluator(mode='streaming')
+        target = 'SELECT city FROM olympic_games'
+        assert orchestrator.evaluate_single_test(target, endless_query, connector) == {
+            name: 0.0 for name in orchestrator.evaluator_names}
+        with pytest.raises(ValueError):
+            orchestrator.evaluate_single_test(endless_query, target, connector)
+
+    def test_unsupported_metric(self):
+        with pytest.raises(ValueError):
+            OrchestratorEvaluator(['tuple_order'], mode='streaming')
+
+    def test_approximate_metrics(self, connector, monkeypatch):
+        names = ['cell_precision', 'cell_recall', 'tuple_cardinality', 'tuple_constraint']
+        approximate_metrics = ['cell_precision', 'tuple_constraint']
+        python_orchestrator = OrchestratorEvaluator(names, approximate_metrics=approximate_metrics)
+        streaming_orchestrator = OrchestratorEvaluator(names, mode='streaming', approximate_metrics=approximate_metrics)
+        target = 'SELECT city, year FROM olympic_games'
+        predictions = ['SELECT year, city FROM olympic_games WHERE year > 1900', 'SELECT city FROM olympic_games',
+                       'SELECT wrong_column FROM olympic_games']
+        expected = [python_orchestrator.evaluate_single_test(target, prediction, connector)
+                    for prediction in predictions]
+        assert 'tuple_constraint_error_bound' in expected[0]
+
+        # the results are consumed from the cursor, never materialized
+        monkeypatch.setattr(connector, 'run_query', None)
+        for prediction, metrics in zip(predictions, expected):
+            assert streaming_orchestrator.evaluate_single_test(target, prediction, connector) == metrics
+
+
+    def test_target_consumed_once(self, connector, monkeypatch):
+        executed = []
+        iter_query = connector.iter_query
+        monkeypatch.setattr(connector, 'iter_query', lambda query, *args: executed.append(query) or iter_query(query))
+        orchestrator = OrchestratorEvaluator(mode='streaming', approximate_metrics=['tuple_constraint'])
+        target = 'SELECT city, year FROM olympic_games'
+        predictions = ['SELECT year, city FROM olympic_games WHERE year > 1900', 'SELECT city FROM olympic_games',
+                       'SELECT wrong_column FROM olympic_games']
+        outputs = orchestrator.evaluate_multiple_predictions(target, predictions, connector)
+        assert executed.count(target) == 1 and len(executed) == 4
+        assert outputs == [orchestrator.evaluate_single_test(target, prediction, connector)
+                           for prediction in predictions]